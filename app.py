@@ -12,9 +12,15 @@ import subprocess
 import json
 import threading
 import time
+import traceback
+import codecs
 from pathlib import Path
 import re
 import socket
+import hashlib
+import mimetypes
+import email.utils
+import http.server
 
 # Fix encoding issues on Windows - ensure UTF-8 encoding for stdout/stderr
 if sys.platform == 'win32':
@@ -35,6 +41,16 @@ except ImportError:
     WINPTY_AVAILABLE = False
     print("[WARNING] pywinpty not available - terminal will use fallback mode")
 
+# Native pseudo-terminal support on Linux/macOS
+try:
+    import fcntl
+    import termios
+    import selectors
+    import struct
+    POSIX_PTY_AVAILABLE = os.name == 'posix'
+except ImportError:
+    POSIX_PTY_AVAILABLE = False
+
 # No AI/LLM imports - feature removed
 
 # Determine base directory
@@ -986,6 +1002,1004 @@ def verify_venv_setup(window=None):
 # Note: Will be re-initialized when window is available
 PYTHON_EXE = None
 
+# Terminal output ring buffer size (bytes) - memory stays fixed no matter how long the UI isn't reading
+TERMINAL_BUFFER_BYTES = 4 * 1024 * 1024
+
+class TerminalRingBuffer:
+    """
+    Fixed-size byte ring buffer for terminal output.
+
+    Every byte gets a monotonically increasing absolute offset, so any number of
+    consumers (UI, error scanner, log recorder) can read from their own cursor
+    without clearing or copying the buffer. Appends never grow memory - once full,
+    the oldest bytes are overwritten and consumers that fell behind are told how
+    many bytes they lost.
+    """
+
+    def __init__(self, capacity=TERMINAL_BUFFER_BYTES):
+        self.capacity = capacity
+        self._data = bytearray(capacity)
+        self._end = 0  # Absolute offset one past the newest byte
+        self._cond = threading.Condition()
+
+    @property
+    def end(self):
+        """Absolute offset where the next append will land"""
+        return self._end
+
+    @property
+    def start(self):
+        """Oldest absolute offset still held in the buffer"""
+        return max(0, self._end - self.capacity)
+
+    def append(self, data):
+        """Append text or bytes to the buffer"""
+        if isinstance(data, str):
+            data = data.encode('utf-8', errors='replace')
+        size = len(data)
+        if not size:
+            return
+
+        with self._cond:
+            # Only the newest `capacity` bytes can ever be read back
+            chunk = data[-self.capacity:] if size > self.capacity else data
+            pos = (self._end + size - len(chunk)) % self.capacity
+            first = min(len(chunk), self.capacity - pos)
+            self._data[pos:pos + first] = chunk[:first]
+            if first < len(chunk):
+                self._data[0:len(chunk) - first] = chunk[first:]
+            self._end += size
+            self._cond.notify_all()
+
+    def read(self, offset, max_bytes=None):
+        """
+        Read bytes starting at an absolute offset.
+        Returns (data, new_offset, lost) where lost is the number of bytes that were
+        overwritten before this reader got to them.
+        """
+        with self._cond:
+            start = self.start
+            lost = 0
+            if offset < start:
+                lost = start - offset
+                offset = start
+            elif offset > self._end:
+                offset = self._end
+
+            size = self._end - offset
+            if max_bytes is not None:
+                size = min(size, max_bytes)
+            if size <= 0:
+                return b'', offset, lost
+
+            pos = offset % self.capacity
+            first = min(size, self.capacity - pos)
+            data = bytes(self._data[pos:pos + first])
+            if first < size:
+                data += bytes(self._data[0:size - first])
+            return data, offset + size, lost
+
+    def wait(self, offset, timeout=None):
+        """Block until there is data past offset (or timeout). Returns True if data is available."""
+        with self._cond:
+            if self._end > offset:
+                return True
+            self._cond.wait(timeout)
+            return self._end > offset
+
+
+class TerminalCursor:
+    """
+    Independent read position into a TerminalRingBuffer.
+    Decodes UTF-8 incrementally so multi-byte characters split across appends survive.
+    """
+
+    def __init__(self, buffer, from_start=False):
+        self.buffer = buffer
+        self.offset = buffer.start if from_start else buffer.end
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self._lock = threading.Lock()  # The event bus and API calls may read the same cursor
+
+    def read(self, max_bytes=None):
+        """Return all new text since the last read, with a marker if bytes were lost"""
+        with self._lock:
+            data, self.offset, lost = self.buffer.read(self.offset, max_bytes)
+            prefix = ''
+            if lost:
+                self._decoder.reset()
+                prefix = f'\r\n[... lost {lost} bytes of terminal output ...]\r\n'
+            return prefix + self._decoder.decode(data)
+
+    def replay(self):
+        """Rewind to the oldest buffered byte and return everything (e.g. to redraw a cleared screen)"""
+        with self._lock:
+            self.offset = self.buffer.start
+            self._decoder.reset()
+            data, self.offset, _ = self.buffer.read(self.offset)
+            return self._decoder.decode(data)
+
+    def peek(self):
+        """Return text from this cursor to the end of the buffer without advancing"""
+        data, _, _ = self.buffer.read(self.offset)
+        return data.decode('utf-8', errors='replace')
+
+    def seek_end(self):
+        """Skip everything currently buffered"""
+        with self._lock:
+            self.offset = self.buffer.end
+            self._decoder.reset()
+
+    def wait(self, timeout=None):
+        """Block until new data arrives for this cursor"""
+        return self.buffer.wait(self.offset, timeout)
+
+    @property
+    def pending(self):
+        """Number of unread bytes (including any already overwritten)"""
+        return self.buffer.end - self.offset
+
+
+class PosixPtyTerminal:
+    """
+    Interactive shell on a POSIX pseudo-terminal - the Linux/macOS counterpart of winpty.PTY.
+
+    The shell runs in its own session with the PTY as controlling terminal, so job control,
+    Ctrl+C and SIGWINCH behave like in a real terminal emulator. Output is read with a
+    non-blocking selector loop instead of polling.
+    """
+
+    def __init__(self, cols=120, rows=30):
+        self.cols = cols
+        self.rows = rows
+        self.master_fd = None
+        self.process = None
+        self._write_lock = threading.Lock()
+
+    @property
+    def pid(self):
+        return self.process.pid if self.process else None
+
+    def spawn(self, argv, cwd=None, env=None):
+        master_fd, slave_fd = os.openpty()
+        try:
+            self._apply_size(slave_fd)
+
+            def make_controlling_tty():
+                # Runs in the child after setsid(): stdin (the PTY slave) becomes its controlling terminal
+                fcntl.ioctl(0, termios.TIOCSCTTY, 0)
+
+            self.process = subprocess.Popen(
+                argv,
+                stdin=slave_fd,
+                stdout=slave_fd,
+                stderr=slave_fd,
+                cwd=cwd,
+                env=env,
+                start_new_session=True,
+                preexec_fn=make_controlling_tty,
+                close_fds=True
+            )
+        except Exception:
+            os.close(master_fd)
+            raise
+        finally:
+            os.close(slave_fd)
+
+        os.set_blocking(master_fd, False)
+        self.master_fd = master_fd
+
+    def isalive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def read_loop(self, on_data):
+        """Deliver decoded output to on_data until the shell exits (call from a reader thread)"""
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        selector = selectors.DefaultSelector()
+        selector.register(self.master_fd, selectors.EVENT_READ)
+        try:
+            while True:
+                events = selector.select(timeout=0.5)
+                if not events:
+                    if not self.isalive():
+                        break
+                    continue
+                try:
+                    chunk = os.read(self.master_fd, 65536)
+                except BlockingIOError:
+                    continue
+                except OSError:
+                    # EIO: every handle to the slave side is closed - the shell exited
+                    break
+                if not chunk:
+                    break
+                text = decoder.decode(chunk)
+                if text:
+                    on_data(text)
+        finally:
+            selector.close()
+            tail = decoder.decode(b'', final=True)
+            if tail:
+                on_data(tail)
+
+    def write(self, data):
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        with self._write_lock:
+            view = memoryview(data)
+            with selectors.DefaultSelector() as selector:
+                selector.register(self.master_fd, selectors.EVENT_WRITE)
+                while view:
+                    try:
+                        written = os.write(self.master_fd, view)
+                        view = view[written:]
+                    except BlockingIOError:
+                        # Shell isn't draining its input - wait until the PTY accepts more
+                        selector.select(timeout=0.1)
+
+    def set_size(self, cols, rows):
+        """Resize the PTY - the kernel delivers SIGWINCH to the foreground job"""
+        self.cols = int(cols)
+        self.rows = int(rows)
+        if self.master_fd is not None:
+            self._apply_size(self.master_fd)
+
+    def _apply_size(self, fd):
+        fcntl.ioctl(fd, termios.TIOCSWINSZ, struct.pack('HHHH', self.rows, self.cols, 0, 0))
+
+    def signal_foreground(self, sig):
+        """Send sig to the job currently in the foreground of the terminal (e.g. a running manim)"""
+        try:
+            pgid = os.tcgetpgrp(self.master_fd)
+        except OSError:
+            pgid = os.getpgid(self.process.pid)
+        os.killpg(pgid, sig)
+        return pgid
+
+    def close(self):
+        import signal
+        if self.process is not None and self.process.poll() is None:
+            try:
+                os.killpg(os.getpgid(self.process.pid), signal.SIGHUP)
+            except OSError:
+                pass
+        if self.master_fd is not None:
+            try:
+                os.close(self.master_fd)
+            except OSError:
+                pass
+            self.master_fd = None
+
+
+TERMINAL_REDRAW_FLUSH_INTERVAL = 0.1  # Max delay before a held progress-bar redraw is written
+
+class TerminalStreamCompactor:
+    """
+    Drops terminal output nobody will ever see before it reaches the ring buffer.
+
+    Progress bars (tqdm) redraw their line with '\\r' many times per second. Only the last
+    redraw of a line matters, so superseded segments are dropped and the newest one is held
+    back for up to TERMINAL_REDRAW_FLUSH_INTERVAL. Colour (SGR) changes inside dropped
+    segments are kept, and back-to-back identical cursor/erase sequences are collapsed.
+    Segments with cursor movement are never dropped since they may draw outside the line.
+    """
+
+    _CSI_RE = re.compile(r'\x1b\[[0-9;?]*[ -/]*[@-~]')
+    _ESCAPE_RE = re.compile(r'\x1b(?:\[[0-9;?]*[ -/]*[@-~]|\][^\x07\x1b]*(?:\x07|\x1b\\)|[@-Z\\-_])')
+    _REPEATED_CSI_RE = re.compile(r'(\x1b\[[0-9;?]*[ -/]*[@-~])\1+')
+    _PARTIAL_ESCAPE_RE = re.compile(r'\x1b(?:\[[0-9;?]*[ -/]*|\][^\x07\x1b]*)?$')
+    _SGR_RESET_RE = re.compile(r'\x1b\[0?m')
+
+    def __init__(self, buffer, on_output=None, flush_interval=TERMINAL_REDRAW_FLUSH_INTERVAL):
+        self._buffer = buffer
+        self.on_output = on_output  # Called after anything is appended to the buffer
+        self._flush_interval = flush_interval
+        self._lock = threading.Condition()
+        self._carry = ''  # Incomplete escape sequence / lone '\r' from the previous chunk
+        self._pending = None  # Held redraw segment (text that followed a '\r')
+        self._pending_sgr = ''  # Colour changes from dropped segments
+        self._last_flush = 0.0
+        self._flush_thread = None
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    @property
+    def bytes_saved(self):
+        return self.bytes_in - self.bytes_out
+
+    def stats(self):
+        with self._lock:
+            saved = self.bytes_in - self.bytes_out
+            return {
+                'bytes_in': self.bytes_in,
+                'bytes_out': self.bytes_out,
+                'bytes_saved': saved,
+                'ratio': round(self.bytes_out / self.bytes_in, 3) if self.bytes_in else 1.0
+            }
+
+    def write(self, data):
+        """Compact data and append what's left to the ring buffer"""
+        if not data:
+            return
+        if isinstance(data, bytes):
+            data = data.decode('utf-8', errors='replace')
+
+        with self._lock:
+            self.bytes_in += len(data.encode('utf-8', errors='replace'))
+            out = self._compact(self._carry + data, time.time())
+            if self._pending is not None:
+                self._ensure_flush_thread()
+                self._lock.notify()
+        self._emit(out)
+
+    def flush(self, force=True):
+        """Write the held redraw segment (if any). Without force, only once it is due."""
+        with self._lock:
+            if self._pending is None:
+                return
+            now = time.time()
+            if not force and now - self._last_flush < self._flush_interval:
+                return
+            out = self._take_pending(now)
+        self._emit(out)
+
+    def _compact(self, text, now):
+        self._carry = ''
+        # Hold incomplete sequences until the rest arrives
+        partial = self._PARTIAL_ESCAPE_RE.search(text)
+        if partial:
+            self._carry = text[partial.start():]
+            text = text[:partial.start()]
+        if text.endswith('\r'):
+            # Could be the first half of '\r\n'
+            self._carry = '\r' + self._carry
+            text = text[:-1]
+
+        out = []
+        lines = text.split('\n')
+        for index, part in enumerate(lines):
+            terminated = index < len(lines) - 1
+            newline = ''
+            if terminated:
+                newline = '\n'
+                if part.endswith('\r'):
+                    newline = '\r\n'
+                    part = part[:-1]
+
+            segments = part.split('\r')
+            # First segment continues whatever was written before on this line
+            if self._pending is not None:
+                self._pending += segments[0]
+            elif segments[0]:
+                out.append(segments[0])
+
+            for segment in segments[1:]:
+                if self._pending is not None:
+                    if self._is_droppable(self._pending):
+                        self._pending_sgr += ''.join(
+                            m.group() for m in self._CSI_RE.finditer(self._pending) if m.group().endswith('m'))
+                    else:
+                        out.append(self._take_pending(now))
+                self._pending = segment
+
+            if terminated:
+                if self._pending is not None:
+                    out.append(self._take_pending(now))
+                out.append(newline)
+
+        if self._pending is not None and now - self._last_flush >= self._flush_interval:
+            out.append(self._take_pending(now))
+
+        return ''.join(out)
+
+    def _is_droppable(self, segment):
+        # Only SGR (colour) and erase-in-line sequences stay on the current line
+        for match in self._ESCAPE_RE.finditer(segment):
+            seq = match.group()
+            if not (seq.startswith('\x1b[') and seq[-1] in 'mK'):
+                return False
+        return True
+
+    def _take_pending(self, now):
+        sgr = self._pending_sgr
+        resets = list(self._SGR_RESET_RE.finditer(sgr))
+        if resets:
+            # Anything before the last reset has no effect anymore
+            sgr = sgr[resets[-1].start():]
+        out = '\r' + sgr + self._pending
+        self._pending = None
+        self._pending_sgr = ''
+        self._last_flush = now
+        return out
+
+    def _emit(self, out):
+        if not out:
+            return
+        out = self._REPEATED_CSI_RE.sub(r'\1', out)
+        with self._lock:
+            self.bytes_out += len(out.encode('utf-8', errors='replace'))
+        self._buffer.append(out)
+        if self.on_output:
+            self.on_output()
+
+    def _ensure_flush_thread(self):
+        if self._flush_thread is None or not self._flush_thread.is_alive():
+            self._flush_thread = threading.Thread(target=self._flush_loop, daemon=True)
+            self._flush_thread.start()
+
+    def stop(self):
+        """Write out any held redraw and end the flush thread (the next write starts a new one)"""
+        with self._lock:
+            thread, self._flush_thread = self._flush_thread, None
+            self._lock.notify_all()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=1)
+        self.flush()
+
+    def _flush_loop(self):
+        # Writes held redraws once due when no newer output arrives to push them out
+        me = threading.current_thread()
+        while True:
+            with self._lock:
+                while self._pending is None and self._flush_thread is me:
+                    self._lock.wait()
+                if self._flush_thread is not me:
+                    return  # stop() was called
+                delay = self._flush_interval - (time.time() - self._last_flush)
+                if delay > 0:
+                    self._lock.wait(delay)
+            self.flush(force=False)
+
+
+# Output patterns that mean a manim/python run failed - in order of specificity
+TERMINAL_ERROR_PATTERNS = [
+    'SyntaxError:',
+    'NameError:',
+    'ImportError:',
+    'ModuleNotFoundError:',
+    'AttributeError:',
+    'TypeError:',
+    'ValueError:',
+    'IndentationError:',
+    'manim.utils.module_ops.SceneNotFound',
+    'FileNotFoundError:',
+    'Exception:'
+]
+TERMINAL_TRACEBACK_PATTERN = 'Traceback (most recent call last)'
+TERMINAL_INTERRUPT_PATTERNS = ['KeyboardInterrupt', '^C', 'Interrupted']
+
+# Single compiled automaton for all patterns - one pass over each new line
+TERMINAL_SCAN_RE = re.compile(
+    '(?P<error>' + '|'.join(re.escape(p) for p in TERMINAL_ERROR_PATTERNS) + ')'
+    '|(?P<traceback>' + re.escape(TERMINAL_TRACEBACK_PATTERN) + ')'
+    '|(?P<interrupt>' + '|'.join(re.escape(p) for p in TERMINAL_INTERRUPT_PATTERNS) + ')'
+    '|(?P<rendered>Rendered )'
+    '|(?P<file_ready>File ready at)'
+)
+ANSI_ESCAPE_RE = re.compile(r'\x1b(?:\[[0-9;?]*[ -/]*[@-~]|\][^\x07]*\x07|[@-Z\\-_])')
+TERMINAL_LINE_SPLIT_RE = re.compile(r'\r\n|\r|\n')
+
+class TerminalErrorMatcher:
+    """
+    Streaming error detector for terminal output.
+
+    Only newly fed text is scanned, one line at a time, against a single compiled
+    regex. A match is reported together with the lines around it: the specific
+    exception line waits briefly for its follow-up lines, and a bare traceback
+    header is only reported if no specific exception line follows.
+    """
+
+    CONTEXT_BEFORE = 3  # Lines kept before the matching line
+    CONTEXT_AFTER = 2  # Non-empty lines collected after the matching line
+    GRACE_SECONDS = 0.5  # How long a match waits for its context lines
+    MAX_PARTIAL = 8192  # Longest unterminated line kept between feeds
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._partial = ''
+        self._recent = []
+        self._pending = None  # Match still collecting context lines
+        self.error = None  # Dict describing the first reported error
+        self.interrupted = False
+        self.saw_rendered = False
+        self.saw_file_ready = False
+
+    @property
+    def completed(self):
+        """True once manim printed both 'Rendered ...' and 'File ready at'"""
+        return self.saw_rendered and self.saw_file_ready
+
+    def feed(self, text, now=None):
+        """Scan newly arrived text. Returns the error dict if one was reported by this call."""
+        if not text:
+            return self.poll(now)
+
+        parts = TERMINAL_LINE_SPLIT_RE.split(self._partial + text)
+        self._partial = parts.pop()
+        if len(self._partial) > self.MAX_PARTIAL:
+            # Unterminated garbage (or a huge progress line) - scan it and move on
+            parts.append(self._partial)
+            self._partial = ''
+
+        reported = None
+        for line in parts:
+            reported = self._scan_line(ANSI_ESCAPE_RE.sub('', line), now) or reported
+
+        # ^C echoes usually arrive without a trailing newline
+        if not self.interrupted and self._partial:
+            tail = ANSI_ESCAPE_RE.sub('', self._partial)
+            if any(p in tail for p in TERMINAL_INTERRUPT_PATTERNS):
+                self.interrupted = True
+
+        return self.poll(now) or reported
+
+    def poll(self, now=None):
+        """Report a pending match whose grace period has expired"""
+        if self._pending and (now or time.time()) - self._pending['since'] >= self.GRACE_SECONDS:
+            return self._report()
+        return None
+
+    def _scan_line(self, line, now):
+        stripped = line.strip()
+        reported = None
+
+        if self._pending and stripped:
+            if self._pending['kind'] == 'error':
+                self._pending['after'].append(stripped)
+                if len(self._pending['after']) >= self.CONTEXT_AFTER:
+                    reported = self._report()
+            else:
+                self._pending['after'].append(stripped)
+
+        for match in TERMINAL_SCAN_RE.finditer(line):
+            kind = match.lastgroup
+            if kind == 'interrupt':
+                self.interrupted = True
+            elif kind == 'rendered':
+                self.saw_rendered = True
+            elif kind == 'file_ready':
+                self.saw_file_ready = True
+            elif self.error is None and (self._pending is None or self._pending['kind'] == 'traceback'):
+                if kind == 'error':
+                    # Specific exception line supersedes a pending traceback header
+                    self._pending = {
+                        'kind': 'error',
+                        'pattern': match.group(),
+                        'line': stripped,
+                        'before': list(self._recent),
+                        'after': [],
+                        'since': now or time.time()
+                    }
+                elif self._pending is None:
+                    self._pending = {
+                        'kind': 'traceback',
+                        'pattern': match.group(),
+                        'line': stripped,
+                        'before': list(self._recent),
+                        'after': [],
+                        'since': now or time.time()
+                    }
+                break
+
+        if stripped:
+            self._recent.append(stripped)
+            if len(self._recent) > self.CONTEXT_BEFORE:
+                self._recent.pop(0)
+        return reported
+
+    def rearm(self):
+        """Look for the next error, keeping the scan position and line context"""
+        self._pending = None
+        self.error = None
+        self.interrupted = False
+
+    def _report(self):
+        pending = self._pending
+        self._pending = None
+        if self.error is not None:
+            return None
+
+        after = pending['after'][:self.CONTEXT_AFTER]
+        message = ' '.join([pending['line']] + after)
+        self.error = {
+            'pattern': pending['pattern'],
+            'message': message[:200],  # Limit error message length
+            'line': pending['line'],
+            'context': pending['before'] + [pending['line']] + pending['after'][:self.CONTEXT_AFTER * 4]
+        }
+        return self.error
+
+
+class TerminalErrorWatcher:
+    """
+    Background consumer that feeds a TerminalErrorMatcher from its own ring-buffer cursor.
+    Fires a 'terminal_error' UI event as soon as an error is found - for renders and
+    for any command the user runs in the terminal. Command sessions keep their first
+    error for result(); with rearm set (the interactive shell) the matcher starts looking
+    for the next error once one has been published.
+    """
+
+    POLL_SECONDS = 0.25
+
+    def __init__(self, buffer):
+        self.rearm = False
+        self.matcher = TerminalErrorMatcher()
+        self._cursor = TerminalCursor(buffer)
+        self._lock = threading.Lock()
+        self._event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """End the background scan (its process exited or the session is gone)"""
+        thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=1)
+
+    def reset(self):
+        """Forget earlier output and errors (call right before sending a new command)"""
+        with self._lock:
+            self._cursor.seek_end()
+            self.matcher.reset()
+            self._event.clear()
+
+    def rearm_matcher(self):
+        """Look for a new error without skipping output that hasn't been scanned yet"""
+        with self._lock:
+            self.matcher.rearm()
+            self._event.clear()
+
+    def wait(self, timeout):
+        """Sleep up to timeout, waking immediately on an error or interrupt"""
+        return self._event.wait(timeout)
+
+    def result(self):
+        """(has_error, error_message) for output since the last reset"""
+        with self._lock:
+            error = self.matcher.error
+        if error:
+            return (True, error['message'])
+        return (False, None)
+
+    def drain(self):
+        """Scan everything written so far and report a pending match right away (the process exited)"""
+        with self._lock:
+            # The trailing newline completes a last unterminated line
+            error = self.matcher.feed(self._cursor.read() + '\n')
+            error = self.matcher.poll(now=float('inf')) or error
+            self._signal(error)
+        self._report(error)
+
+    def _run(self):
+        me = threading.current_thread()
+        while self._thread is me:
+            self._cursor.wait(self.POLL_SECONDS)
+            with self._lock:
+                error = self.matcher.feed(self._cursor.read())
+                self._signal(error)
+            self._report(error)
+
+    def _signal(self, error):
+        if error or self.matcher.interrupted:
+            self._event.set()
+
+    def _report(self, error):
+        if error:
+            print(f"[ERROR CHECK] Found error pattern: {error['pattern']}")
+            print(f"[ERROR CHECK] Error message extracted: {error['message'][:100]}")
+            ui_events.publish('terminal_error', error)
+            if self.rearm:
+                self.rearm_matcher()
+
+
+class TerminalSession:
+    """
+    One terminal: a process plus its own ring buffer, compactor, cursors, error watcher and size.
+
+    'main' is the user's interactive shell. Renders and previews get their own sessions
+    running manim directly, so they never block the shell or mix output with it,
+    and their exit code is known.
+    """
+
+    def __init__(self, name, cols=120, rows=30, on_exit=None):
+        self.name = name
+        self.cols = cols
+        self.rows = rows
+        self.buffer = TerminalRingBuffer()
+        self.compactor = TerminalStreamCompactor(self.buffer, on_output=self._notify)
+        self.ui_cursor = TerminalCursor(self.buffer)  # Read position of the frontend display
+        self.error_watcher = TerminalErrorWatcher(self.buffer)
+        self.process = None
+        self.backend = None  # 'winpty', 'posix_pty' or 'pipe'
+        self.thread = None
+        self.command = None  # argv for command sessions, None for an interactive shell
+        self.returncode = None
+        self.exited = threading.Event()
+        self._on_exit = on_exit
+
+    @property
+    def event_topic(self):
+        # The main shell keeps the plain topic; other sessions are tagged with their name
+        return 'terminal' if self.name == 'main' else f'terminal:{self.name}'
+
+    def _notify(self):
+        ui_events.notify(self.event_topic)
+
+    def is_alive(self):
+        if self.process is None or self.exited.is_set():
+            return False
+        if self.backend == 'pipe':
+            return self.process.poll() is None
+        return self.process.isalive()
+
+    def spawn(self, argv, cwd=None, env=None):
+        """Run argv in this session - on a PTY when one is available, else on pipes"""
+        self.command = list(argv)
+        if POSIX_PTY_AVAILABLE:
+            process = PosixPtyTerminal(self.cols, self.rows)
+            process.spawn(argv, cwd=cwd, env=env)
+            backend = 'posix_pty'
+        elif WINPTY_AVAILABLE:
+            process = winpty.PTY(self.cols, self.rows)
+            env_block = None
+            if env is not None:
+                env_block = '\0'.join(f'{k}={v}' for k, v in env.items()) + '\0'
+            process.spawn(argv[0], cmdline=subprocess.list2cmdline(argv[1:]), cwd=cwd, env=env_block)
+            backend = 'winpty'
+        else:
+            process = subprocess.Popen(
+                argv,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                bufsize=0,
+                cwd=cwd,
+                env=env,
+                creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
+            )
+            backend = 'pipe'
+        self.attach(process, backend)
+        return self
+
+    def attach(self, process, backend):
+        """Start reading output from an already spawned process"""
+        self.process = process
+        self.backend = backend
+        self.returncode = None
+        self.exited.clear()
+        self.error_watcher.rearm = self.command is None  # The shell reports every command's errors
+        self.error_watcher.start()
+        self.thread = threading.Thread(target=self._read_output, daemon=True)
+        self.thread.start()
+
+    def _read_output(self):
+        process = self.process
+        print(f"[TERMINAL {self.name}] Reader thread started ({self.backend})")
+        try:
+            if self.backend == 'posix_pty':
+                # Blocks in select() until output arrives - no polling
+                process.read_loop(self.compactor.write)
+            elif self.backend == 'winpty':
+                while True:
+                    try:
+                        # pywinpty.PTY.read() blocks until data is available
+                        data = process.read()
+                        if data:
+                            # Superseded progress redraws are dropped before they reach the ring buffer
+                            self.compactor.write(data)
+                    except Exception as e:
+                        if not process.isalive():
+                            break
+                        error_msg = str(e).lower()
+                        # Ignore common non-error conditions
+                        if "closed" not in error_msg and "timeout" not in error_msg and "no data" not in error_msg:
+                            print(f"[TERMINAL {self.name} ERROR] {e}")
+                        time.sleep(0.05)
+            else:
+                decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+                fd = process.stdout.fileno()
+                while True:
+                    chunk = os.read(fd, 65536)
+                    if not chunk:
+                        break
+                    text = decoder.decode(chunk)
+                    if text:
+                        self.compactor.write(text)
+        except Exception as e:
+            print(f"[TERMINAL {self.name} ERROR] {e}")
+
+        # Nothing more will be written - the flush and scan threads can go
+        self.compactor.stop()
+        self.error_watcher.drain()
+        self.error_watcher.stop()
+        self.returncode = self._exit_status(process)
+        self.exited.set()
+        print(f"[TERMINAL {self.name}] Process exited (code {self.returncode})")
+        if self._on_exit:
+            self._on_exit(self)
+
+    def _exit_status(self, process):
+        try:
+            if self.backend == 'winpty':
+                return process.get_exitstatus()
+            if self.backend == 'posix_pty':
+                returncode = process.process.wait(timeout=5)
+                process.close()
+                return returncode
+            return process.wait(timeout=5)
+        except Exception:
+            return None
+
+    def write(self, data):
+        """Send raw input (keystrokes) to the session"""
+        if self.process is None:
+            raise RuntimeError(f"Terminal session '{self.name}' not running")
+        if self.backend == 'pipe':
+            if isinstance(data, str):
+                data = data.encode('utf-8')
+            self.process.stdin.write(data)
+            self.process.stdin.flush()
+        else:
+            self.process.write(data)
+
+    def run_command(self, command):
+        """Type a command line and press Enter"""
+        # ConPTY expects CRLF; a POSIX tty and a plain pipe both take LF
+        newline = '\r\n' if self.backend == 'winpty' else '\n'
+        self.write(command + newline)
+
+    def clear(self):
+        """Clear the screen (no-op without a real PTY)"""
+        if not self.is_alive():
+            return
+        if self.backend == 'winpty':
+            self.run_command('cls')
+        elif self.backend == 'posix_pty':
+            self.run_command('clear')
+
+    def resize(self, cols, rows):
+        self.cols = int(cols)
+        self.rows = int(rows)
+        if self.backend in ('winpty', 'posix_pty') and self.is_alive():
+            self.process.set_size(self.cols, self.rows)
+
+    def interrupt(self):
+        """Ctrl+C for whatever is running in the session"""
+        import signal
+        if not self.is_alive():
+            return
+        if self.backend == 'posix_pty':
+            # The whole foreground job (manim and its ffmpeg children), not just the shell
+            pgid = self.process.signal_foreground(signal.SIGINT)
+            print(f"[TERMINAL {self.name}] Sent SIGINT to process group {pgid}")
+        elif self.backend == 'winpty':
+            self.process.write('\x03')
+            print(f"[TERMINAL {self.name}] Sent Ctrl+C")
+        elif os.name == 'nt':
+            # No console to deliver Ctrl+C to in pipe mode
+            self.process.terminate()
+            print(f"[TERMINAL {self.name}] Terminated process")
+        else:
+            self.process.send_signal(signal.SIGINT)
+            print(f"[TERMINAL {self.name}] Sent SIGINT")
+
+    def close(self):
+        """Kill the session's process (its output stays readable)"""
+        if not self.is_alive():
+            return
+        import signal
+        try:
+            if self.backend == 'posix_pty':
+                self.process.close()
+            elif self.backend == 'winpty':
+                os.kill(self.process.pid, signal.SIGTERM)
+            else:
+                self.process.kill()
+        except Exception as e:
+            print(f"[TERMINAL {self.name}] Error closing session: {e}")
+
+    def dispose(self):
+        """close() and end the session's background threads - for sessions being dropped"""
+        self.close()
+        self.compactor.stop()
+        self.error_watcher.stop()
+
+    def describe(self):
+        return {
+            'name': self.name,
+            'command': ' '.join(self.command) if self.command else None,
+            'backend': self.backend,
+            'alive': self.is_alive(),
+            'returncode': self.returncode,
+            'cols': self.cols,
+            'rows': self.rows
+        }
+
+
+class TerminalSessionManager:
+    """Named terminal sessions. 'main' (the interactive shell) always exists."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions = {}
+        self.cols = 120  # Size of the frontend terminal - new sessions start at this size
+        self.rows = 30
+        self.push_enabled = False  # Frontend subscribed to pushed output
+        self._sessions['main'] = TerminalSession('main', self.cols, self.rows, on_exit=self._session_exited)
+
+    @property
+    def main(self):
+        return self._sessions['main']
+
+    def get(self, name):
+        with self._lock:
+            return self._sessions.get(name)
+
+    def create(self, name, replace=True):
+        """New (not yet spawned) session. An existing session with that name is closed first."""
+        with self._lock:
+            old = self._sessions.get(name)
+            if old is not None:
+                if not replace:
+                    raise ValueError(f"Terminal session '{name}' already exists")
+                if name == 'main':
+                    raise ValueError("The main terminal session can't be replaced")
+            session = TerminalSession(name, self.cols, self.rows, on_exit=self._session_exited)
+            self._sessions[name] = session
+        if old is not None:
+            old.dispose()
+        if self.push_enabled:
+            ui_events.register_source(session.event_topic, session.ui_cursor.read)
+        self._changed(focus=name)
+        return session
+
+    def remove(self, name):
+        if name == 'main':
+            raise ValueError("The main terminal session can't be removed")
+        with self._lock:
+            session = self._sessions.pop(name, None)
+        if session is None:
+            return False
+        session.dispose()
+        ui_events.unregister_source(session.event_topic)
+        self._changed()
+        return True
+
+    def resize_all(self, cols, rows):
+        """xterm.js has one size - every session follows it"""
+        self.cols = int(cols)
+        self.rows = int(rows)
+        with self._lock:
+            sessions = list(self._sessions.values())
+        for session in sessions:
+            try:
+                session.resize(cols, rows)
+            except Exception as e:
+                print(f"[TERMINAL {session.name}] Resize failed: {e}")
+
+    def subscribe(self):
+        """Push output of every session to the frontend from now on"""
+        self.push_enabled = True
+        with self._lock:
+            sessions = list(self._sessions.values())
+        for session in sessions:
+            ui_events.register_source(session.event_topic, session.ui_cursor.read)
+
+    def describe(self):
+        with self._lock:
+            return [session.describe() for session in self._sessions.values()]
+
+    def _session_exited(self, session):
+        self._changed()
+
+    def _changed(self, focus=None):
+        ui_events.publish_latest('terminal_sessions', {'sessions': self.describe(), 'focus': focus})
+
 # Application state
 app_state = {
     'current_code': '',
@@ -998,10 +2012,7 @@ app_state = {
     'window': None,
     'generated_files': [],  # Track files generated this session for cleanup
     'preview_files_to_cleanup': set(),  # Track preview MP4 files copied to assets for cleanup on exit
-    'terminal_process': None,  # Persistent cmd.exe session
-    'terminal_thread': None,  # Thread for reading terminal output
-    'terminal_output_buffer': [],  # Buffer for terminal output (gets cleared when sent to frontend)
-    'terminal_error_buffer': [],  # Persistent buffer for error checking (keeps last 1000 lines)
+    'terminal_sessions': TerminalSessionManager(),  # Named terminal sessions - 'main' is the interactive shell (cmd.exe / $SHELL)
     'settings': {
         'quality': '720p',
         'format': 'MP4 Video',
@@ -1043,309 +2054,4217 @@ def safe_evaluate_js(window, js_code):
             print(f"[WINDOW] Error evaluating JS: {e}")
             raise  # Re-raise if it's not a disposal error
 
-def sanitize_code_for_latex(code):
+# UI event bus flush interval - one batch per animation frame
+UI_EVENT_FRAME_INTERVAL = 1 / 60
+
+# Minimum seconds between pushes for high-volume topics (everything else goes out every frame)
+UI_EVENT_RATE_LIMITS = {
+    'terminal': 1 / 30,
+    'progress': 0.1,
+    'upload': 0.1,
+    'import': 0.1,
+    'job': 0.1,
+    'diagnostics': 0.1,
+}
+
+# JS entry point for pushed batches. If the page hasn't installed window.__manimStudioEvents,
+# 'call' events are still dispatched to the matching window function so every page works.
+UI_EVENT_DISPATCH_JS = (
+    "(window.__manimStudioEvents||function(events){events.forEach(function(e){"
+    "if(e.topic==='call'&&typeof window[e.payload.fn]==='function'){"
+    "window[e.payload.fn].apply(window,e.payload.args)}})})"
+)
+
+class UIEventBus:
     """
-    Remove invisible Unicode characters that cause LaTeX rendering issues.
-
-    These characters (like U+2068 FIRST STRONG ISOLATE) can corrupt LaTeX subscripts
-    and cause them to display as garbled text showing Unicode code points.
-
-    Removes:
-    - U+200B-U+200D: Zero-width spaces
-    - U+200E-U+200F: Text direction marks
-    - U+202A-U+202E: Bidirectional formatting
-    - U+202F: Narrow no-break space
-    - U+2060-U+206F: Invisible operators, FSI, PDI, etc. (includes U+2068!)
-    - U+FEFF: Zero-width no-break space (BOM)
-    - U+00A0: No-break space (convert to regular space)
-    - U+00AD: Soft hyphen
+    Coalescing push channel from Python to the web UI.
+
+    Events are queued from any thread and flushed by a single background thread,
+    at most once per animation frame, as one JSON-encoded evaluate_js call.
+    High-volume topics are rate limited: 'latest' events replace any pending event
+    with the same key, and pull sources (like the terminal) are only read when due.
     """
-    import re
-
-    # First, scan for and log any problematic characters
-    problematic_chars = []
-    for i, char in enumerate(code):
-        code_point = ord(char)
-        if (0x200B <= code_point <= 0x200D or  # Zero-width spaces
-            code_point in (0x200E, 0x200F) or   # LTR/RTL marks
-            0x202A <= code_point <= 0x202E or   # Bidi formatting
-            code_point == 0x202F or              # Narrow no-break space
-            0x2060 <= code_point <= 0x206F or   # Invisible operators including U+2068
-            code_point == 0xFEFF or              # BOM
-            code_point == 0x00AD):               # Soft hyphen
-            # Find context (20 chars before and after)
-            start = max(0, i - 20)
-            end = min(len(code), i + 20)
-            context = code[start:end]
-            context_display = context.replace('\n', '\\n').replace('\r', '\\r')
-            problematic_chars.append({
-                'char': char,
-                'code_point': f'U+{code_point:04X}',
-                'position': i,
-                'context': context_display
-            })
 
-    if problematic_chars:
-        print(f"[LATEX SANITIZE] ⚠️ Found {len(problematic_chars)} invisible Unicode characters:")
-        for item in problematic_chars[:10]:  # Show first 10
-            print(f"  - {item['code_point']} at position {item['position']}")
-            print(f"    Context: ...{item['context']}...")
-
-    # Pattern for all problematic invisible characters
-    invisible_chars_pattern = re.compile(
-        r'[\u200B-\u200D'  # Zero-width spaces
-        r'\u200E\u200F'     # Left-to-right/right-to-left marks
-        r'\u202A-\u202E'    # Bidirectional formatting
-        r'\u202F'           # Narrow no-break space
-        r'\u2060-\u206F'    # Invisible operators, FSI (U+2068), PDI, etc.
-        r'\uFEFF'           # Zero-width no-break space (BOM)
-        r'\u00AD]'          # Soft hyphen
-    )
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._queue = []  # Ordered list of [topic, payload] events
+        self._latest = {}  # (topic, key) -> index into _queue for coalesced events
+        self._sources = {}  # topic -> callable returning a payload or None
+        self._dirty_sources = set()
+        self._last_push = {}  # topic -> time of last push
+        self._thread = None
+
+    def publish(self, topic, payload=None):
+        """Queue a discrete event - every one is delivered, in order"""
+        with self._cond:
+            self._queue.append([topic, payload])
+            self._ensure_thread()
+            self._cond.notify()
+
+    def publish_latest(self, topic, payload=None, key=None):
+        """Queue an event that supersedes any undelivered event with the same topic and key"""
+        with self._cond:
+            slot = (topic, key)
+            index = self._latest.get(slot)
+            if index is not None:
+                self._queue[index][1] = payload
+            else:
+                self._latest[slot] = len(self._queue)
+                self._queue.append([topic, payload])
+            self._ensure_thread()
+            self._cond.notify()
+
+    def call_js(self, fn_name, *args):
+        """Call window.<fn_name>(*args) in the UI without hand-escaping arguments"""
+        self.publish('call', {'fn': fn_name, 'args': list(args)})
+
+    def register_source(self, topic, read_fn):
+        """Register a pull source; read_fn() is called when the topic is notified and due"""
+        with self._cond:
+            self._sources[topic] = read_fn
+            self._dirty_sources.add(topic)
+            self._ensure_thread()
+            self._cond.notify()
+
+    def unregister_source(self, topic):
+        with self._cond:
+            self._sources.pop(topic, None)
+            self._dirty_sources.discard(topic)
+
+    def notify(self, topic):
+        """Tell the bus a pull source has new data"""
+        with self._cond:
+            if topic in self._sources:
+                self._dirty_sources.add(topic)
+                self._cond.notify()
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _is_due(self, topic, now):
+        # Tagged topics ('terminal:render') share the limit of their base topic
+        limit = UI_EVENT_RATE_LIMITS.get(topic.partition(':')[0])
+        return not limit or now - self._last_push.get(topic, 0) >= limit
+
+    def _collect(self, now):
+        """Take everything that is due. Must be called with the lock held."""
+        # Coalesced events that are still rate limited stay queued (in order)
+        deferred = {index: slot for slot, index in self._latest.items()
+                    if not self._is_due(self._queue[index][0], now)}
+        batch = []
+        remaining = []
+        remaining_latest = {}
+        for index, (topic, payload) in enumerate(self._queue):
+            if index in deferred:
+                remaining_latest[deferred[index]] = len(remaining)
+                remaining.append([topic, payload])
+            else:
+                batch.append({'topic': topic, 'payload': payload})
 
-    # Remove invisible characters
-    cleaned = invisible_chars_pattern.sub('', code)
+        for topic in list(self._dirty_sources):
+            if not self._is_due(topic, now):
+                continue
+            self._dirty_sources.discard(topic)
+            try:
+                payload = self._sources[topic]()
+            except Exception as e:
+                print(f"[EVENTS] Source '{topic}' failed: {e}")
+                continue
+            if payload:
+                batch.append({'topic': topic, 'payload': payload})
 
-    # Convert no-break spaces to regular spaces
-    cleaned = cleaned.replace('\u00A0', ' ')
+        for event in batch:
+            self._last_push[event['topic']] = now
+        self._queue = remaining
+        self._latest = remaining_latest
+        return batch
 
-    # Count how many characters were removed for logging
-    removed_count = len(code) - len(cleaned)
-    if removed_count > 0:
-        print(f"[LATEX SANITIZE] ✅ Removed {removed_count} invisible Unicode characters")
-    else:
-        print(f"[LATEX SANITIZE] No invisible characters found in code")
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._dirty_sources:
+                    self._cond.wait()
 
-    return cleaned
+            # Let the frame fill up before flushing
+            time.sleep(UI_EVENT_FRAME_INTERVAL)
 
-def create_manim_config(script_dir):
-    """Create manim.cfg in the script directory for proper asset path configuration"""
-    config_path = os.path.join(script_dir, 'manim.cfg')
+            with self._cond:
+                batch = self._collect(time.time())
 
-    # Use Manim's default template - don't override with custom template
-    # The default template already has proper UTF-8 support
-    config_content = f"""[CLI]
-# Manim Studio Configuration
-assets_dir = {ASSETS_DIR}
-media_dir = {MEDIA_DIR}
-# Unlimited cache - never delete partial movie files
-max_files_cached = -1
-# Ensure UTF-8 input encoding for LaTeX (critical for subscripts!)
-input_file_encoding = utf-8
-"""
-    try:
-        with open(config_path, 'w', encoding='utf-8', newline='\n') as f:
-            f.write(config_content)
-        print(f"[CONFIG] Created manim.cfg at: {config_path}")
-        return True
-    except Exception as e:
-        print(f"[ERROR] Failed to create manim.cfg: {e}")
-        return False
+            if not batch:
+                continue
 
-def clear_preview_folder():
-    """Clear all files in the preview folder before each preview"""
-    import shutil
-    try:
-        if os.path.exists(PREVIEW_DIR):
-            # Remove all contents
-            for item in os.listdir(PREVIEW_DIR):
-                item_path = os.path.join(PREVIEW_DIR, item)
-                try:
-                    if os.path.isfile(item_path) or os.path.islink(item_path):
-                        os.unlink(item_path)
-                    elif os.path.isdir(item_path):
-                        shutil.rmtree(item_path)
-                except Exception as e:
-                    print(f"[WARNING] Failed to delete {item_path}: {e}")
-            print(f"[OK] Cleared preview folder: {PREVIEW_DIR}")
-        else:
-            # Create if doesn't exist
-            os.makedirs(PREVIEW_DIR, exist_ok=True)
-            print(f"[OK] Created preview folder: {PREVIEW_DIR}")
-        return True
-    except Exception as e:
-        print(f"[ERROR] Failed to clear preview folder: {e}")
-        return False
+            window = app_state.get('window')
+            if not window:
+                continue
 
-def clear_render_folder():
-    """Clear all files in the render folder before each render"""
-    import shutil
-    try:
-        if os.path.exists(RENDER_DIR):
-            # Remove all contents
-            for item in os.listdir(RENDER_DIR):
-                item_path = os.path.join(RENDER_DIR, item)
-                try:
-                    if os.path.isfile(item_path) or os.path.islink(item_path):
-                        os.unlink(item_path)
-                    elif os.path.isdir(item_path):
-                        shutil.rmtree(item_path)
-                except Exception as e:
-                    print(f"[WARNING] Failed to delete {item_path}: {e}")
-            print(f"[OK] Cleared render folder: {RENDER_DIR}")
-        else:
-            # Create if doesn't exist
-            os.makedirs(RENDER_DIR, exist_ok=True)
-            print(f"[OK] Created render folder: {RENDER_DIR}")
-        return True
-    except Exception as e:
-        print(f"[ERROR] Failed to clear render folder: {e}")
-        return False
+            try:
+                # ensure_ascii keeps U+2028/U+2029 and friends from breaking the JS literal
+                safe_evaluate_js(window, f'{UI_EVENT_DISPATCH_JS}({json.dumps(batch, ensure_ascii=True)})')
+            except Exception as e:
+                print(f"[EVENTS] Failed to push {len(batch)} event(s): {e}")
 
-def load_settings():
-    """Load settings from file"""
-    settings_file = os.path.join(BASE_DIR, 'settings.json')
-    try:
-        if os.path.exists(settings_file):
-            with open(settings_file, 'r') as f:
-                saved = json.load(f)
-                app_state['settings'].update(saved)
-    except Exception as e:
-        print(f"Error loading settings: {e}")
 
-def save_settings():
-    """Save settings to file"""
-    settings_file = os.path.join(BASE_DIR, 'settings.json')
-    try:
-        with open(settings_file, 'w') as f:
-            json.dump(app_state['settings'], f, indent=2)
-    except Exception as e:
-        print(f"Error saving settings: {e}")
+ui_events = UIEventBus()
+
+# Background jobs for bridge calls that can run for minutes (pip, ffmpeg)
+JOB_WORKERS = 4
+JOB_HISTORY = 50  # Finished jobs kept for get_job() after their final event
+# ManimAPI methods that may be started with start_job() (all can run for seconds to minutes)
+JOB_METHODS = {
+    'get_system_info', 'check_package_dependencies', 'install_package', 'uninstall_package',
+    'update_package', 'check_package_updates', 'trim_video', 'combine_videos', 'build_project'
+}
+
 
-def check_terminal_output_for_errors():
+class JobCancelled(BaseException):
     """
-    Check terminal output buffer for error patterns that indicate manim/python failure.
-    Returns (has_error, error_message) tuple.
+    Raised inside a job's work once cancel_job() has been called. A BaseException so
+    the API methods' `except Exception` error reporting lets it through to JobManager.
     """
-    # Use the persistent error buffer instead of the display buffer
-    # The error buffer doesn't get cleared and keeps accumulating output
-    output = ''.join(app_state['terminal_error_buffer'])
-
-    # Debug: only print buffer size occasionally (reduced spam)
-    # Uncomment for debugging:
-    # print(f"[ERROR CHECK] Error buffer has {len(app_state['terminal_error_buffer'])} items, {len(output)} chars total")
-
-    # Common error patterns - check in order of specificity
-    error_patterns = [
-        'SyntaxError:',
-        'NameError:',
-        'ImportError:',
-        'ModuleNotFoundError:',
-        'AttributeError:',
-        'TypeError:',
-        'ValueError:',
-        'IndentationError:',
-        'Traceback (most recent call last)',
-        'manim.utils.module_ops.SceneNotFound',
-        'FileNotFoundError:',
-        'Exception:'
-    ]
-
-    for pattern in error_patterns:
-        if pattern in output:
-            print(f"[ERROR CHECK] Found error pattern: {pattern}")
-            # Extract error message from the output
-            lines = output.split('\n')
-            error_msg = None
-            for i, line in enumerate(lines):
-                if pattern in line:
-                    # Get this line and the next few lines for context
-                    error_msg = line.strip()
-                    # Get up to 2 more lines for context
-                    for j in range(1, min(3, len(lines) - i)):
-                        next_line = lines[i + j].strip()
-                        if next_line:
-                            error_msg += ' ' + next_line
-                    break
 
-            if not error_msg:
-                error_msg = f"Error detected: {pattern}"
 
-            print(f"[ERROR CHECK] Error message extracted: {error_msg[:100]}")
-            return (True, error_msg[:200])  # Limit error message length
-
-    return (False, None)
+class BackgroundJob:
+    """State of one background job; the running work reports through it"""
+
+    _current = threading.local()
+
+    def __init__(self, job_id, kind):
+        self.job_id = job_id
+        self.kind = kind
+        self.state = 'queued'
+        self.progress = 0.0
+        self.message = ''
+        self.result = None
+        self.created = time.time()
+        self.cancelled = threading.Event()
+        self.finished = threading.Event()
+        self.lock = threading.Lock()
+        self._span = (0.0, 1.0)
+        self._processes = set()
+
+    @classmethod
+    def current(cls):
+        """The job whose work is running on this thread, or None for direct bridge calls"""
+        return getattr(cls._current, 'job', None)
+
+    @classmethod
+    def bind(cls, job):
+        """Make `job` current on this thread (for helper threads a job's work starts)"""
+        cls._current.job = job
+
+    def describe(self):
+        with self.lock:
+            return {
+                'jobId': self.job_id,
+                'kind': self.kind,
+                'state': self.state,
+                'progress': round(self.progress, 4),
+                'message': self.message,
+                'result': self.result
+            }
 
+    def span(self, start, end):
+        """Map subsequent set_progress(0..1) calls onto [start, end] of the whole job"""
+        self._span = (start, end)
+        self.set_progress(0.0)
+
+    def set_progress(self, fraction, message=None):
+        start, end = self._span
+        with self.lock:
+            self.progress = max(self.progress, start + (end - start) * min(max(fraction, 0.0), 1.0))
+            if message is not None:
+                self.message = message
+        job_manager.publish(self)
+
+    def check_cancelled(self):
+        if self.cancelled.is_set():
+            raise JobCancelled('Cancelled')
+
+    def cancel(self):
+        self.cancelled.set()
+        with self.lock:
+            processes = list(self._processes)
+        for process in processes:
+            self._terminate(process)
+
+    def popen(self, cmd, **kwargs):
+        """Popen whose process tree is terminated if the job is cancelled"""
+        self.check_cancelled()
+        if os.name == 'nt':
+            kwargs['creationflags'] = kwargs.get('creationflags', 0) | subprocess.CREATE_NEW_PROCESS_GROUP
+        else:
+            kwargs['start_new_session'] = True  # Own process group, so pip's build helpers go too
+        process = subprocess.Popen(cmd, **kwargs)
+        with self.lock:
+            self._processes.add(process)
+        if self.cancelled.is_set():
+            self._terminate(process)
+        return process
+
+    @staticmethod
+    def _terminate(process):
+        if process.poll() is not None:
+            return
+        try:
+            if os.name == 'nt':
+                subprocess.run(['taskkill', '/T', '/F', '/PID', str(process.pid)],
+                               capture_output=True, creationflags=subprocess.CREATE_NO_WINDOW)
+            else:
+                import signal
+                os.killpg(process.pid, signal.SIGTERM)
+        except OSError:
+            pass
 
-def extract_scene_name(code):
-    """
-    Extract the scene class name from code by dynamically importing it.
-    This approach matches manim's own scene detection using inspect module.
-    Works with any Scene subclass regardless of name or inheritance chain.
-    """
-    import inspect
-    import importlib.util
-    import sys
+    def release(self, process):
+        with self.lock:
+            self._processes.discard(process)
+        self.check_cancelled()
 
-    temp_module_name = None
-    try:
-        # Create a temporary module from the code
-        temp_module_name = f"_temp_manim_scene_{int(time.time() * 1000000)}"
-        spec = importlib.util.spec_from_loader(temp_module_name, loader=None)
-        if spec is None:
-            # Fallback to regex if module creation fails
-            match = re.search(r'class\s+(\w+)\s*\([^)]*\):', code)
-            return match.group(1) if match else None
 
-        temp_module = importlib.util.module_from_spec(spec)
-        sys.modules[temp_module_name] = temp_module
+class JobManager:
+    """
+    Bounded pool for long-running ManimAPI calls.
 
-        # Execute the code in the module's namespace
-        exec(code, temp_module.__dict__)
+    start_job() hands the call to the pool and returns a job ID straight away, so the
+    pywebview bridge thread is never held by pip or ffmpeg. The work reports progress
+    through BackgroundJob.current(); state changes go out as a coalesced 'job' event per
+    job, and the final event carries the method's normal result dict.
+    """
 
-        # Find all Scene subclasses in the module
-        # Import Scene from manim to check inheritance
+    def __init__(self, workers=JOB_WORKERS):
+        from concurrent.futures import ThreadPoolExecutor
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='job')
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, kind, fn, *args):
+        """Run fn(*args) in the pool; returns the job"""
+        import uuid
+        job = BackgroundJob(uuid.uuid4().hex[:12], kind)
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._prune()
+        self.publish(job)
+        self._pool.submit(self._run, job, fn, args)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            raise KeyError(f'Unknown job: {job_id}')
+        return job
+
+    def list(self):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [job.describe() for job in sorted(jobs, key=lambda j: j.created)]
+
+    def cancel(self, job_id):
+        self.get(job_id).cancel()
+
+    def _run(self, job, fn, args):
+        if job.cancelled.is_set():
+            self._finish(job, 'cancelled', {'status': 'error', 'message': 'Cancelled'})
+            return
+        with job.lock:
+            job.state = 'running'
+        self.publish(job)
+        BackgroundJob.bind(job)
+        started = time.time()
         try:
-            from manim import Scene
+            result = fn(*args)
+            state = 'cancelled' if job.cancelled.is_set() else 'done'
+        except JobCancelled:
+            result, state = {'status': 'error', 'message': 'Cancelled'}, 'cancelled'
+        except Exception as e:
+            print(f"[JOB ERROR] {job.kind} {job.job_id}: {e}")
+            traceback.print_exc()
+            result, state = {'status': 'error', 'message': str(e)}, 'error'
+        finally:
+            BackgroundJob.bind(None)
+        print(f"[JOB] {job.kind} {job.job_id} {state} in {time.time() - started:.1f}s")
+        self._finish(job, state, result)
 
-            scene_classes = []
-            for name, obj in inspect.getmembers(temp_module, inspect.isclass):
-                # Check if it's a Scene subclass but not Scene itself
-                try:
-                    if obj != Scene and issubclass(obj, Scene):
-                        # Check if it's defined in this module (not imported)
-                        if obj.__module__ == temp_module_name:
-                            scene_classes.append(name)
-                except TypeError:
-                    # issubclass can raise TypeError if obj is not a class
-                    continue
+    def _finish(self, job, state, result):
+        with job.lock:
+            job.state = state
+            job.result = result
+            if state == 'done':
+                job.progress = 1.0
+        self.publish(job)
+        job.finished.set()
 
-            # Return the first scene class found
-            return scene_classes[0] if scene_classes else None
+    def _prune(self):
+        finished = sorted((j for j in self._jobs.values() if j.finished.is_set()), key=lambda j: j.created)
+        for job in finished[:max(0, len(finished) - JOB_HISTORY)]:
+            del self._jobs[job.job_id]
 
-        except ImportError:
-            # If manim is not available, fall back to regex
-            print("[WARNING] Manim not available for scene detection, using regex fallback")
-            match = re.search(r'class\s+(\w+)\s*\([^)]*\):', code)
-            return match.group(1) if match else None
-
-    except SyntaxError as e:
-        # Code has syntax errors - can't execute it
-        print(f"[WARNING] Syntax error in code, using regex fallback: {e}")
-        # Try regex as last resort
-        match = re.search(r'class\s+(\w+)\s*\([^)]*\):', code)
-        return match.group(1) if match else None
+    @staticmethod
+    def publish(job):
+        ui_events.publish_latest('job', job.describe(), key=job.job_id)
 
-    except Exception as e:
-        print(f"[WARNING] Scene detection via import failed: {e}")
-        # Fallback to simple regex that captures any class definition
-        match = re.search(r'class\s+(\w+)\s*\([^)]*\):', code)
-        return match.group(1) if match else None
 
-    finally:
-        # Always clean up temporary module
-        if temp_module_name and temp_module_name in sys.modules:
-            try:
-                del sys.modules[temp_module_name]
-            except:
-                pass
+job_manager = JobManager()
 
-class ManimAPI:
+
+def report_job_progress(fraction, message=None):
     """
-    API class that exposes Python functions to JavaScript
-    All methods in this class can be called from JS using: pywebview.api.method_name()
+    Progress for the job running on this thread (no-op for direct bridge calls).
+    Doubles as a cancellation point: raises JobCancelled once the job is cancelled.
     """
+    job = BackgroundJob.current()
+    if job is not None:
+        job.set_progress(fraction, message)
+        job.check_cancelled()
 
-    def __init__(self):
+
+def set_job_span(start, end):
+    """Scale the current job's upcoming progress into [start, end]; no-op outside jobs"""
+    job = BackgroundJob.current()
+    if job is not None:
+        job.span(start, end)
+
+
+def run_cancellable(cmd, timeout=None, **kwargs):
+    """
+    subprocess.run(cmd, capture_output=True, text=True, ...) that is terminated when the
+    current background job is cancelled (raising JobCancelled).
+    """
+    job = BackgroundJob.current()
+    if job is None:
+        return subprocess.run(cmd, capture_output=True, text=True, timeout=timeout, **kwargs)
+    process = job.popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, **kwargs)
+    try:
+        stdout, stderr = process.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        job._terminate(process)  # The whole group - pip's build helpers would hold the pipes open
+        try:
+            process.communicate(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+        raise
+    finally:
+        job.release(process)
+    return subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr)
+
+# Extensions mimetypes doesn't know (or gets wrong) on some platforms
+ASSET_MIME_TYPES = {
+    '.mp4': 'video/mp4',
+    '.m4v': 'video/mp4',
+    '.mov': 'video/quicktime',
+    '.webm': 'video/webm',
+    '.mkv': 'video/x-matroska',
+    '.avi': 'video/x-msvideo',
+    '.png': 'image/png',
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.gif': 'image/gif',
+    '.webp': 'image/webp',
+    '.svg': 'image/svg+xml',
+    '.mp3': 'audio/mpeg',
+    '.wav': 'audio/wav',
+    '.ogg': 'audio/ogg',
+    '.m4a': 'audio/mp4',
+    '.aac': 'audio/aac',
+    '.flac': 'audio/flac',
+    '.ttf': 'font/ttf',
+    '.otf': 'font/otf',
+    '.woff': 'font/woff',
+    '.woff2': 'font/woff2',
+    '.vtt': 'text/vtt',
+    '.srt': 'text/plain; charset=utf-8',
+    '.json': 'application/json',
+    '.html': 'text/html; charset=utf-8',
+    '.js': 'text/javascript; charset=utf-8',
+    '.css': 'text/css; charset=utf-8'
+}
+
+def guess_mime_type(file_path):
+    """MIME type for serving a file"""
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext in ASSET_MIME_TYPES:
+        return ASSET_MIME_TYPES[ext]
+    mime_type, _ = mimetypes.guess_type(file_path)
+    return mime_type or 'application/octet-stream'
+
+
+def parse_byte_range(header, size):
+    """
+    Parse a single-range 'Range: bytes=...' header for a file of the given size.
+    Returns (start, end) inclusive, None if the range can't be satisfied,
+    or False if the header should be ignored (malformed or multi-range -> full response).
+    """
+    match = re.fullmatch(r'\s*bytes\s*=\s*(\d*)\s*-\s*(\d*)\s*', header)
+    if not match or not (match.group(1) or match.group(2)):
+        return False
+
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = int(last) if last else size - 1
+        if start >= size:
+            return None
+        if end < start:
+            return False
+        return (start, min(end, size - 1))
+
+    # Suffix range: the last N bytes
+    suffix = int(last)
+    if suffix == 0 or size == 0:
+        return None
+    return (max(0, size - suffix), size - 1)
+
+
+class AssetRequestHandler(http.server.BaseHTTPRequestHandler):
+    """Serves files for AssetServer - GET/HEAD with Range, ETag and Last-Modified support"""
+
+    protocol_version = 'HTTP/1.1'  # Keep-alive: video elements issue many range requests
+    server_version = 'ManimStudioAssets/1.0'
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def do_OPTIONS(self):
+        self.send_response(204)
+        self._send_cors_headers()
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass  # Range requests are far too chatty for the console
+
+    def _send_cors_headers(self):
+        # The UI is served from pywebview's own origin; fonts and fetch() need CORS
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Headers', 'Range, If-None-Match, If-Modified-Since, If-Range')
+        self.send_header('Access-Control-Expose-Headers', 'Content-Length, Content-Range, Accept-Ranges, ETag')
+
+    def _send_status(self, code, extra_headers=None):
+        self.send_response(code)
+        self._send_cors_headers()
+        for key, value in (extra_headers or {}).items():
+            self.send_header(key, value)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def _serve(self, send_body):
+        file_path = self.server.asset_server.resolve(self.path)
+        try:
+            st = os.stat(file_path) if file_path else None
+        except OSError:
+            st = None
+        if st is None or not os.path.isfile(file_path):
+            self._send_status(404)
+            return
+
+        size = st.st_size
+        etag = f'"{st.st_mtime_ns:x}-{size:x}"'
+        validators = {
+            'ETag': etag,
+            'Last-Modified': email.utils.formatdate(st.st_mtime, usegmt=True),
+            'Cache-Control': 'no-cache'  # Renders overwrite files in place - always revalidate
+        }
+
+        if self._not_modified(etag, st.st_mtime):
+            self._send_status(304, validators)
+            return
+
+        status = 200
+        start, end = 0, size - 1
+        range_header = self.headers.get('Range')
+        if range_header and self._if_range_matches(etag, st.st_mtime):
+            byte_range = parse_byte_range(range_header, size)
+            if byte_range is None:
+                self._send_status(416, {'Content-Range': f'bytes */{size}'})
+                return
+            if byte_range:
+                start, end = byte_range
+                status = 206
+
+        length = max(0, end - start + 1)
+        self.send_response(status)
+        self._send_cors_headers()
+        self.send_header('Content-Type', guess_mime_type(file_path))
+        self.send_header('Content-Length', str(length))
+        self.send_header('Accept-Ranges', 'bytes')
+        for key, value in validators.items():
+            self.send_header(key, value)
+        if status == 206:
+            self.send_header('Content-Range', f'bytes {start}-{end}/{size}')
+        self.end_headers()
+
+        if send_body and length:
+            try:
+                with open(file_path, 'rb') as f:
+                    # Zero-copy where the OS supports it, plain send() otherwise - never the whole file in memory
+                    self.connection.sendfile(f, start, length)
+            except (ConnectionError, TimeoutError):
+                # Seeking aborts the previous request - perfectly normal for video
+                self.close_connection = True
+
+    def _not_modified(self, etag, mtime):
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match:
+            tags = [tag.strip() for tag in if_none_match.split(',')]
+            return '*' in tags or etag in tags or f'W/{etag}' in tags
+        return self._not_newer_than(self.headers.get('If-Modified-Since'), mtime)
+
+    def _if_range_matches(self, etag, mtime):
+        if_range = self.headers.get('If-Range')
+        if not if_range:
+            return True
+        if if_range.strip().startswith('"'):
+            return if_range.strip() == etag
+        return self._not_newer_than(if_range, mtime)
+
+    @staticmethod
+    def _not_newer_than(http_date, mtime):
+        if not http_date:
+            return False
+        try:
+            return int(mtime) <= email.utils.parsedate_to_datetime(http_date).timestamp()
+        except (TypeError, ValueError, IndexError, OverflowError):
+            return False
+
+
+class AssetServer:
+    """
+    Localhost HTTP server for assets, renders and previews.
+
+    The frontend gets URLs instead of base64 blobs over the bridge, so files are streamed
+    from disk, video seeking uses Range requests and the browser can revalidate with
+    ETag/Last-Modified. URLs look like http://127.0.0.1:<port>/<token>/<root>/<path>; the
+    random token keeps other local processes and web pages from browsing the user's files.
+    """
+
+    def __init__(self):
+        import secrets
+        self.token = secrets.token_urlsafe(16)
+        self._roots = {}  # name -> absolute directory
+        self._files = {}  # id -> single file outside every root that was explicitly shared
+        self._lock = threading.Lock()
+        self._server = None
+
+    def add_root(self, name, directory):
+        self._roots[name] = os.path.realpath(directory)
+
+    def start(self):
+        """Start serving (idempotent) - binds a free port on 127.0.0.1"""
+        with self._lock:
+            if self._server is not None:
+                return
+            server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), AssetRequestHandler)
+            server.daemon_threads = True
+            server.asset_server = self
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            self._server = server
+        print(f"[ASSET SERVER] Serving on http://127.0.0.1:{self.port}")
+
+    @property
+    def port(self):
+        return self._server.server_address[1] if self._server else None
+
+    @property
+    def base_url(self):
+        self.start()
+        return f'http://127.0.0.1:{self.port}/{self.token}'
+
+    def owns_url(self, url):
+        return self._server is not None and url.startswith(self.base_url + '/')
+
+    def url_for(self, file_path):
+        """URL for a file. Files outside the served folders are shared individually."""
+        from urllib.parse import quote
+        real = os.path.realpath(file_path)
+        try:
+            # Changes whenever the file does, so caches never serve a stale render under the same name
+            version = f'?v={os.stat(real).st_mtime_ns:x}'
+        except OSError:
+            version = ''
+
+        # Longest root first so nested roots win
+        for name, root in sorted(self._roots.items(), key=lambda item: -len(item[1])):
+            if self._is_within(root, real):
+                relative = os.path.relpath(real, root).replace(os.sep, '/')
+                return f'{self.base_url}/{name}/{quote(relative)}{version}'
+
+        file_id = hashlib.sha1(os.path.normcase(real).encode('utf-8')).hexdigest()[:16]
+        with self._lock:
+            self._files[file_id] = real
+        return f'{self.base_url}/file/{file_id}/{quote(os.path.basename(real))}{version}'
+
+    def resolve(self, request_path):
+        """Filesystem path for a request path, or None if it isn't ours to serve"""
+        import secrets
+        from urllib.parse import urlsplit, unquote
+        parts = urlsplit(request_path).path.lstrip('/').split('/', 2)
+        if len(parts) < 3 or not secrets.compare_digest(parts[0], self.token):
+            return None
+
+        name, relative = parts[1], unquote(parts[2])
+        if name == 'file':
+            return self._files.get(relative.split('/', 1)[0])
+
+        root = self._roots.get(name)
+        if root is None:
+            return None
+        real = os.path.realpath(os.path.join(root, relative))
+        # No escaping the root with '..' or symlinks
+        return real if self._is_within(root, real) else None
+
+    @staticmethod
+    def _is_within(root, path):
+        root = os.path.normcase(root)
+        path = os.path.normcase(path)
+        return path == root or path.startswith(root.rstrip(os.sep) + os.sep)
+
+
+asset_server = AssetServer()
+asset_server.add_root('assets', ASSETS_DIR)
+asset_server.add_root('render', RENDER_DIR)
+asset_server.add_root('preview', PREVIEW_DIR)
+asset_server.add_root('media', MEDIA_DIR)
+asset_server.add_root('web', os.path.join(BASE_DIR, 'web'))  # video_fullscreen.html
+
+SERVING_CACHE_DIR = os.path.join(USER_DATA_DIR, 'serving_cache')
+SERVING_CACHE_BUDGET = 2 * 1024 * 1024 * 1024  # Bytes of real copies kept; hard links cost nothing
+SERVING_CACHE_MAX_ENTRIES = 500  # Links are free on disk but still pile up - cap them by count
+SERVING_CACHE_MAX_AGE = 7 * 24 * 60 * 60  # ...and drop anything not viewed for a week
+
+
+class ServingCache:
+    """
+    Stable snapshots of files handed to the UI.
+
+    Renders overwrite files in place and the preview folder is emptied before each
+    preview, so a player can lose its file mid-playback. An entry is keyed by
+    path + mtime + size: a repeat view of an unchanged file is a lookup, and a changed
+    file gets a new entry. Entries are hard links where the filesystem allows it
+    (no bytes copied) and copies otherwise. A link keeps the data when the original is
+    deleted or replaced by a new file, but shares an in-place rewrite - that changes the
+    mtime/size, so the next view gets a fresh entry. Copies - and links whose original
+    is gone - count against the size budget and are evicted least recently used first;
+    every entry also goes once it is too old or there are too many.
+    """
+
+    def __init__(self, directory, budget, max_entries=SERVING_CACHE_MAX_ENTRIES, max_age=SERVING_CACHE_MAX_AGE):
+        self.directory = directory
+        self.budget = budget
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._last_used = {}  # entry path -> last access time (mtime can't be used: links share it)
+        self._legacy_cleaned = False
+
+    def get(self, file_path):
+        """Path of the cached entry for file_path, creating it if needed"""
+        import shutil
+        st = os.stat(file_path)
+        real = os.path.realpath(file_path)
+        key = hashlib.sha1(f'{os.path.normcase(real)}\0{st.st_mtime_ns}\0{st.st_size}'.encode('utf-8')).hexdigest()[:20]
+        entry = os.path.join(self.directory, key + os.path.splitext(real)[1].lower())
+
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            self._remove_legacy_temp_assets()
+            self._last_used[entry] = time.time()
+            if os.path.exists(entry):
+                return entry
+
+            tmp_path = f'{entry}.{os.getpid()}.tmp'
+            try:
+                try:
+                    os.link(real, tmp_path)
+                    linked = True
+                except OSError:
+                    # Different volume or no hard link support
+                    shutil.copyfile(real, tmp_path)
+                    linked = False
+                os.replace(tmp_path, entry)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+            print(f"[SERVING CACHE] {'Linked' if linked else 'Copied'} {os.path.basename(real)} -> {os.path.basename(entry)}")
+            self._evict(keep=entry)
+            return entry
+
+    def _evict(self, keep):
+        """Drop least recently used entries until the unshared bytes, count and age fit the limits"""
+        entries = []
+        used = 0
+        expired = time.time() - self.max_age
+        for item in os.scandir(self.directory):
+            try:
+                st = item.stat()
+            except OSError:
+                continue
+            if not item.is_file():
+                continue
+            # A link still shared with a live file takes no extra space
+            cost = st.st_size if st.st_nlink <= 1 else 0
+            used += cost
+            # Entries from earlier sessions fall back to the file's own mtime
+            entries.append((self._last_used.get(item.path, st.st_mtime), cost, item.path))
+
+        count = len(entries)
+        for last_used, cost, path in sorted(entries):
+            if used <= self.budget and count <= self.max_entries and last_used >= expired:
+                break
+            if path == keep or (not cost and count <= self.max_entries and last_used >= expired):
+                continue
+            try:
+                os.remove(path)
+                used -= cost
+                count -= 1
+                self._last_used.pop(path, None)
+            except OSError:
+                pass  # Still open by a player on Windows - try again next time
+
+    def _remove_legacy_temp_assets(self):
+        # Older versions copied every viewed file into web/temp_assets next to the app
+        if self._legacy_cleaned:
+            return
+        self._legacy_cleaned = True
+        import shutil
+        legacy_dir = os.path.join(BASE_DIR, 'web', 'temp_assets')
+        if os.path.isdir(legacy_dir):
+            shutil.rmtree(legacy_dir, ignore_errors=True)
+            print(f"[SERVING CACHE] Removed legacy {legacy_dir}")
+
+
+serving_cache = ServingCache(SERVING_CACHE_DIR, SERVING_CACHE_BUDGET)
+asset_server.add_root('cache', SERVING_CACHE_DIR)
+
+BLOB_STORE_DIR = os.path.join(USER_DATA_DIR, 'blobs')
+BLOB_HASH_CHUNK = 1024 * 1024
+FICLONE = 0x40049409  # Linux ioctl: share extents with another file (btrfs, XFS, bcachefs)
+
+
+def file_sha256(file_path, on_progress=None):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(BLOB_HASH_CHUNK), b''):
+            digest.update(block)
+            if on_progress:
+                on_progress(len(block))
+    return digest.hexdigest()
+
+
+def fast_copy(src_path, dst_path):
+    """
+    Copy file contents the cheapest way available: a reflink (no data copied at all),
+    then copy_file_range (copied inside the kernel), then shutil's platform fast path.
+    Returns the method used.
+    """
+    import shutil
+    if sys.platform.startswith('linux'):
+        import fcntl
+        with open(src_path, 'rb') as src, open(dst_path, 'wb') as dst:
+            try:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+                return 'reflink'
+            except OSError:
+                pass
+            try:
+                remaining = os.fstat(src.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(src.fileno(), dst.fileno(), min(remaining, 1 << 30))
+                    if not copied:
+                        break
+                    remaining -= copied
+                if remaining == 0:
+                    return 'copy_file_range'
+            except OSError:
+                pass  # Cross-filesystem on old kernels, or unsupported
+    shutil.copyfile(src_path, dst_path)
+    return 'copy'
+
+
+def sync_files(paths):
+    """fsync files, then (POSIX) their directories once each, so renames are durable too"""
+    directories = set()
+    for path in paths:
+        try:
+            with open(path, 'rb') as f:
+                os.fsync(f.fileno())
+            directories.add(os.path.dirname(path))
+        except OSError:
+            pass
+    if os.name == 'posix':
+        for directory in directories:
+            try:
+                fd = os.open(directory, os.O_RDONLY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+            except OSError:
+                pass
+
+
+
+class BlobStore:
+    """
+    Content-addressed storage behind ASSETS_DIR.
+
+    Ingested files are hashed (SHA-256) while they are copied into blobs/<aa>/<hash>,
+    and scenes keep loading assets by the file name they see in ASSETS_DIR. The first
+    name for a blob is a hard link to it. Further names with the same content are
+    reflinked (copy-on-write, no data copied on btrfs/XFS/APFS-style filesystems) or
+    copied - never hard-linked to each other, so an in-place edit of one asset can't
+    change its duplicates. Under the same name, identical content is simply recognised
+    as the file that is already there. A small SQLite table records which names
+    reference which blob; blobs nobody references any more are garbage-collected.
+    Where hard links aren't possible the file is copied and still tracked.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._lock = threading.RLock()
+        self._conn = None
+
+    def _db(self):
+        if self._conn is None:
+            import sqlite3
+            os.makedirs(self.directory, exist_ok=True)
+            conn = sqlite3.connect(os.path.join(self.directory, 'index.sqlite3'), check_same_thread=False)
+            conn.executescript('''
+                PRAGMA journal_mode = WAL;
+                CREATE TABLE IF NOT EXISTS blobs (
+                    sha256 TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL  -- Changes if someone writes into a linked file in place
+                );
+                CREATE TABLE IF NOT EXISTS refs (
+                    path TEXT PRIMARY KEY,
+                    sha256 TEXT NOT NULL,
+                    ino INTEGER NOT NULL,  -- The visible file as ingested, to notice replacements and edits
+                    mtime_ns INTEGER NOT NULL,
+                    size INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS refs_by_blob ON refs (sha256);
+            ''')
+            self._conn = conn
+        return self._conn
+
+    def blob_path(self, sha256):
+        return os.path.join(self.directory, sha256[:2], sha256)
+
+    def ingest(self, src_path, filename=None, move=False, sha256=None, sync=True, on_progress=None):
+        """
+        Add a file to ASSETS_DIR under filename (default: its own name).
+        move=True consumes src_path (staged uploads); a known sha256 skips hashing it.
+        sync=False leaves fsync to the caller (bulk imports batch it); on_progress(bytes)
+        is called while hashing. Returns (dest_path, sha256, deduplicated).
+        """
+        filename = filename or os.path.basename(src_path)
+        os.makedirs(ASSETS_DIR, exist_ok=True)
+        if sha256 is None:
+            # Hash before copying: content that is already stored is never copied at all
+            sha256 = file_sha256(src_path, on_progress)
+
+        with self._lock:
+            deduplicated = self._valid_blob(sha256)
+        if not deduplicated:
+            deduplicated = self._store(src_path, sha256, move, sync)
+        elif move:
+            os.remove(src_path)
+
+        with self._lock:
+            # Same name, same content: it's already there
+            existing = os.path.join(ASSETS_DIR, filename)
+            if self.content_hash(existing) == sha256:
+                return existing, sha256, True
+
+            blob = self.blob_path(sha256)
+            # Hard-link only a blob no visible name shares yet; duplicates get their own inode
+            link = os.stat(blob).st_nlink <= 1
+            names = asset_name_candidates(filename)
+            filename = next(names)
+            while True:
+                dest_path = os.path.join(ASSETS_DIR, filename)
+                try:
+                    if link:
+                        os.link(blob, dest_path)
+                    else:
+                        self._place_copy(blob, dest_path)
+                    break
+                except FileExistsError:
+                    filename = next(names)  # Taken (maybe just now, by another import)
+                except OSError as e:
+                    if not link or not link_unsupported(e):
+                        raise
+                    link = False  # FAT/exFAT or another volume: copy to the same name instead
+            st = os.stat(dest_path)
+            self._db().execute('INSERT OR REPLACE INTO refs (path, sha256, ino, mtime_ns, size) VALUES (?, ?, ?, ?, ?)',
+                               (self._ref_key(dest_path), sha256, st.st_ino, st.st_mtime_ns, st.st_size))
+            self._db().commit()
+
+        print(f"[BLOBS] {filename} -> {sha256[:12]}{' (deduplicated)' if deduplicated else ''}")
+        return dest_path, sha256, deduplicated
+
+    def ingest_bytes(self, data, filename):
+        """ingest() for content already in memory"""
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        return self.ingest(tmp_path, filename, move=True, sha256=hashlib.sha256(data).hexdigest())
+
+    def content_hash(self, path):
+        """SHA-256 of an ingested asset, or None if it isn't (still) the ingested content"""
+        with self._lock:
+            row = self._db().execute('SELECT sha256, ino, mtime_ns, size FROM refs WHERE path = ?',
+                                     (self._ref_key(path),)).fetchone()
+        if not row:
+            return None
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return row[0] if (st.st_ino, st.st_mtime_ns, st.st_size) == tuple(row[1:]) else None
+
+    def collect_garbage(self):
+        """Drop references to files that were deleted or replaced, then blobs nothing references"""
+        removed = 0
+        with self._lock:
+            db = self._db()
+            for path, sha256 in db.execute('SELECT path, sha256 FROM refs').fetchall():
+                if self.content_hash(path) != sha256:
+                    db.execute('DELETE FROM refs WHERE path = ?', (path,))
+            for (sha256,) in db.execute('SELECT sha256 FROM blobs WHERE sha256 NOT IN '
+                                        '(SELECT sha256 FROM refs)').fetchall():
+                try:
+                    os.remove(self.blob_path(sha256))
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    print(f"[BLOBS] Could not remove blob {sha256[:12]}: {e}")
+                    continue
+                db.execute('DELETE FROM blobs WHERE sha256 = ?', (sha256,))
+                removed += 1
+            db.commit()
+        if removed:
+            print(f"[BLOBS] Garbage-collected {removed} unreferenced blob(s)")
+        return removed
+
+    def collect_garbage_async(self):
+        threading.Thread(target=self.collect_garbage, daemon=True).start()
+
+    def _store(self, src_path, sha256, move, sync):
+        """Put new content into the store. Returns True if another thread stored it first."""
+        import shutil
+        blob = self.blob_path(sha256)
+        os.makedirs(os.path.dirname(blob), exist_ok=True)
+        if move:
+            tmp_path = src_path
+        else:
+            # Copy outside the lock so parallel imports don't wait on each other
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(blob), suffix='.tmp')
+            os.close(fd)
+            try:
+                fast_copy(src_path, tmp_path)
+                shutil.copystat(src_path, tmp_path)  # Keep the original modification time
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+        if sync:
+            sync_files([tmp_path])
+
+        with self._lock:
+            if self._valid_blob(sha256):
+                os.remove(tmp_path)
+                return True
+            shutil.move(tmp_path, blob)
+            st = os.stat(blob)
+            self._db().execute('INSERT OR REPLACE INTO blobs (sha256, size, mtime_ns) VALUES (?, ?, ?)',
+                               (sha256, st.st_size, st.st_mtime_ns))
+            self._db().commit()
+        return False
+
+    @staticmethod
+    def _place_copy(blob, dest_path):
+        """Claim dest_path (FileExistsError if taken) and fill it with a reflink or copy of blob"""
+        import shutil
+        os.close(os.open(dest_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        os.makedirs(UPLOAD_STAGING_DIR, exist_ok=True)  # Same volume as ASSETS_DIR, not indexed
+        fd, tmp_path = tempfile.mkstemp(dir=UPLOAD_STAGING_DIR, suffix='.tmp')
+        os.close(fd)
+        try:
+            fast_copy(blob, tmp_path)
+            shutil.copystat(blob, tmp_path)
+            os.replace(tmp_path, dest_path)  # Onto the placeholder we created, nobody else's file
+        except BaseException:
+            for path in (tmp_path, dest_path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            raise
+
+    def _valid_blob(self, sha256):
+        """Blob exists and hasn't been modified through one of its links"""
+        row = self._db().execute('SELECT size, mtime_ns FROM blobs WHERE sha256 = ?', (sha256,)).fetchone()
+        try:
+            st = os.stat(self.blob_path(sha256))
+        except OSError:
+            return False
+        if row and (st.st_size, st.st_mtime_ns) == tuple(row):
+            return True
+        # Edited in place: the inode no longer holds this content. Detach it from the store;
+        # the visible files keep their (new) content, they just aren't deduplicated any more.
+        os.remove(self.blob_path(sha256))
+        return False
+
+    @staticmethod
+    def _ref_key(path):
+        return os.path.normcase(os.path.realpath(path))
+
+
+blob_store = BlobStore(BLOB_STORE_DIR)
+
+ASSET_IMPORT_WORKERS = 4
+ASSET_IMPORT_HISTORY = 20  # Finished imports kept for get() after their final event
+
+
+class AssetImportJob:
+    """State of one bulk import, shared by its worker threads"""
+
+    def __init__(self, job_id, files):
+        self.job_id = job_id
+        self.files = files  # [(path, size)]
+        self.bytes_total = sum(size for _, size in files)
+        self.bytes_done = 0
+        self.imported = []
+        self.errors = []
+        self.state = 'running'
+        self.created = time.time()
+        self.cancelled = threading.Event()
+        self.finished = threading.Event()
+        self.lock = threading.Lock()
+
+    def describe(self):
+        with self.lock:
+            return {
+                'jobId': self.job_id,
+                'state': self.state,
+                'total': len(self.files),
+                'done': len(self.imported) + len(self.errors),
+                'importedCount': len(self.imported),
+                'errors': list(self.errors),
+                'bytesTotal': self.bytes_total,
+                'bytesDone': self.bytes_done
+            }
+
+
+class AssetImporter:
+    """
+    Bulk import of files and folders into the assets library.
+
+    Files are ingested through the blob store by a small thread pool: each one is hashed
+    (already-stored content is never copied), then copied with a reflink or
+    copy_file_range where the platform has them. fsync is done once for the whole batch
+    instead of per file. Progress is pushed as a coalesced 'import' event and every file's
+    outcome as an 'import_file' event, so the bridge call returns immediately.
+    """
+
+    def __init__(self, workers=ASSET_IMPORT_WORKERS):
+        self.workers = workers
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def start(self, paths):
+        """Queue paths (files or folders) for import; returns the job"""
+        import uuid
+        job = AssetImportJob(uuid.uuid4().hex[:12], self._expand(paths))
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._prune()
+        threading.Thread(target=self._run, args=(job,), daemon=True).start()
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            raise KeyError(f'Unknown import: {job_id}')
+        return job
+
+    def cancel(self, job_id):
+        self.get(job_id).cancelled.set()
+
+    def _prune(self):
+        finished = sorted((j for j in self._jobs.values() if j.finished.is_set()), key=lambda j: j.created)
+        for job in finished[:max(0, len(finished) - ASSET_IMPORT_HISTORY)]:
+            del self._jobs[job.job_id]
+
+    @staticmethod
+    def _expand(paths):
+        """Files to import as (path, size): folders are walked, hidden files skipped"""
+        files = []
+        for path in paths or []:
+            if os.path.isdir(path):
+                for root, dirs, names in os.walk(path):
+                    dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+                    for name in sorted(names):
+                        if not name.startswith('.'):
+                            full_path = os.path.join(root, name)
+                            try:
+                                files.append((full_path, os.path.getsize(full_path)))
+                            except OSError:
+                                pass
+            else:
+                try:
+                    files.append((path, os.path.getsize(path)))
+                except OSError:
+                    files.append((path, 0))  # Reported as an error by the worker
+        return files
+
+    def _run(self, job):
+        from concurrent.futures import ThreadPoolExecutor
+        print(f"[IMPORT] Job {job.job_id}: {len(job.files)} file(s), {job.bytes_total} bytes")
+        self._publish(job)
+        new_blobs = []
+        dest_paths = []
+
+        def import_one(item):
+            path, size = item
+            if job.cancelled.is_set():
+                return
+
+            def on_progress(count):
+                with job.lock:
+                    job.bytes_done += count
+                self._publish(job)
+
+            try:
+                if not os.path.isfile(path):
+                    raise FileNotFoundError('File not found')
+                dest_path, sha256, deduplicated = blob_store.ingest(path, sync=False, on_progress=on_progress)
+                with job.lock:
+                    job.imported.append(os.path.basename(dest_path))
+                    dest_paths.append(dest_path)
+                    if not deduplicated:
+                        new_blobs.append(blob_store.blob_path(sha256))
+                ui_events.publish('import_file', {'jobId': job.job_id, 'file': path, 'status': 'success',
+                                                  'filename': os.path.basename(dest_path),
+                                                  'deduplicated': deduplicated})
+            except Exception as e:
+                with job.lock:
+                    job.errors.append({'file': os.path.basename(path), 'error': str(e)})
+                print(f"[IMPORT ERROR] {path}: {e}")
+                ui_events.publish('import_file', {'jobId': job.job_id, 'file': path, 'status': 'error',
+                                                  'error': str(e)})
+            self._publish(job)
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='import') as pool:
+            list(pool.map(import_one, job.files))
+
+        # One durability pass for the whole batch - the new blobs plus the ASSETS_DIR
+        # entries pointing at them (sync_files fsyncs both directories once)
+        sync_files(new_blobs + dest_paths)
+        asset_index.refresh_paths(dest_paths)
+
+        with job.lock:
+            job.state = 'cancelled' if job.cancelled.is_set() else 'done'
+        print(f"[IMPORT] Job {job.job_id} {job.state}: {len(job.imported)} imported, {len(job.errors)} failed")
+        self._publish(job)
+        job.finished.set()
+
+    @staticmethod
+    def _publish(job):
+        ui_events.publish_latest('import', job.describe(), key=job.job_id)
+
+
+asset_importer = AssetImporter()
+
+# Chunked uploads (drag & drop) are staged here until committed
+UPLOAD_STAGING_DIR = os.path.join(ASSETS_DIR, '.uploads')
+UPLOAD_MAX_CHUNK_SIZE = 8 * 1024 * 1024  # Per append() call, after base64 decoding
+UPLOAD_STALE_SECONDS = 7 * 24 * 3600  # Abandoned partial uploads are removed after a week
+
+
+def asset_name_candidates(filename):
+    """
+    Names to try in ASSETS_DIR for a new asset: filename, then name_1.ext, name_2.ext...
+    Callers create the file exclusively and move on to the next name if it exists, so
+    parallel imports of same-named files can't land on each other.
+    """
+    import itertools
+    name, ext = os.path.splitext(filename)
+    yield filename
+    for counter in itertools.count(1):
+        yield f"{name}_{counter}{ext}"
+
+
+def link_unsupported(error):
+    """True if os.link failed because the filesystem can't hard-link here (copy instead)"""
+    import errno
+    if getattr(error, 'winerror', None) == 1:  # ERROR_INVALID_FUNCTION: FAT/exFAT on Windows
+        return True
+    return error.errno in (errno.EXDEV, errno.EPERM, errno.ENOTSUP, errno.EOPNOTSUPP, errno.EMLINK)
+
+
+class ChunkedUpload:
+    """One file being uploaded: a .part file plus a small JSON manifest of what was acknowledged"""
+
+    def __init__(self, upload_id, filename, size, last_modified=None):
+        self.upload_id = upload_id
+        self.filename = filename
+        self.size = size
+        self.last_modified = last_modified
+        self.received = 0
+        self.lock = threading.Lock()
+        self._hash = hashlib.sha256()
+        self.part_path = os.path.join(UPLOAD_STAGING_DIR, f'{upload_id}.part')
+        self.manifest_path = os.path.join(UPLOAD_STAGING_DIR, f'{upload_id}.json')
+
+    def describe(self):
+        return {
+            'uploadId': self.upload_id,
+            'filename': self.filename,
+            'size': self.size,
+            'received': self.received,
+            'progress': self.received / self.size if self.size else 1.0
+        }
+
+    def load(self):
+        """Pick up a previous attempt. Bytes past the last acknowledged offset are discarded."""
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                received = int(json.load(f).get('received', 0))
+            part_size = os.path.getsize(self.part_path)
+        except (OSError, ValueError, TypeError):
+            return False
+
+        received = min(received, part_size, self.size)
+        with open(self.part_path, 'r+b') as f:
+            f.truncate(received)
+            # hashlib state can't be persisted, so re-hash what we already have once
+            while f.tell() < received:
+                block = f.read(min(1024 * 1024, received - f.tell()))
+                if not block:
+                    break
+                self._hash.update(block)
+        self.received = received
+        return True
+
+    def save_manifest(self):
+        manifest = {
+            'filename': self.filename,
+            'size': self.size,
+            'lastModified': self.last_modified,
+            'received': self.received
+        }
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, self.manifest_path)
+
+    def write(self, offset, data):
+        with open(self.part_path, 'r+b' if os.path.exists(self.part_path) else 'wb') as f:
+            f.seek(offset)
+            f.write(data)
+        self._hash.update(data)
+        self.received = offset + len(data)
+        self.save_manifest()
+
+    def sha256(self):
+        return self._hash.hexdigest()
+
+    def discard(self):
+        for path in (self.part_path, self.manifest_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class UploadManager:
+    """
+    Chunked, resumable uploads for files dropped into the assets panel.
+
+    The UI sends begin() -> append(offset, chunk) ... -> commit(). Chunks are written
+    straight to a .part file under ASSETS_DIR/.uploads, so only one chunk is ever in
+    memory. The upload id is derived from the file's name, size and modification time:
+    dropping the same file again after a crash or restart resumes at the last
+    acknowledged offset. Every upload has its own lock, so files upload in parallel.
+    """
+
+    def __init__(self):
+        self._uploads = {}  # upload_id -> ChunkedUpload
+        self._lock = threading.Lock()
+        self._cleaned = False
+
+    @staticmethod
+    def make_upload_id(filename, size, last_modified=None):
+        key = f'{filename}\0{size}\0{last_modified}'
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()[:20]
+
+    def begin(self, filename, size, last_modified=None):
+        """Start or resume an upload. Returns the offset the client should continue from."""
+        filename = os.path.basename(str(filename or '').replace('\\', '/'))
+        if not filename or filename in ('.', '..'):
+            raise ValueError('Invalid filename')
+        size = int(size)
+        if size < 0:
+            raise ValueError('Invalid size')
+
+        os.makedirs(UPLOAD_STAGING_DIR, exist_ok=True)
+        self._remove_stale()
+
+        upload_id = self.make_upload_id(filename, size, last_modified)
+        with self._lock:
+            upload = self._uploads.get(upload_id)
+            if upload is None:
+                upload = ChunkedUpload(upload_id, filename, size, last_modified)
+                self._uploads[upload_id] = upload
+
+        with upload.lock:
+            resumed = upload.received > 0 or upload.load()
+            if not resumed:
+                open(upload.part_path, 'wb').close()
+                upload.save_manifest()
+
+        if upload.received:
+            print(f"[UPLOAD] Resuming {filename} at {upload.received}/{size} bytes")
+        self._publish(upload)
+        return dict(upload.describe(), resumed=upload.received > 0)
+
+    def append(self, upload_id, offset, data, checksum=None):
+        """
+        Write one chunk at offset. A chunk the server already has is acknowledged again
+        (the client retried after a lost reply); a gap is rejected with the real offset.
+        """
+        upload = self._get(upload_id)
+        if len(data) > UPLOAD_MAX_CHUNK_SIZE:
+            raise ValueError(f'Chunk too large ({len(data)} bytes)')
+        if checksum and hashlib.sha256(data).hexdigest() != checksum.lower():
+            return {'status': 'error', 'code': 'checksum_mismatch',
+                    'message': 'Chunk checksum mismatch', 'received': upload.received}
+
+        with upload.lock:
+            offset = int(offset)
+            if offset + len(data) <= upload.received:
+                return dict(upload.describe(), status='success')
+            if offset != upload.received:
+                return {'status': 'error', 'code': 'offset_mismatch',
+                        'message': f'Expected offset {upload.received}, got {offset}',
+                        'received': upload.received}
+            if offset + len(data) > upload.size:
+                raise ValueError('Chunk extends past the declared file size')
+            upload.write(offset, data)
+
+        self._publish(upload)
+        return dict(upload.describe(), status='success')
+
+    def commit(self, upload_id, sha256=None):
+        """Verify the staged file and move it into ASSETS_DIR"""
+        upload = self._get(upload_id)
+        with upload.lock:
+            if upload.received != upload.size:
+                return {'status': 'error', 'code': 'incomplete',
+                        'message': f'Upload incomplete ({upload.received}/{upload.size} bytes)',
+                        'received': upload.received}
+            digest = upload.sha256()
+            if sha256 and digest != sha256.lower():
+                # Can't tell which chunk is bad - start over
+                upload.discard()
+                with self._lock:
+                    self._uploads.pop(upload_id, None)
+                return {'status': 'error', 'code': 'checksum_mismatch',
+                        'message': 'File checksum mismatch - upload discarded'}
+
+            with open(upload.part_path, 'rb') as f:
+                try:
+                    os.fsync(f.fileno())
+                except OSError:
+                    pass
+            dest_path, _, deduplicated = blob_store.ingest(upload.part_path, upload.filename, move=True, sha256=digest)
+            filename = os.path.basename(dest_path)
+            upload.discard()
+        asset_index.refresh_path(dest_path)
+
+        with self._lock:
+            self._uploads.pop(upload_id, None)
+        print(f"[UPLOAD] Saved {filename} to assets ({upload.size} bytes)")
+        self._publish(upload, state='done')
+        return {'status': 'success', 'filename': filename, 'path': dest_path,
+                'size': upload.size, 'sha256': digest, 'deduplicated': deduplicated}
+
+    def abort(self, upload_id):
+        with self._lock:
+            upload = self._uploads.pop(upload_id, None)
+        if upload is None:
+            upload = ChunkedUpload(upload_id, '', 0)  # Only on disk (previous session)
+        with upload.lock:
+            upload.discard()
+        self._publish(upload, state='aborted')
+
+    def status(self, upload_id):
+        return self._get(upload_id).describe()
+
+    def _get(self, upload_id):
+        with self._lock:
+            upload = self._uploads.get(upload_id)
+        if upload is None:
+            raise KeyError(f'Unknown upload: {upload_id}')
+        return upload
+
+    def _publish(self, upload, state='uploading'):
+        # Coalesced per upload, so a fast upload doesn't flood the bridge
+        ui_events.publish_latest('upload', dict(upload.describe(), state=state), key=upload.upload_id)
+
+    def _remove_stale(self):
+        if self._cleaned:
+            return
+        self._cleaned = True
+        cutoff = time.time() - UPLOAD_STALE_SECONDS
+        try:
+            for entry in os.scandir(UPLOAD_STAGING_DIR):
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+        except OSError as e:
+            print(f"[UPLOAD] Could not clean staging folder: {e}")
+
+
+upload_manager = UploadManager()
+
+# Optional: native filesystem events for the asset index (falls back to polling)
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+
+ASSET_INDEX_PATH = os.path.join(USER_DATA_DIR, 'asset_index.sqlite3')
+ASSET_INDEX_SCHEMA_VERSION = 3
+ASSET_INDEX_POLL_INTERVAL = 5.0  # Seconds between rescans when watchdog isn't installed
+ASSET_INDEX_DEBOUNCE = 0.25  # Let bursts of filesystem events settle before applying them
+
+ASSET_KINDS = {
+    'video': ('.mp4', '.mov', '.avi', '.webm', '.mkv', '.flv', '.m4v'),
+    'image': ('.png', '.jpg', '.jpeg', '.gif', '.svg', '.bmp', '.webp', '.ico'),
+    'font': ('.ttf', '.otf', '.woff', '.woff2', '.ttc', '.eot'),
+    'audio': ('.mp3', '.wav', '.ogg', '.m4a', '.aac', '.flac', '.wma'),
+    'subtitle': ('.srt', '.vtt', '.ass', '.ssa', '.sub'),
+    'text': ('.txt', '.md', '.json', '.xml', '.csv')
+}
+ASSET_KIND_BY_EXT = {ext: kind for kind, exts in ASSET_KINDS.items() for ext in exts}
+ASSET_SORT_COLUMNS = {'mtime': 'mtime', 'name': 'name COLLATE NOCASE', 'size': 'size', 'kind': 'kind'}
+
+
+def asset_kind(filename):
+    return ASSET_KIND_BY_EXT.get(os.path.splitext(filename)[1].lower(), 'other')
+
+
+class AssetIndex:
+    """
+    Persistent SQLite index of the assets and media folders.
+
+    Listing used to walk and stat every file on every UI refresh. Now queries (filter,
+    search, sort, paginate) only touch the database. The index is kept current in the
+    background: watchdog events update just the paths that changed, or - without
+    watchdog - a periodic rescan writes only the differences. Whenever a root changes,
+    an 'assets' event with the new version is pushed to the UI, which re-queries the page
+    it is showing. The index survives restarts, so the first listing is instant and is
+    reconciled with the disk in the background.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._roots = {}  # name -> (directory, recursive)
+        self._versions = {}  # name -> change counter for this session
+        self._dirty = {}  # name -> set of relative paths, or None for "rescan everything"
+        self._lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._conn = None
+        self._thread = None
+        self._observer = None
+
+    def add_root(self, name, directory, recursive=False):
+        self._roots[name] = (directory, recursive)
+        self._versions[name] = 0
+
+    # ---- queries -------------------------------------------------------------
+
+    def query(self, root, kinds=None, search=None, sort='mtime', descending=True, offset=0, limit=None):
+        """Returns (files, total) for one page of a root"""
+        self._ensure_started(root)
+        directory = self._roots[root][0]
+
+        where = ['root = ?']
+        params = [root]
+        if kinds:
+            kinds = [kinds] if isinstance(kinds, str) else list(kinds)
+            where.append(f"kind IN ({','.join('?' * len(kinds))})")
+            params.extend(kinds)
+        if search:
+            escaped = search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            where.append("name LIKE ? ESCAPE '\\'")
+            params.append(f'%{escaped}%')
+        where_sql = ' AND '.join(where)
+        order_sql = f"{ASSET_SORT_COLUMNS.get(sort, 'mtime')} {'DESC' if descending else 'ASC'}, rel_path"
+
+        with self._lock:
+            total = self._conn.execute(f'SELECT COUNT(*) FROM files WHERE {where_sql}', params).fetchone()[0]
+            rows = self._conn.execute(
+                f'SELECT rel_path, name, kind, size, mtime, thumbnail, hover_strip, proxy FROM files WHERE {where_sql} '
+                f'ORDER BY {order_sql} LIMIT ? OFFSET ?',
+                params + [-1 if limit is None else int(limit), int(offset)]
+            ).fetchall()
+
+        files = []
+        for rel_path, name, kind, size, mtime, thumbnail, hover_strip, proxy in rows:
+            path = os.path.join(directory, rel_path.replace('/', os.sep))
+            if thumbnail is None:
+                # Only what the UI actually shows gets thumbnailed
+                thumbnail_service.request(root, rel_path, path, kind, mtime)
+            files.append({
+                'name': name,
+                'path': path,
+                'relative_path': rel_path,
+                'kind': kind,
+                'size': size,
+                'mtime': mtime,
+                'thumbnail': asset_server.url_for(thumbnail) if thumbnail else None,
+                'hoverStrip': asset_server.url_for(hover_strip) if hover_strip else None,
+                'proxy': asset_server.url_for(proxy) if proxy else None
+            })
+        return files, total
+
+    def version(self, root):
+        return self._versions.get(root, 0)
+
+    def set_thumbnails(self, root, rel_path, mtime, thumbnail, hover_strip):
+        """Record generated thumbnails, unless the file changed in the meantime"""
+        with self._lock:
+            updated = self._conn.execute(
+                'UPDATE files SET thumbnail = ?, hover_strip = ? WHERE root = ? AND rel_path = ? AND mtime = ?',
+                (thumbnail, hover_strip, root, rel_path, mtime)).rowcount
+            self._conn.commit()
+        return bool(updated)
+
+    def locate(self, path):
+        """(root, rel_path, mtime, proxy) of an indexed file, or None"""
+        real = os.path.realpath(path)
+        for name, (directory, _) in self._roots.items():
+            if AssetServer._is_within(os.path.realpath(directory), real):
+                self._ensure_started(name)
+                rel_path = os.path.relpath(real, os.path.realpath(directory)).replace(os.sep, '/')
+                with self._lock:
+                    row = self._conn.execute('SELECT mtime, proxy FROM files WHERE root = ? AND rel_path = ?',
+                                             (name, rel_path)).fetchone()
+                if row:
+                    return (name, rel_path) + tuple(row)
+        return None
+
+    def set_proxy(self, root, rel_path, mtime, proxy):
+        """Record a file's playback proxy ('' = none needed), unless the file changed meanwhile"""
+        with self._lock:
+            updated = self._conn.execute(
+                'UPDATE files SET proxy = ? WHERE root = ? AND rel_path = ? AND mtime = ?',
+                (proxy, root, rel_path, mtime)).rowcount
+            self._conn.commit()
+        return bool(updated)
+
+    def refresh_path(self, path):
+        """Re-index one file right away - for files the app itself adds or deletes"""
+        self.refresh_paths([path])
+
+    def refresh_paths(self, paths):
+        """Re-index several files in one transaction per root"""
+        if self._conn is None:
+            return  # Not loaded yet; the first query scans everything anyway
+        for name, (directory, _) in self._roots.items():
+            real_directory = os.path.realpath(directory)
+            rel_paths = [os.path.relpath(path, directory) for path in paths
+                         if AssetServer._is_within(real_directory, os.path.realpath(path))]
+            if not rel_paths:
+                continue
+            try:
+                if self._update_paths(name, rel_paths):
+                    self._changed(name)
+            except Exception as e:
+                print(f"[ASSET INDEX] Failed to refresh {len(rel_paths)} path(s) in '{name}': {e}")
+
+    # ---- maintenance ---------------------------------------------------------
+
+    def _ensure_started(self, root):
+        if root not in self._roots:
+            raise KeyError(f'Unknown asset root: {root}')
+        with self._lock:
+            if self._conn is None:
+                self._open()
+            scanned = self._conn.execute('SELECT 1 FROM roots WHERE root = ?', (root,)).fetchone()
+        if not scanned:
+            # Never indexed: the first listing has to wait for one full scan
+            self._rescan(root)
+        with self._cond:
+            if self._thread is None:
+                for name in self._roots:
+                    self._dirty[name] = None  # Reconcile the persisted index with the disk
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+                self._start_watching()
+
+    def _open(self):
+        import sqlite3
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        if conn.execute('PRAGMA user_version').fetchone()[0] != ASSET_INDEX_SCHEMA_VERSION:
+            conn.executescript('''
+                DROP TABLE IF EXISTS files;
+                DROP TABLE IF EXISTS roots;
+            ''')
+        conn.executescript(f'''
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS files (
+                root TEXT NOT NULL,
+                rel_path TEXT NOT NULL,
+                name TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime REAL NOT NULL,
+                thumbnail TEXT,  -- NULL: not generated yet, '': no thumbnail possible
+                hover_strip TEXT,
+                proxy TEXT,  -- Low-res playback copy: NULL not checked yet, '' not needed
+                PRIMARY KEY (root, rel_path)
+            );
+            CREATE INDEX IF NOT EXISTS files_by_mtime ON files (root, mtime);
+            CREATE INDEX IF NOT EXISTS files_by_name ON files (root, name COLLATE NOCASE);
+            CREATE TABLE IF NOT EXISTS roots (root TEXT PRIMARY KEY, scanned_at REAL NOT NULL);
+            PRAGMA user_version = {ASSET_INDEX_SCHEMA_VERSION};
+        ''')
+        self._conn = conn
+
+    @staticmethod
+    def _indexable(name):
+        # Generated scene scripts, bytecode and our own staging/proxy folders aren't assets;
+        # user files (.py scripts and dotfiles included) are listed like before
+        return (name not in (os.path.basename(UPLOAD_STAGING_DIR), PROXY_DIR_NAME)
+                and not name.startswith('temp_scene_') and not name.endswith('.pyc'))
+
+    def _walk(self, root):
+        """{rel_path: (size, mtime)} for everything currently on disk under a root"""
+        directory, recursive = self._roots[root]
+        found = {}
+        pending = [directory]
+        while pending:
+            current = pending.pop()
+            try:
+                entries = list(os.scandir(current))
+            except OSError:
+                continue
+            for entry in entries:
+                if not self._indexable(entry.name):
+                    continue
+                try:
+                    if entry.is_dir():
+                        if recursive:
+                            pending.append(entry.path)
+                        continue
+                    if not entry.is_file():
+                        continue
+                    st = entry.stat()
+                except OSError:
+                    continue
+                rel_path = os.path.relpath(entry.path, directory).replace(os.sep, '/')
+                found[rel_path] = (st.st_size, st.st_mtime)
+        return found
+
+    def _rescan(self, root):
+        on_disk = self._walk(root)
+        with self._lock:
+            indexed = {rel: (size, mtime) for rel, size, mtime in self._conn.execute(
+                'SELECT rel_path, size, mtime FROM files WHERE root = ?', (root,))}
+            upserts = [rel for rel, info in on_disk.items() if indexed.get(rel) != info]
+            removed = [rel for rel in indexed if rel not in on_disk]
+            self._apply(root, upserts, removed, on_disk)
+            self._conn.execute('INSERT OR REPLACE INTO roots (root, scanned_at) VALUES (?, ?)', (root, time.time()))
+            self._conn.commit()
+        return bool(upserts or removed)
+
+    def _update_paths(self, root, rel_paths):
+        directory, recursive = self._roots[root]
+        upserts, removed, on_disk = [], [], {}
+        for rel_path in rel_paths:
+            rel_path = rel_path.replace(os.sep, '/')
+            parts = rel_path.split('/')
+            if rel_path.startswith('..') or not all(self._indexable(part) for part in parts):
+                continue
+            if len(parts) > 1 and not recursive:
+                continue
+            full_path = os.path.join(directory, rel_path)
+            if os.path.isdir(full_path):
+                # A folder appeared or was renamed - only a walk knows what's inside
+                return self._rescan(root)
+            try:
+                st = os.stat(full_path)
+                on_disk[rel_path] = (st.st_size, st.st_mtime)
+                upserts.append(rel_path)
+            except OSError:
+                removed.append(rel_path)
+        if not upserts and not removed:
+            return False
+        with self._lock:
+            changed = self._apply(root, upserts, removed, on_disk)
+            self._conn.commit()
+        return changed
+
+    def _apply(self, root, upserts, removed, on_disk):
+        """Write changes (lock held). Prefix deletes also drop the contents of removed folders."""
+        conn = self._conn
+        rows = [(root, rel, rel.rsplit('/', 1)[-1], asset_kind(rel), on_disk[rel][0], on_disk[rel][1])
+                for rel in upserts]
+        conn.executemany('INSERT OR REPLACE INTO files (root, rel_path, name, kind, size, mtime) '
+                         'VALUES (?, ?, ?, ?, ?, ?)', rows)
+        deleted = 0
+        for rel in removed:
+            # Proxies live in hidden folders next to their originals and go with them
+            for (proxy,) in conn.execute(
+                    "SELECT proxy FROM files WHERE root = ? AND proxy != '' AND (rel_path = ? OR substr(rel_path, 1, ?) = ?)",
+                    (root, rel, len(rel) + 1, rel + '/')).fetchall():
+                try:
+                    os.remove(proxy)
+                except OSError:
+                    pass
+            deleted += conn.execute(
+                "DELETE FROM files WHERE root = ? AND (rel_path = ? OR substr(rel_path, 1, ?) = ?)",
+                (root, rel, len(rel) + 1, rel + '/')).rowcount
+        return bool(rows or deleted)
+
+    def _mark_dirty(self, root, rel_path):
+        with self._cond:
+            if rel_path is None:
+                self._dirty[root] = None
+            elif self._dirty.get(root, set()) is not None:
+                self._dirty.setdefault(root, set()).add(rel_path)
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._dirty:
+                    self._cond.wait(None if self._observer else ASSET_INDEX_POLL_INTERVAL)
+                if not self._dirty and not self._observer:
+                    # Polling fallback - rescans only write what actually changed
+                    self._dirty = {name: None for name in self._roots}
+            time.sleep(ASSET_INDEX_DEBOUNCE)
+            with self._cond:
+                dirty, self._dirty = self._dirty, {}
+
+            for root, rel_paths in dirty.items():
+                try:
+                    changed = self._rescan(root) if rel_paths is None else self._update_paths(root, rel_paths)
+                except Exception as e:
+                    print(f"[ASSET INDEX] Failed to update '{root}': {e}")
+                    continue
+                if changed:
+                    self._changed(root)
+
+    def _changed(self, root):
+        self._versions[root] += 1
+        ui_events.publish_latest('assets', {'root': root, 'version': self._versions[root]}, key=root)
+
+    def _start_watching(self):
+        if not WATCHDOG_AVAILABLE:
+            print(f"[ASSET INDEX] watchdog not installed - rescanning every {ASSET_INDEX_POLL_INTERVAL:g}s")
+            return
+        index = self
+
+        class Handler(FileSystemEventHandler):
+            def __init__(self, root):
+                self.root = root
+
+            def on_any_event(self, event):
+                directory = index._roots[self.root][0]
+                for path in (event.src_path, getattr(event, 'dest_path', None)):
+                    if path:
+                        index._mark_dirty(self.root, os.path.relpath(os.fsdecode(path), directory))
+
+        try:
+            observer = Observer()
+            for name, (directory, recursive) in self._roots.items():
+                os.makedirs(directory, exist_ok=True)
+                observer.schedule(Handler(name), directory, recursive=recursive)
+            observer.daemon = True
+            observer.start()
+            self._observer = observer
+        except Exception as e:
+            print(f"[ASSET INDEX] Could not watch folders, falling back to polling: {e}")
+
+
+asset_index = AssetIndex(ASSET_INDEX_PATH)
+asset_index.add_root('assets', ASSETS_DIR)
+asset_index.add_root('media', MEDIA_DIR, recursive=True)
+
+THUMBNAIL_DIR = os.path.join(USER_DATA_DIR, 'thumbnails')
+THUMBNAIL_WIDTH = 320
+THUMBNAIL_STRIP_FRAMES = 8  # Frames in a video's hover strip
+THUMBNAIL_STRIP_FRAME_WIDTH = 160
+THUMBNAIL_WORKERS = 2
+THUMBNAIL_SMALL_IMAGE = 256 * 1024  # Images below this are their own thumbnail
+THUMBNAIL_FONT_SAMPLE = 'Aa Bb Cc 123'
+THUMBNAIL_KINDS = ('video', 'image', 'font')
+
+
+def content_fingerprint(file_path, sample_size=256 * 1024):
+    """
+    Cheap content identity for caches: SHA-256 of the size plus the head, middle and
+    tail of the file. Renaming or copying a file keeps its fingerprint; any re-render
+    changes it.
+    """
+    size = os.path.getsize(file_path)
+    digest = hashlib.sha256(str(size).encode('ascii'))
+    with open(file_path, 'rb') as f:
+        if size <= sample_size * 3:
+            digest.update(f.read())
+        else:
+            for offset in (0, size // 2, size - sample_size):
+                f.seek(offset)
+                digest.update(f.read(sample_size))
+    return digest.hexdigest()
+
+
+def low_priority_command(cmd):
+    """
+    cmd wrapped so helper processes (ffmpeg) don't compete with the UI. On POSIX it runs
+    under `nice` - preexec_fn isn't safe to use from our worker threads.
+    """
+    if os.name == 'nt':
+        return cmd
+    return ['nice', '-n', '10'] + list(cmd)
+
+
+def low_priority_subprocess_kwargs():
+    """Popen/run kwargs to go with low_priority_command (priority class on Windows)"""
+    if os.name == 'nt':
+        return {'creationflags': subprocess.CREATE_NO_WINDOW | getattr(subprocess, 'BELOW_NORMAL_PRIORITY_CLASS', 0)}
+    return {}
+
+
+class ThumbnailService:
+    """
+    Background poster frames for the assets panel.
+
+    Videos get a representative poster frame plus a hover strip of evenly spaced
+    frames, large images a downscaled copy and fonts a rendered glyph sample - all
+    with ffmpeg, in a small worker pool at low OS priority. Results are cached under
+    ~/.manim_studio/thumbnails by content fingerprint, so renamed or duplicated files
+    reuse them. The asset index stores the result per file and hands out URLs with
+    every query; a 'thumbnail' event tells the UI when a new one is ready.
+    """
+
+    def __init__(self, cache_dir, workers=THUMBNAIL_WORKERS):
+        from concurrent.futures import ThreadPoolExecutor
+        self.cache_dir = cache_dir
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='thumbnail')
+        self._pending = set()
+        self._lock = threading.Lock()
+        self.ffmpeg_missing = False
+
+    def request(self, root, rel_path, file_path, kind, mtime):
+        """Queue a file (no-op if it's already queued)"""
+        if self.ffmpeg_missing or kind not in THUMBNAIL_KINDS:
+            return
+        key = (root, rel_path, mtime)
+        with self._lock:
+            if key in self._pending:
+                return
+            self._pending.add(key)
+        self._pool.submit(self._generate, key, file_path, kind)
+
+    def _generate(self, key, file_path, kind):
+        root, rel_path, mtime = key
+        try:
+            fingerprint = blob_store.content_hash(file_path) or content_fingerprint(file_path)
+            base = os.path.join(self.cache_dir, fingerprint[:2], fingerprint)
+            os.makedirs(os.path.dirname(base), exist_ok=True)
+            if kind == 'video':
+                thumbnail = self._video_poster(file_path, base + '_poster.jpg')
+                hover_strip = self._video_strip(file_path, base + '_strip.jpg')
+            elif kind == 'image':
+                thumbnail, hover_strip = self._image_thumbnail(file_path, base + '_poster.png'), ''
+            else:
+                thumbnail, hover_strip = self._font_sample(file_path, base + '_poster.png'), ''
+        except FileNotFoundError as e:
+            if not os.path.exists(file_path):
+                return  # Deleted while queued
+            # ffmpeg isn't installed - don't record failures, it may be installed later
+            print(f"[THUMBNAIL] ffmpeg not available, thumbnails disabled: {e}")
+            self.ffmpeg_missing = True
+            return
+        except Exception as e:
+            print(f"[THUMBNAIL] Failed for {file_path}: {e}")
+            thumbnail, hover_strip = '', ''  # Recorded so a broken file isn't retried until it changes
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+        if asset_index.set_thumbnails(root, rel_path, mtime, thumbnail, hover_strip):
+            ui_events.publish('thumbnail', {
+                'root': root,
+                'path': file_path,
+                'thumbnail': asset_server.url_for(thumbnail) if thumbnail else None,
+                'hoverStrip': asset_server.url_for(hover_strip) if hover_strip else None
+            })
+
+    @staticmethod
+    def _ffmpeg(args, output_path, timeout=60):
+        """Run ffmpeg into a temp file and move it into place; returns output_path or ''"""
+        if os.path.exists(output_path):
+            return output_path  # Same content was thumbnailed before
+        tmp_path = f'{output_path}.{threading.get_ident()}.tmp{os.path.splitext(output_path)[1]}'
+        try:
+            result = subprocess.run(
+                low_priority_command(['ffmpeg', '-v', 'error', '-y'] + args + [tmp_path]),
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                text=True,
+                timeout=timeout,
+                **low_priority_subprocess_kwargs()
+            )
+            if result.returncode != 0 or not os.path.exists(tmp_path):
+                print(f"[THUMBNAIL] ffmpeg failed: {result.stderr.strip()[-200:]}")
+                return ''
+            os.replace(tmp_path, output_path)
+            return output_path
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _video_poster(self, file_path, output_path):
+        # thumbnail= picks the most representative of the first frames, skipping black fades
+        return self._ffmpeg(['-i', file_path, '-vf', f'thumbnail=60,scale={THUMBNAIL_WIDTH}:-2',
+                             '-frames:v', '1', '-q:v', '4'], output_path)
+
+    def _video_strip(self, file_path, output_path):
+        if os.path.exists(output_path):
+            return output_path
+        duration = (media_metadata.get(file_path) or {}).get('duration')
+        if not duration:
+            return ''
+        fps = THUMBNAIL_STRIP_FRAMES / duration
+        return self._ffmpeg(['-i', file_path, '-vf',
+                             f'fps={fps:.6f},scale={THUMBNAIL_STRIP_FRAME_WIDTH}:-2,tile={THUMBNAIL_STRIP_FRAMES}x1',
+                             '-frames:v', '1', '-q:v', '5'], output_path)
+
+    def _image_thumbnail(self, file_path, output_path):
+        if os.path.getsize(file_path) <= THUMBNAIL_SMALL_IMAGE:
+            return file_path
+        # Never upscale; SVG needs an ffmpeg built with librsvg, otherwise the original is used
+        thumbnail = self._ffmpeg(['-i', file_path, '-vf', f"scale='min({THUMBNAIL_WIDTH},iw)':-2",
+                                  '-frames:v', '1'], output_path)
+        return thumbnail or (file_path if file_path.lower().endswith('.svg') else '')
+
+    def _font_sample(self, file_path, output_path):
+        # Quoted drawtext value: ':' still needs escaping (Windows drive letters), quotes are closed and reopened
+        font = file_path.replace('\\', '/').replace(':', '\\:').replace("'", "'\\''")
+        return self._ffmpeg([
+            '-f', 'lavfi', '-i', f'color=c=0x1e1e2e:s={THUMBNAIL_WIDTH}x{THUMBNAIL_WIDTH // 2}',
+            '-vf', f"drawtext=fontfile='{font}':text='{THUMBNAIL_FONT_SAMPLE}':fontcolor=white:"
+                   f"fontsize=36:x=(w-tw)/2:y=(h-th)/2",
+            '-frames:v', '1'], output_path)
+
+
+MEDIA_METADATA_PATH = os.path.join(USER_DATA_DIR, 'media_metadata.sqlite3')
+MEDIA_PROBE_WORKERS = 4
+MEDIA_PROBE_TIMEOUT = 30
+
+
+def parse_frame_rate(rate):
+    """ffprobe rate ('30000/1001', '25/1', '0/0') as a float, or 0"""
+    try:
+        num, _, den = str(rate).partition('/')
+        return float(num) / float(den or 1) if float(den or 1) else 0.0
+    except ValueError:
+        return 0.0
+
+
+def probe_media(file_path):
+    """Run ffprobe once and boil the result down to what the video tools need"""
+    result = subprocess.run(
+        ['ffprobe', '-v', 'error', '-print_format', 'json', '-show_format', '-show_streams', file_path],
+        capture_output=True, text=True, timeout=MEDIA_PROBE_TIMEOUT,
+        creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip()[-200:] or f'ffprobe exited with code {result.returncode}')
+
+    data = json.loads(result.stdout or '{}')
+    fmt = data.get('format', {})
+    streams = data.get('streams', [])
+    video = next((s for s in streams if s.get('codec_type') == 'video'
+                  and not s.get('disposition', {}).get('attached_pic')), None)
+    audio = next((s for s in streams if s.get('codec_type') == 'audio'), None)
+
+    info = {
+        'duration': float(fmt.get('duration') or (video or {}).get('duration') or 0),
+        'startTime': float(fmt.get('start_time') or 0),
+        'bitrate': int(fmt.get('bit_rate') or 0),
+        'container': fmt.get('format_name', ''),
+        'hasVideo': video is not None,
+        'hasAudio': audio is not None
+    }
+    if video:
+        info.update({
+            'width': int(video.get('width') or 0),
+            'height': int(video.get('height') or 0),
+            'fps': round(parse_frame_rate(video.get('avg_frame_rate')) or parse_frame_rate(video.get('r_frame_rate')), 3),
+            'frameRate': video.get('r_frame_rate', ''),
+            'timeBase': video.get('time_base', ''),
+            'videoCodec': video.get('codec_name', ''),
+            'profile': video.get('profile', ''),
+            'pixelFormat': video.get('pix_fmt', ''),
+            'sampleAspectRatio': video.get('sample_aspect_ratio', '1:1')
+        })
+    if audio:
+        info.update({
+            'audioCodec': audio.get('codec_name', ''),
+            'sampleRate': int(audio.get('sample_rate') or 0),
+            'channels': int(audio.get('channels') or 0),
+            'channelLayout': audio.get('channel_layout', '')
+        })
+    return info
+
+
+class MediaMetadataCache:
+    """
+    Persistent ffprobe results (duration, resolution, fps, codecs, bitrate, audio).
+
+    Entries are keyed by path and invalidated by size + mtime, and live in SQLite so a
+    library that was probed once opens instantly in later sessions. Misses are probed
+    by a small thread pool - a folder of clips is probed in parallel instead of one
+    ffprobe after another.
+    """
+
+    def __init__(self, db_path, workers=MEDIA_PROBE_WORKERS):
+        from concurrent.futures import ThreadPoolExecutor
+        self.db_path = db_path
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='probe')
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _db(self):
+        if self._conn is None:
+            import sqlite3
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.executescript('''
+                PRAGMA journal_mode = WAL;
+                CREATE TABLE IF NOT EXISTS media (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    info TEXT NOT NULL  -- JSON from probe_media(), or {"error": ...}
+                );
+            ''')
+            self._conn = conn
+        return self._conn
+
+    def get(self, file_path):
+        """Metadata for one file (probes on a miss); None if it can't be probed"""
+        return self.get_many([file_path]).get(file_path)
+
+    def get_many(self, file_paths):
+        """{path: metadata} - cached entries straight away, misses probed in parallel"""
+        results = {}
+        misses = []
+        for path in file_paths:
+            try:
+                st = os.stat(path)
+            except OSError:
+                results[path] = None
+                continue
+            key = (os.path.normcase(os.path.abspath(path)), st.st_size, st.st_mtime_ns)
+            with self._lock:
+                row = self._db().execute('SELECT info FROM media WHERE path = ? AND size = ? AND mtime_ns = ?',
+                                         key).fetchone()
+            if row:
+                info = json.loads(row[0])
+                results[path] = None if 'error' in info else info
+            else:
+                misses.append((path, key))
+
+        if misses:
+            started = time.time()
+            for (path, key), info in zip(misses, self._pool.map(self._probe, misses)):
+                results[path] = None if 'error' in info else info
+            print(f"[MEDIA INFO] Probed {len(misses)} file(s) in {time.time() - started:.2f}s")
+        return results
+
+    def _probe(self, item):
+        path, key = item
+        try:
+            info = probe_media(path)
+        except FileNotFoundError:
+            return {'error': 'ffprobe not found'}  # Not cached - it may be installed later
+        except Exception as e:
+            info = {'error': str(e)}  # Cached until the file changes, so broken files aren't re-probed
+        with self._lock:
+            self._db().execute('INSERT OR REPLACE INTO media (path, size, mtime_ns, info) VALUES (?, ?, ?, ?)',
+                               key + (json.dumps(info),))
+            self._db().commit()
+        return info
+
+
+media_metadata = MediaMetadataCache(MEDIA_METADATA_PATH)
+
+
+thumbnail_service = ThumbnailService(THUMBNAIL_DIR)
+asset_server.add_root('thumbnails', THUMBNAIL_DIR)
+
+
+PROXY_DIR_NAME = '.proxies'  # Folder next to the original; the asset index skips it
+PROXY_HEIGHT = 540
+PROXY_MIN_HEIGHT = 1440  # 1080p and below scrub fine as they are
+
+
+class ProxyService:
+    """
+    Low-resolution playback proxies for big renders.
+
+    Scrubbing 4K/8K long-GOP video means decoding from the previous keyframe on every
+    seek. A proxy is an all-intra (every frame a keyframe) 540p H.264 copy, so any frame
+    decodes on its own. Proxies are written to a hidden .proxies folder next to the
+    original by one low-priority ffmpeg worker, and the asset index records the
+    original -> proxy mapping (cleared when the original changes, deleted with it).
+    Players use the proxy; exports and the video tools keep using the original.
+    """
+
+    def __init__(self):
+        self._queue = []
+        self._queued = set()
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def proxy_url(self, file_path):
+        """URL of the file's proxy if one is ready; otherwise queues one and returns None"""
+        located = asset_index.locate(file_path)
+        proxy = located[3] if located else None
+        if proxy == '':
+            return None  # Small enough to play directly
+        if proxy and os.path.exists(proxy):
+            return asset_server.url_for(proxy)
+        self.request(file_path)  # Not checked yet, or the proxy file went missing
+        return None
+
+    def request(self, file_path):
+        with self._cond:
+            if file_path in self._queued:
+                return
+            self._queued.add(file_path)
+            self._queue.append(file_path)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+                file_path = self._queue.pop(0)
+            try:
+                self._process(file_path)
+            except Exception as e:
+                print(f"[PROXY] Failed for {os.path.basename(file_path)}: {e}")
+            finally:
+                with self._cond:
+                    self._queued.discard(file_path)
+
+    def _process(self, file_path):
+        asset_index.locate(file_path)  # Loads the index if nothing has queried it yet
+        asset_index.refresh_path(file_path)  # Make sure it has the current version of the file
+        located = asset_index.locate(file_path)
+        if located is None or asset_kind(file_path) != 'video':
+            return
+        root, rel_path, mtime, existing = located
+        if existing and os.path.exists(existing):
+            return
+
+        info = media_metadata.get(file_path) or {}
+        if not info.get('hasVideo') or info.get('height', 0) < PROXY_MIN_HEIGHT:
+            asset_index.set_proxy(root, rel_path, mtime, '')
+            return
+
+        proxy_dir = os.path.join(os.path.dirname(file_path), PROXY_DIR_NAME)
+        os.makedirs(proxy_dir, exist_ok=True)
+        # Keep the extension: clip.mp4 and clip.mov must not share a proxy
+        proxy_path = os.path.join(proxy_dir, os.path.basename(file_path) + '.proxy.mp4')
+        tmp_path = proxy_path + '.tmp.mp4'
+        started = time.time()
+        try:
+            result = subprocess.run(
+                low_priority_command([
+                    'ffmpeg', '-v', 'error', '-y', '-i', file_path, '-map', '0:v:0', '-map', '0:a?',
+                    '-vf', f'scale=-2:{PROXY_HEIGHT}', '-c:v', 'libx264', '-preset', 'veryfast',
+                    '-tune', 'fastdecode', '-crf', '26', '-g', '1', '-pix_fmt', 'yuv420p',
+                    '-c:a', 'aac', '-b:a', '96k', '-movflags', '+faststart', tmp_path]),
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                text=True,
+                timeout=max(600, info.get('duration', 0) * 4),
+                **low_priority_subprocess_kwargs()
+            )
+            if result.returncode != 0:
+                print(f"[PROXY] ffmpeg failed: {result.stderr.strip()[-200:]}")
+                return
+            os.replace(tmp_path, proxy_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        if asset_index.set_proxy(root, rel_path, mtime, proxy_path):
+            print(f"[PROXY] {rel_path}: {info.get('height')}p -> {PROXY_HEIGHT}p in {time.time() - started:.1f}s")
+            ui_events.publish('proxy', {'path': file_path, 'proxy': asset_server.url_for(proxy_path)})
+        else:
+            os.remove(proxy_path)  # The original changed while we were encoding
+
+
+proxy_service = ProxyService()
+
+
+VIDEO_WORK_DIR = os.path.join(USER_DATA_DIR, 'video_work')  # Scratch segments for trim/combine
+KEYFRAME_SEARCH_WINDOW = 30.0  # Seconds scanned past each cut point for the nearest keyframe
+SMART_ENCODERS = {'h264': 'libx264', 'hevc': 'libx265'}  # Source codecs we can re-encode edges for
+H264_PROFILES = {  # ffprobe profile name -> libx264 -profile:v
+    'constrained baseline': 'baseline',
+    'baseline': 'baseline',
+    'main': 'main',
+    'high': 'high',
+    'high 10': 'high10',
+    'high 4:2:2': 'high422',
+    'high 4:4:4 predictive': 'high444',
+}
+
+
+def probe_keyframes(file_path, intervals):
+    """
+    Keyframe timestamps (seconds from file start) of the first video stream.
+
+    Only packet headers inside `intervals` [(start, end), ...] are read - nothing is
+    decoded - so this stays cheap on long files.
+    """
+    read_intervals = ','.join(f'{max(0.0, a):.3f}%{b:.3f}' for a, b in intervals)
+    result = subprocess.run(
+        ['ffprobe', '-v', 'error', '-select_streams', 'v:0', '-read_intervals', read_intervals,
+         '-show_entries', 'packet=pts_time,flags', '-of', 'csv=p=0', file_path],
+        capture_output=True, text=True, timeout=MEDIA_PROBE_TIMEOUT,
+        creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip()[-200:] or 'ffprobe failed')
+    keyframes = set()
+    for line in result.stdout.splitlines():
+        pts, _, flags = line.partition(',')
+        if 'K' in flags and pts not in ('', 'N/A'):
+            keyframes.add(float(pts))
+    return sorted(keyframes)
+
+
+def video_encode_args(info, codec=None):
+    """Encoder args producing a stream that can sit next to stream-copied `info` video"""
+    codec = codec or info.get('videoCodec')
+    args = ['-c:v', SMART_ENCODERS.get(codec, 'libx264'), '-crf', '18', '-preset', 'veryfast']
+    if info.get('pixelFormat'):
+        args += ['-pix_fmt', info['pixelFormat']]
+    # Only an exact match - "High 10" or "High 4:2:2" must not become "high" (x264 rejects
+    # that with a 10-bit/4:2:2 pix_fmt). Unknown profiles are left to the encoder.
+    profile = H264_PROFILES.get((info.get('profile') or '').lower()) if codec == 'h264' else None
+    if profile:
+        args += ['-profile:v', profile]
+    if codec == 'hevc':
+        args += ['-tag:v', 'hvc1']
+    if info.get('frameRate') and parse_frame_rate(info['frameRate']):
+        args += ['-r', info['frameRate']]
+    return args
+
+
+def run_ffmpeg(args, timeout=600, duration=0, on_progress=None):
+    """
+    Run ffmpeg quietly; raises RuntimeError with the tail of stderr on failure.
+
+    Inside a background job the process is cancellable and, given the output
+    `duration`, reports progress from `-progress pipe:1` - to on_progress(fraction)
+    if passed, otherwise to the job.
+    """
+    job = BackgroundJob.current()
+    creationflags = subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
+    if job is None:
+        result = subprocess.run(
+            ['ffmpeg', '-v', 'error', '-y'] + args,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+            timeout=timeout,
+            creationflags=creationflags
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f'FFmpeg error: {result.stderr.strip()[-500:]}')
+        return
+
+    cmd = ['ffmpeg', '-v', 'error', '-y', '-nostats', '-progress', 'pipe:1'] + args
+    process = job.popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+                        creationflags=creationflags)
+    stderr = []
+    reader = threading.Thread(target=lambda: stderr.append(process.stderr.read()), daemon=True)
+    reader.start()
+    timer = threading.Timer(timeout, process.kill)
+    timer.start()
+    try:
+        for line in process.stdout:
+            key, _, value = line.strip().partition('=')
+            if key == 'out_time_us' and duration and value.isdigit():
+                fraction = int(value) / 1e6 / duration
+                (on_progress or job.set_progress)(min(fraction, 1.0))
+        process.wait()
+        reader.join()
+    finally:
+        timed_out = not timer.is_alive()
+        timer.cancel()
+        job.release(process)
+    if timed_out:
+        raise subprocess.TimeoutExpired(cmd, timeout)
+    if process.returncode != 0:
+        raise RuntimeError(f"FFmpeg error: {''.join(stderr).strip()[-500:]}")
+
+
+def smart_trim(video_path, start, end, output_path):
+    """
+    Frame-accurate trim that only re-encodes the partial GOPs at the cut points.
+
+    The cut points are rounded inwards to the nearest keyframes; everything between
+    those is stream-copied, and only [start, first keyframe) and [last keyframe, end)
+    are decoded and re-encoded with matching codec parameters. Every step seeks on the
+    input side, so the cost is proportional to the edges, not to the file. Audio is
+    stream-copied over the exact range. Sources we can't match (other codecs, clips
+    shorter than a GOP) fall back to re-encoding just the requested range.
+
+    Returns {'mode': 'smart'|'reencode', 'copied': seconds, 'reencoded': seconds}.
+    """
+    import shutil
+    info = media_metadata.get(video_path)
+    if not info:
+        raise RuntimeError('Could not read video information')
+    duration = info.get('duration', 0)
+    start = max(0.0, float(start or 0))
+    end = min(float(end), duration) if end and duration else (float(end or 0) or duration)
+    if end <= start:
+        raise ValueError('End time must be after start time')
+
+    offset = info.get('startTime', 0)  # Packet timestamps include the container's start offset
+    half_frame = 0.5 / (info.get('fps') or 30)
+    keyframes = []
+    if info.get('hasVideo') and info.get('videoCodec') in SMART_ENCODERS:
+        try:
+            keyframes = [k - offset for k in probe_keyframes(video_path, [
+                (start + offset, start + offset + KEYFRAME_SEARCH_WINDOW),
+                (end + offset - KEYFRAME_SEARCH_WINDOW, end + offset)
+            ])]
+        except Exception as e:
+            print(f"[TRIM VIDEO] Keyframe probe failed, re-encoding range: {e}")
+    first_key = next((k for k in keyframes if k >= start - half_frame), None)
+    last_key = next((k for k in reversed(keyframes) if k <= end - half_frame), None)
+
+    audio_args = ['-map', '1:a?', '-c:a', 'copy'] if info.get('hasAudio') else []
+    if first_key is None or last_key is None or last_key <= first_key:
+        # No whole GOP inside the range - re-encoding it all is as cheap as it gets
+        codec = info.get('videoCodec') if info.get('videoCodec') in SMART_ENCODERS else 'h264'
+        run_ffmpeg(['-ss', f'{start:.6f}', '-i', video_path, '-t', f'{end - start:.6f}',
+                    '-map', '0:v:0?', '-map', '0:a?'] + video_encode_args(info, codec) +
+                   ['-c:a', 'aac', '-b:a', '192k', '-movflags', '+faststart', output_path],
+                   duration=end - start)
+        return {'mode': 'reencode', 'copied': 0.0, 'reencoded': end - start}
+
+    os.makedirs(VIDEO_WORK_DIR, exist_ok=True)
+    work_dir = tempfile.mkdtemp(prefix='trim_', dir=VIDEO_WORK_DIR)
+    try:
+        # Segments are video-only MPEG-TS: in-band parameter sets let the copied and
+        # re-encoded parts be concatenated even though their encoder settings differ
+        plan = [(name, seg_start, seg_end, copy) for name, seg_start, seg_end, copy in (
+            ('head', start, first_key, False),
+            ('middle', first_key, last_key, True),
+            ('tail', last_key, end, False)
+        ) if seg_end - seg_start >= half_frame]
+        # Rough relative cost for job progress: copying is an order of magnitude cheaper
+        costs = [(b - a) * (0.1 if copy else 1.0) for _, a, b, copy in plan] + [0.05 * (end - start)]
+        done = 0.0
+        segments = []
+        reencoded = 0.0
+        for (name, seg_start, seg_end, copy), cost in zip(plan, costs):
+            set_job_span(done / sum(costs), (done + cost) / sum(costs))
+            done += cost
+            seg_path = os.path.join(work_dir, f'{name}.ts')
+            if copy:
+                # Nudge past the keyframe so the input seek can't land on the previous one
+                codec_args = ['-c:v', 'copy']
+                seek = seg_start + 0.001
+            else:
+                codec_args = video_encode_args(info)
+                seek = seg_start
+                reencoded += seg_end - seg_start
+            run_ffmpeg(['-ss', f'{seek:.6f}', '-i', video_path, '-t', f'{seg_end - seg_start:.6f}',
+                        '-map', '0:v:0', '-an'] + codec_args + ['-f', 'mpegts', seg_path],
+                       duration=seg_end - seg_start)
+            segments.append(seg_path)
+
+        set_job_span(done / sum(costs), 1.0)
+
+        list_path = os.path.join(work_dir, 'segments.txt')
+        with open(list_path, 'w', encoding='utf-8') as f:
+            for seg_path in segments:
+                f.write(f"file '{seg_path.replace(os.sep, '/')}'\n")
+        run_ffmpeg(['-f', 'concat', '-safe', '0', '-i', list_path,
+                    '-ss', f'{start:.6f}', '-t', f'{end - start:.6f}', '-i', video_path,
+                    '-map', '0:v:0', '-c:v', 'copy'] + audio_args +
+                   (['-tag:v', 'hvc1'] if info.get('videoCodec') == 'hevc' else []) +
+                   ['-movflags', '+faststart', output_path], duration=end - start)
+        return {'mode': 'smart', 'copied': last_key - first_key, 'reencoded': reencoded}
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+COMBINE_WORKERS = max(1, min(4, (os.cpu_count() or 2) // 2))  # Parallel normalisation encodes
+
+
+def video_signature(info):
+    """Stream parameters that have to agree for clips to be concatenated losslessly"""
+    return (info.get('videoCodec'), info.get('width'), info.get('height'), info.get('frameRate'),
+            info.get('pixelFormat'), info.get('sampleAspectRatio', '1:1'))
+
+
+def smart_combine(video_paths, output_path):
+    """
+    Concatenate clips, re-encoding only the ones that don't match the common profile.
+
+    All inputs are probed (through the metadata cache) and the profile of the largest,
+    longest clip becomes the target. If every clip already matches - codec, size, frame
+    rate, pixel format, time base and audio layout - the sources are concatenated with
+    stream copy directly. Otherwise each clip is normalised in parallel: video that
+    matches is copied and only mismatched video is scaled/re-encoded, audio is copied,
+    converted or filled with silence, and everything goes through MPEG-TS so the final
+    concat is still a lossless stream copy.
+
+    Returns {'mode': 'copy'|'normalised', 'copied': clips, 'reencoded': clips}.
+    """
+    import shutil
+    from concurrent.futures import ThreadPoolExecutor
+
+    metadata = media_metadata.get_many(video_paths)
+    infos = []
+    for path in video_paths:
+        info = metadata.get(path)
+        if not info or not info.get('hasVideo'):
+            raise RuntimeError(f'Not a readable video: {os.path.basename(path)}')
+        infos.append(info)
+
+    target = dict(max(infos, key=lambda i: (i.get('width', 0) * i.get('height', 0), i.get('duration', 0))))
+    if target.get('videoCodec') not in SMART_ENCODERS:
+        # Re-encoding everything to H.264 anyway - use the format every player handles
+        # rather than the source's (a 10-bit or 4:2:2 ProRes/VP9 pix_fmt doesn't fit High)
+        target.update(videoCodec='h264', profile='High', pixelFormat='yuv420p')
+    audio_source = target if target.get('hasAudio') else next((i for i in infos if i.get('hasAudio')), None)
+    audio = None
+    if audio_source:
+        audio = ('aac', audio_source.get('sampleRate') or 48000, audio_source.get('channels') or 2)
+
+    def video_matches(info):
+        return video_signature(info) == video_signature(target)
+
+    def audio_matches(info):
+        if audio is None:
+            return not info.get('hasAudio')
+        return (info.get('audioCodec'), info.get('sampleRate'), info.get('channels')) == audio
+
+    if all(video_matches(i) and audio_matches(i) and i.get('timeBase') == target.get('timeBase') for i in infos):
+        list_lines = video_paths
+        mode, reencoded = 'copy', 0
+        work_dir = None
+    else:
+        os.makedirs(VIDEO_WORK_DIR, exist_ok=True)
+        work_dir = tempfile.mkdtemp(prefix='combine_', dir=VIDEO_WORK_DIR)
+        width, height = target['width'], target['height']
+
+        job = BackgroundJob.current()
+        total_duration = sum(i.get('duration', 0) for i in infos) or 1.0
+        clip_progress = [0.0] * len(infos)
+
+        def on_clip_progress(index, fraction):
+            clip_progress[index] = fraction * infos[index].get('duration', 0)
+            job.set_progress(sum(clip_progress) / total_duration)
+
+        def normalise(index):
+            BackgroundJob.bind(job)  # Pool threads inherit the job for cancellation and progress
+            path, info = video_paths[index], infos[index]
+            args = ['-i', path]
+            if audio and not info.get('hasAudio'):
+                layout = 'mono' if audio[2] == 1 else 'stereo'
+                args += ['-f', 'lavfi', '-t', f"{info.get('duration', 0):.6f}",
+                         '-i', f'anullsrc=r={audio[1]}:cl={layout}']
+            args += ['-map', '0:v:0']
+            if video_matches(info):
+                args += ['-c:v', 'copy']
+            else:
+                args += ['-vf', f'scale={width}:{height}:force_original_aspect_ratio=decrease,'
+                                f'pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,setsar=1']
+                args += video_encode_args(target)
+            if audio:
+                args += ['-map', '1:a:0' if not info.get('hasAudio') else '0:a:0']
+                args += ['-c:a', 'copy'] if audio_matches(info) else \
+                        ['-c:a', 'aac', '-b:a', '192k', '-ar', str(audio[1]), '-ac', str(audio[2])]
+            seg_path = os.path.join(work_dir, f'{index:04d}.ts')
+            run_ffmpeg(args + ['-f', 'mpegts', seg_path], duration=info.get('duration', 0),
+                       on_progress=lambda fraction: on_clip_progress(index, fraction))
+            return seg_path
+
+        reencoded = sum(1 for i in infos if not video_matches(i))
+        mode = 'normalised'
+
+    try:
+        if work_dir:
+            set_job_span(0.0, 0.9)
+            with ThreadPoolExecutor(max_workers=COMBINE_WORKERS, thread_name_prefix='combine') as pool:
+                list_lines = list(pool.map(normalise, range(len(video_paths))))
+            set_job_span(0.9, 1.0)
+        list_dir = work_dir or VIDEO_WORK_DIR
+        os.makedirs(list_dir, exist_ok=True)
+        list_path = os.path.join(list_dir, f'concat_{threading.get_ident()}.txt')
+        with open(list_path, 'w', encoding='utf-8') as f:
+            for path in list_lines:
+                # FFmpeg concat requires absolute paths with forward slashes and escaped quotes
+                abs_path = os.path.abspath(path).replace('\\', '/').replace("'", "'\\''")
+                f.write(f"file '{abs_path}'\n")
+        try:
+            run_ffmpeg(['-f', 'concat', '-safe', '0', '-i', list_path, '-map', '0', '-c', 'copy'] +
+                       (['-tag:v', 'hvc1'] if target.get('videoCodec') == 'hevc' else []) +
+                       ['-movflags', '+faststart', output_path],
+                       duration=sum(i.get('duration', 0) for i in infos))
+        finally:
+            os.remove(list_path)
+    finally:
+        if work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    return {'mode': mode, 'copied': len(video_paths) - reencoded, 'reencoded': reencoded}
+
+
+SEEK_PREVIEW_DIR = os.path.join(USER_DATA_DIR, 'seek_previews')
+SEEK_TILE_WIDTH = 160
+SEEK_GRID = (10, 10)  # Columns x rows per sprite sheet
+SEEK_MIN_INTERVAL = 1.0  # Seconds between sprite frames...
+SEEK_MAX_FRAMES = 400  # ...stretched so long videos don't get more frames than this
+
+
+class SeekPreviewService:
+    """
+    Hover-scrubbing data for rendered videos: sprite sheets plus a keyframe index.
+
+    Frames at a fixed interval are tiled into JPEG sprite sheets, and the keyframe
+    timestamps are read from packet headers (nothing decoded). Both go into
+    ~/.manim_studio/seek_previews/<content fingerprint>/ with a manifest.json, so a
+    preview is generated once per content and seek previews never touch the video
+    itself. Sprites are cut from the proxy when there is one - it decodes far faster.
+    Generation is one low-priority background worker; 'seek_preview' events announce
+    finished manifests.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self._queue = []
+        self._queued = set()
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def manifest_path(self, file_path):
+        return os.path.join(self.cache_dir, content_fingerprint(file_path), 'manifest.json')
+
+    def get(self, file_path):
+        """(manifest_path, manifest or None) - queues generation when it isn't ready"""
+        manifest_path = self.manifest_path(file_path)
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                return manifest_path, json.load(f)
+        except (OSError, ValueError):
+            self.request(file_path)
+            return manifest_path, None
+
+    def request(self, file_path):
+        with self._cond:
+            if file_path in self._queued:
+                return
+            self._queued.add(file_path)
+            self._queue.append(file_path)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+                file_path = self._queue.pop(0)
+            try:
+                self._generate(file_path)
+            except Exception as e:
+                print(f"[SEEK PREVIEW] Failed for {os.path.basename(file_path)}: {e}")
+            finally:
+                with self._cond:
+                    self._queued.discard(file_path)
+
+    def _generate(self, file_path):
+        import math
+        import shutil
+        manifest_path = self.manifest_path(file_path)
+        if os.path.exists(manifest_path):
+            return
+        info = media_metadata.get(file_path) or {}
+        duration = info.get('duration', 0)
+        if not info.get('hasVideo') or not duration:
+            return
+
+        interval = max(SEEK_MIN_INTERVAL, duration / SEEK_MAX_FRAMES)
+        count = max(1, math.ceil(duration / interval))
+        columns, rows = SEEK_GRID
+        tile_height = max(2, round(SEEK_TILE_WIDTH * info.get('height', 9) / (info.get('width') or 16) / 2) * 2)
+
+        located = asset_index.locate(file_path)
+        source = located[3] if located and located[3] and os.path.exists(located[3]) else file_path
+
+        final_dir = os.path.dirname(manifest_path)
+        work_dir = f'{final_dir}.{threading.get_ident()}.tmp'
+        os.makedirs(work_dir, exist_ok=True)
+        started = time.time()
+        try:
+            result = subprocess.run(
+                low_priority_command([
+                    'ffmpeg', '-v', 'error', '-y', '-i', source, '-an',
+                    '-vf', f'fps=1/{interval:.6f},scale={SEEK_TILE_WIDTH}:{tile_height},tile={columns}x{rows}',
+                    '-q:v', '5', os.path.join(work_dir, 'sprite_%03d.jpg')]),
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                text=True,
+                timeout=max(600, duration * 2),
+                **low_priority_subprocess_kwargs()
+            )
+            if result.returncode != 0:
+                print(f"[SEEK PREVIEW] ffmpeg failed: {result.stderr.strip()[-200:]}")
+                return
+            offset = info.get('startTime', 0)
+            try:
+                keyframes = [round(k - offset, 3) for k in probe_keyframes(file_path, [(0, duration + offset + 1)])]
+            except Exception as e:
+                print(f"[SEEK PREVIEW] No keyframe index for {os.path.basename(file_path)}: {e}")
+                keyframes = []
+
+            manifest = {
+                'duration': duration,
+                'interval': interval,
+                'count': count,
+                'columns': columns,
+                'rows': rows,
+                'tileWidth': SEEK_TILE_WIDTH,
+                'tileHeight': tile_height,
+                'sheets': sorted(name for name in os.listdir(work_dir) if name.startswith('sprite_')),
+                'keyframes': keyframes
+            }
+            with open(os.path.join(work_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+                json.dump(manifest, f)
+            try:
+                os.replace(work_dir, final_dir)
+            except OSError:
+                return  # Another worker (or an earlier run) finished the same content first
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        print(f"[SEEK PREVIEW] {os.path.basename(file_path)}: {count} frames in {len(manifest['sheets'])} "
+              f"sheet(s), {len(keyframes)} keyframes in {time.time() - started:.1f}s")
+        ui_events.publish('seek_preview', {'path': file_path, 'manifest': asset_server.url_for(manifest_path)})
+
+
+seek_preview_service = SeekPreviewService(SEEK_PREVIEW_DIR)
+asset_server.add_root('seek', SEEK_PREVIEW_DIR)
+
+
+PREPARE_TRACE = os.environ.get('MANIM_STUDIO_TRACE') == '1'  # Log sanitised characters, keep .debug.txt dumps
+
+# Invisible characters that corrupt LaTeX (U+2068 FIRST STRONG ISOLATE turns subscripts into
+# garbled code points): zero-width spaces, direction marks, bidi formatting, narrow no-break
+# space, invisible operators, BOM and soft hyphen. No-break spaces become plain spaces.
+LATEX_INVISIBLE_CHARS = ''.join(map(chr, [*range(0x200B, 0x2010), *range(0x202A, 0x2030),
+                                          *range(0x2060, 0x2070), 0xFEFF, 0x00AD]))
+LATEX_SANITIZE_RE = re.compile('[' + LATEX_INVISIBLE_CHARS + '\u00A0]')
+LATEX_SANITIZE_TABLE = str.maketrans({'\u00A0': ' ', **dict.fromkeys(LATEX_INVISIBLE_CHARS)})
+
+
+def sanitize_code_for_latex(code):
+    """Remove invisible Unicode characters that cause LaTeX rendering issues (one pass, in C)"""
+    if not LATEX_SANITIZE_RE.search(code):
+        return code
+    if PREPARE_TRACE:
+        for m in list(LATEX_SANITIZE_RE.finditer(code))[:10]:
+            context = code[max(0, m.start() - 20):m.end() + 20].replace('\n', '\\n').replace('\r', '\\r')
+            print(f"[LATEX SANITIZE]   U+{ord(m.group()):04X} at position {m.start()}: ...{context}...")
+    cleaned = code.translate(LATEX_SANITIZE_TABLE)
+    print(f"[LATEX SANITIZE] Removed {len(code) - len(cleaned)} invisible Unicode characters")
+    return cleaned
+
+
+def create_manim_config(script_dir):
+    """Create manim.cfg in the script directory for proper asset path configuration"""
+    config_path = os.path.join(script_dir, 'manim.cfg')
+
+    # Use Manim's default template - don't override with custom template
+    # The default template already has proper UTF-8 support
+    config_content = f"""[CLI]
+# Manim Studio Configuration
+assets_dir = {ASSETS_DIR}
+media_dir = {MEDIA_DIR}
+# Unlimited cache - never delete partial movie files
+max_files_cached = -1
+# Ensure UTF-8 input encoding for LaTeX (critical for subscripts!)
+input_file_encoding = utf-8
+"""
+    try:
+        with open(config_path, 'w', encoding='utf-8', newline='\n') as f:
+            f.write(config_content)
+        print(f"[CONFIG] Created manim.cfg at: {config_path}")
+        return True
+    except Exception as e:
+        print(f"[ERROR] Failed to create manim.cfg: {e}")
+        return False
+
+def clear_preview_folder():
+    """Clear all files in the preview folder before each preview"""
+    import shutil
+    try:
+        if os.path.exists(PREVIEW_DIR):
+            # Remove all contents
+            for item in os.listdir(PREVIEW_DIR):
+                item_path = os.path.join(PREVIEW_DIR, item)
+                try:
+                    if os.path.isfile(item_path) or os.path.islink(item_path):
+                        os.unlink(item_path)
+                    elif os.path.isdir(item_path):
+                        shutil.rmtree(item_path)
+                except Exception as e:
+                    print(f"[WARNING] Failed to delete {item_path}: {e}")
+            print(f"[OK] Cleared preview folder: {PREVIEW_DIR}")
+        else:
+            # Create if doesn't exist
+            os.makedirs(PREVIEW_DIR, exist_ok=True)
+            print(f"[OK] Created preview folder: {PREVIEW_DIR}")
+        return True
+    except Exception as e:
+        print(f"[ERROR] Failed to clear preview folder: {e}")
+        return False
+
+def clear_render_folder():
+    """Clear all files in the render folder before each render"""
+    import shutil
+    try:
+        if os.path.exists(RENDER_DIR):
+            # Remove all contents
+            for item in os.listdir(RENDER_DIR):
+                item_path = os.path.join(RENDER_DIR, item)
+                try:
+                    if os.path.isfile(item_path) or os.path.islink(item_path):
+                        os.unlink(item_path)
+                    elif os.path.isdir(item_path):
+                        shutil.rmtree(item_path)
+                except Exception as e:
+                    print(f"[WARNING] Failed to delete {item_path}: {e}")
+            print(f"[OK] Cleared render folder: {RENDER_DIR}")
+        else:
+            # Create if doesn't exist
+            os.makedirs(RENDER_DIR, exist_ok=True)
+            print(f"[OK] Created render folder: {RENDER_DIR}")
+        return True
+    except Exception as e:
+        print(f"[ERROR] Failed to clear render folder: {e}")
+        return False
+
+def load_settings():
+    """Load settings from file"""
+    settings_file = os.path.join(BASE_DIR, 'settings.json')
+    try:
+        if os.path.exists(settings_file):
+            with open(settings_file, 'r') as f:
+                saved = json.load(f)
+                app_state['settings'].update(saved)
+    except Exception as e:
+        print(f"Error loading settings: {e}")
+
+def save_settings():
+    """Save settings to file"""
+    settings_file = os.path.join(BASE_DIR, 'settings.json')
+    try:
+        with open(settings_file, 'w') as f:
+            json.dump(app_state['settings'], f, indent=2)
+    except Exception as e:
+        print(f"Error saving settings: {e}")
+
+def check_terminal_output_for_errors(session='main'):
+    """
+    Check terminal output for error patterns that indicate manim/python failure.
+    Returns (has_error, error_message) tuple.
+    """
+    # The watcher scans output incrementally as it arrives - this is just its current verdict
+    # for everything written since the session started (or its last reset)
+    terminal = app_state['terminal_sessions'].get(session)
+    if terminal is None:
+        return (False, None)
+    return terminal.error_watcher.result()
+
+
+def get_venv_environment():
+    """Clean environment with the venv activated - for running manim outside the shell"""
+    env = get_clean_environment()
+    bin_dir = os.path.join(VENV_DIR, 'Scripts' if os.name == 'nt' else 'bin')
+    if os.path.isdir(bin_dir):
+        env['VIRTUAL_ENV'] = VENV_DIR
+        env['PATH'] = bin_dir + os.pathsep + env.get('PATH', '')
+    env['TERM'] = 'xterm-256color'  # What xterm.js emulates
+    return env
+
+
+def scene_classes(tree):
+    """Names of Scene subclasses defined at module level, in definition order"""
+    import ast
+    classes = {node.name: node for node in tree.body if isinstance(node, ast.ClassDef)}
+
+    def is_scene(cls, seen=()):
+        for base in cls.bases:
+            name = base.id if isinstance(base, ast.Name) else getattr(base, 'attr', '')
+            if name in classes:
+                # Follow bases defined in the same file
+                if name not in seen and is_scene(classes[name], seen + (name,)):
+                    return True
+            elif name.endswith('Scene'):
+                return True
+        return False
+
+    return [name for name, cls in classes.items() if is_scene(cls)]
+
+
+PREPARED_CODE_CACHE_SIZE = 16
+CODING_HEADER = '#!/usr/bin/env python\n# -*- coding: utf-8 -*-\n'
+
+
+class CodePreparer:
+    """
+    Turns editor code into the script manim runs - once per distinct content.
+
+    Sanitising, adding the PEP 263 coding header and finding the scene classes (from
+    the AST, without executing user code) are memoised by content hash, so rendering
+    or previewing unchanged code again only writes the cached script. Debug dumps are
+    written next to the script only with MANIM_STUDIO_TRACE=1.
+    """
+
+    def __init__(self, size=PREPARED_CODE_CACHE_SIZE):
+        from collections import OrderedDict
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()  # sha256 -> prepared dict
+        self.size = size
+
+    def prepare(self, code):
+        """{'hash', 'code', 'script', 'scenes', 'scene'} for code"""
+        import ast
+        digest = hashlib.sha256(code.encode('utf-8', errors='surrogatepass')).hexdigest()
+        with self._lock:
+            prepared = self._cache.get(digest)
+            if prepared is not None:
+                self._cache.move_to_end(digest)
+                return prepared
+
+        started = time.time()
+        cleaned = sanitize_code_for_latex(code)
+        head = cleaned.split('\n', 2)[:2]
+        script = cleaned if any('coding' in line for line in head) else CODING_HEADER + cleaned
+        try:
+            tree = ast.parse(cleaned)
+            scenes = scene_classes(tree)
+            # Scenes from other libraries (class Demo(Slide)) don't end in "Scene" - like the
+            # old import-free fallback, take the first top-level class that has a base
+            derived = [node.name for node in tree.body if isinstance(node, ast.ClassDef) and node.bases]
+        except SyntaxError:
+            # manim will report the error itself - still pass it a scene name
+            scenes = derived = re.findall(r'^class\s+(\w+)\s*\([^)]*\)\s*:', cleaned, re.MULTILINE)
+        # Prefer a leaf scene - a Scene subclass used as a base by another one is usually a template
+        bases = set(re.findall(r'^class\s+\w+\s*\(([^)]*)\)', cleaned, re.MULTILINE))
+        bases = {name for group in bases for name in re.findall(r'\w+', group)}
+        leaves = [name for name in scenes if name not in bases]
+        prepared = {'hash': digest, 'code': cleaned, 'script': script, 'scenes': scenes,
+                    'scene': (leaves or scenes or derived or [None])[0]}
+
+        with self._lock:
+            self._cache[digest] = prepared
+            while len(self._cache) > self.size:
+                self._cache.popitem(last=False)
+        print(f"[PREPARE] {len(scenes)} scene(s) in {(time.time() - started) * 1000:.1f}ms ({digest[:12]})")
+        return prepared
+
+    def write(self, prepared, script_path):
+        """Write the prepared script and the folder's manim.cfg"""
+        folder = os.path.dirname(script_path)
+        os.makedirs(folder, exist_ok=True)
+        with open(script_path, 'w', encoding='utf-8', newline='\n', errors='replace') as f:
+            f.write(prepared['script'])
+        create_manim_config(folder)
+
+        if PREPARE_TRACE:
+            code = prepared['code']
+            with open(script_path + '.debug.txt', 'w', encoding='utf-8') as f:
+                f.write("=== ORIGINAL CODE (first 1000 chars) ===\n")
+                f.write(code[:1000])
+                f.write("\n\n=== HEX DUMP (first 500 bytes) ===\n")
+                data = code[:500].encode('utf-8')
+                f.write('\n'.join(data[i:i + 16].hex(' ').upper() for i in range(0, len(data), 16)))
+            print(f"[DEBUG] Saved debug file to: {script_path}.debug.txt")
+
+
+code_preparer = CodePreparer()
+
+
+ASTRAL_RE = re.compile('[\U00010000-\U0010FFFF]')
+
+
+class EditorDocument:
+    """
+    Authoritative copy of the editor text, kept in sync with edit deltas.
+
+    The UI opens the document once with the full text, then sends batches of Monaco
+    content changes ({offset, length, text}, applied in order) against the version it
+    last saw. APIs that used to receive the whole editor text accept {'version': n}
+    instead and read the text from here. Values derived from the text (the prepared
+    script, line splits, ...) are memoised per version.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.text = None
+        self.version = 0
+        self._astral = False  # Text has characters outside the BMP - JS offsets are UTF-16 units
+        self._memo = {}
+
+    def open(self, text):
+        with self._lock:
+            self.text = text
+            self.version += 1
+            self._astral = bool(ASTRAL_RE.search(text))
+            self._memo = {}
+            return self.version
+
+    def _index(self, text, offset, astral):
+        """Python string index for a UTF-16 offset from the editor"""
+        if not astral:
+            return offset
+        return len(text.encode('utf-16-le')[:offset * 2].decode('utf-16-le', errors='ignore'))
+
+    def apply(self, base_version, changes):
+        """Apply a batch of changes made on top of base_version; None if out of step"""
+        with self._lock:
+            if self.text is None or base_version != self.version:
+                return None
+            # Built up locally so a malformed batch leaves the document untouched
+            text, astral = self.text, self._astral
+            for change in changes:
+                offset, length = int(change['offset']), int(change['length'])
+                start = self._index(text, offset, astral)
+                end = self._index(text, offset + length, astral) if length else start
+                inserted = change.get('text') or ''
+                text = text[:start] + inserted + text[end:]
+                astral = astral or bool(inserted and ASTRAL_RE.search(inserted))
+            self.text, self._astral = text, astral
+            self.version += 1
+            self._memo = {}
+            return self.version
+
+    def resolve(self, code):
+        """(text, version) for an API argument - {'version': n} or, from older callers, plain text"""
+        if isinstance(code, dict):
+            version = code.get('version')
+            with self._lock:
+                # An older version just means more edits arrived since the call was made
+                if self.text is None or version is None or version > self.version:
+                    raise ValueError('Editor document is out of sync - reopen it with the full text')
+                return self.text, self.version
+        return code or '', None
+
+    def memo(self, version, name, fn, text):
+        """fn(text), reused while the document stays at version (computed directly for plain text)"""
+        if version is None:
+            return fn(text)
+        key = (version, name)
+        with self._lock:
+            if key in self._memo:
+                return self._memo[key]
+        value = fn(text)
+        with self._lock:
+            if version == self.version:
+                self._memo[key] = value
+        return value
+
+
+editor_document = EditorDocument()
+
+
+MANIM_INDEX_DIR = os.path.join(USER_DATA_DIR, 'manim_index')
+MANIM_INDEX_FORMAT = 2  # Bump when MANIM_INDEX_SCRIPT's output changes, so old indexes are rebuilt
+MANIM_INDEX_TIMEOUT = 180  # Importing manim the first time can be slow (font cache, numpy, ...)
+MANIM_INDEX_RECHECK = 5.0  # Seconds between checks of the installed manim version
+COMPLETION_LIMIT = 100
+
+# Run with the venv's python: introspects what `from manim import *` brings into scope and
+# writes {name: [kind, signature, doc, params, bases, members]} as JSON to argv[1].
+# params are [name, default repr, inspect kind] plus the defining class for keywords
+# inherited through **kwargs; members are a class's own public methods and properties.
+MANIM_INDEX_SCRIPT = r'''
+import inspect, json, sys
+import manim
+
+
+def clip(value, limit):
+    value = value or ''
+    return value if len(value) <= limit else value[:limit - 3] + '...'
+
+
+def doc_of(obj, limit):
+    try:
+        return clip(inspect.getdoc(obj), limit)
+    except Exception:
+        return ''
+
+
+def signature_of(obj):
+    try:
+        return inspect.signature(obj)
+    except (TypeError, ValueError):
+        return None
+
+
+def param(p, origin=None):
+    default = None if p.default is p.empty else clip(repr(p.default), 60)
+    return [p.name, default, int(p.kind)] + ([origin] if origin else [])
+
+
+def class_params(cls):
+    sig = signature_of(cls)
+    if sig is None:
+        return '', []
+    params = [param(p) for p in sig.parameters.values() if p.name != 'self']
+    seen = set(p[0] for p in params)
+    var_keyword = any(p.kind == p.VAR_KEYWORD for p in sig.parameters.values())
+    for base in cls.__mro__[1:]:
+        if not var_keyword or base is object:
+            break
+        init = base.__dict__.get('__init__')
+        base_sig = signature_of(init) if init else None
+        if base_sig is None:
+            continue
+        for p in base_sig.parameters.values():
+            if p.name not in seen and p.name != 'self' and p.kind in (p.POSITIONAL_OR_KEYWORD, p.KEYWORD_ONLY):
+                seen.add(p.name)
+                params.append(param(p, base.__name__))
+        var_keyword = any(p.kind == p.VAR_KEYWORD for p in base_sig.parameters.values())
+    return str(sig), params
+
+
+def members_of(cls):
+    members = {}
+    for key, value in vars(cls).items():
+        if key.startswith('_'):
+            continue
+        if isinstance(value, property):
+            members[key] = ['property', '', doc_of(value.fget, 300)]
+            continue
+        func = value.__func__ if isinstance(value, (staticmethod, classmethod)) else value
+        if inspect.isfunction(func):
+            sig = signature_of(func)
+            text = str(sig) if sig else ''
+            if sig and not isinstance(value, staticmethod):
+                text = '(' + ', '.join(str(p) for p in list(sig.parameters.values())[1:]) + ')'
+            members[key] = ['method', text, doc_of(func, 300)]
+    return members
+
+
+symbols = {}
+names = getattr(manim, '__all__', None) or [n for n in dir(manim) if not n.startswith('_')]
+for name in names:
+    obj = getattr(manim, name, None)
+    try:
+        if inspect.ismodule(obj):
+            symbols[name] = ['module', '', doc_of(obj, 300), [], [], {}]
+        elif inspect.isclass(obj):
+            sig, params = class_params(obj)
+            bases = [b.__name__ for b in obj.__mro__[1:] if b is not object]
+            symbols[name] = ['class', sig, doc_of(obj, 1500), params, bases, members_of(obj)]
+        elif callable(obj):
+            sig = signature_of(obj)
+            params = [param(p) for p in sig.parameters.values()] if sig else []
+            symbols[name] = ['function', str(sig) if sig else '', doc_of(obj, 1500), params, [], {}]
+        else:
+            symbols[name] = ['constant', clip(repr(obj), 80), '', [], [], {}]
+    except Exception:
+        symbols[name] = ['constant', '', '', [], [], {}]
+
+with open(sys.argv[1], 'w', encoding='utf-8') as f:
+    json.dump({'version': getattr(manim, '__version__', ''), 'symbols': symbols}, f, separators=(',', ':'))
+'''
+
+
+def venv_python_path():
+    if os.name == 'nt':
+        return os.path.join(VENV_DIR, 'Scripts', 'python.exe')
+    return os.path.join(VENV_DIR, 'bin', 'python')
+
+
+def installed_manim_version():
+    """manim version in the venv, read from its dist-info without importing it; None if absent"""
+    import glob
+    for pattern in (os.path.join(VENV_DIR, 'Lib', 'site-packages', 'manim-*.dist-info'),
+                    os.path.join(VENV_DIR, 'lib', 'python*', 'site-packages', 'manim-*.dist-info')):
+        for path in glob.glob(pattern):
+            return os.path.basename(path)[len('manim-'):-len('.dist-info')]
+    return None
+
+
+def split_signature(signature):
+    """'(a, b=(1, 2), **kw) -> X' -> ['a', 'b=(1, 2)', '**kw']"""
+    parts, depth, current = [], 0, ''
+    body = signature[1:signature.rfind(')')] if signature.startswith('(') else ''
+    for ch in body:
+        if ch in '([{':
+            depth += 1
+        elif ch in ')]}':
+            depth -= 1
+        if ch == ',' and depth == 0:
+            parts.append(current.strip())
+            current = ''
+        else:
+            current += ch
+    if current.strip():
+        parts.append(current.strip())
+    return parts
+
+
+class ManimSymbolIndex:
+    """
+    Symbols exported by the installed manim, for completions, hovers and editor checks.
+
+    Built once per manim version by introspecting the venv (classes with signatures,
+    docstrings, keywords inherited through **kwargs and members), stored zlib-compressed
+    under ~/.manim_studio/manim_index and loaded on first use. Lookups are dict hits and
+    prefix searches are a bisect over the sorted names. Until the index exists queries
+    return nothing and the build runs in the background.
+    """
+
+    def __init__(self, index_dir):
+        self.index_dir = index_dir
+        self._lock = threading.Lock()
+        self._version = None
+        self._symbols = None
+        self._names = None
+        self._sorted = []  # (lowercase name, name), for prefix search
+        self._members = {}  # class -> merged members including bases
+        self._building = False
+        self._failed = None  # Version whose build failed - not retried until manim changes
+        self._checked = (0, None)  # (time, installed version) - the dist-info glob isn't free
+
+    def path_for(self, version):
+        return os.path.join(self.index_dir, f'manim-{version}-v{MANIM_INDEX_FORMAT}.json.z')
+
+    def _load(self):
+        """The symbol table for the installed manim, or None (building it if needed)"""
+        checked_at, version = self._checked
+        if time.time() - checked_at > MANIM_INDEX_RECHECK:
+            version = installed_manim_version()
+            self._checked = (time.time(), version)
+        if not version:
+            return None
+        with self._lock:
+            if self._version == version:
+                return self._symbols
+        import zlib
+        try:
+            with open(self.path_for(version), 'rb') as f:
+                symbols = json.loads(zlib.decompress(f.read()))['symbols']
+        except (OSError, ValueError, KeyError, zlib.error):
+            self._start_build(version)
+            return None
+        with self._lock:
+            self._version, self._symbols = version, symbols
+            self._names = frozenset(symbols)
+            self._sorted = sorted((name.lower(), name) for name in symbols)
+            self._members = {}
+        return symbols
+
+    def names(self):
+        """frozenset of public manim names, or None while unavailable"""
+        return self._names if self._load() is not None else None
+
+    def warm(self):
+        """Load or build the index ahead of the first query"""
+        threading.Thread(target=self._load, daemon=True, name='manim-index-load').start()
+
+    def _start_build(self, version):
+        with self._lock:
+            if self._building or self._failed == version:
+                return
+            self._building = True
+        threading.Thread(target=self._build, args=(version,), daemon=True, name='manim-index').start()
+
+    def _build(self, version):
+        import zlib
+        tmp = self.path_for(version) + '.tmp'
+        try:
+            started = time.time()
+            os.makedirs(self.index_dir, exist_ok=True)
+            result = subprocess.run(low_priority_command([venv_python_path(), '-c', MANIM_INDEX_SCRIPT, tmp]),
+                                    capture_output=True, text=True, encoding='utf-8', errors='replace',
+                                    timeout=MANIM_INDEX_TIMEOUT, cwd=USER_DATA_DIR,
+                                    **low_priority_subprocess_kwargs())
+            if result.returncode != 0:
+                self._failed = version
+                print(f"[MANIM INDEX] Build failed: {result.stderr.strip()[-500:]}")
+                return
+            with open(tmp, 'rb') as f:
+                raw = f.read()
+            count = len(json.loads(raw)['symbols'])
+            with open(tmp, 'wb') as f:
+                f.write(zlib.compress(raw, 9))
+            os.replace(tmp, self.path_for(version))
+            print(f"[MANIM INDEX] Indexed manim {version}: {count} symbols in {time.time() - started:.1f}s")
+        except Exception as e:
+            self._failed = version
+            print(f"[MANIM INDEX] Build failed: {e}")
+        finally:
+            with self._lock:
+                self._building = False
+            if os.path.exists(tmp):
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+
+    def members(self, class_name):
+        """{member: [kind, signature, doc]} for a class, including inherited members"""
+        symbols = self._load()
+        if not symbols or symbols.get(class_name, [''])[0] != 'class':
+            return {}
+        with self._lock:
+            cached = self._members.get(class_name)
+        if cached is None:
+            cached = {}
+            for name in reversed([class_name] + symbols[class_name][4]):
+                if name in symbols and symbols[name][0] == 'class':
+                    cached.update(symbols[name][5])
+            with self._lock:
+                self._members[class_name] = cached
+        return cached
+
+    def lookup(self, name, owner=None):
+        """(kind, signature, doc, params) for a symbol or a member of the owner class"""
+        symbols = self._load()
+        if not symbols:
+            return None
+        if owner:
+            member = self.members(owner).get(name)
+            return (member[0], member[1], member[2], []) if member else None
+        record = symbols.get(name)
+        return tuple(record[:4]) if record else None
+
+    def complete(self, prefix, owner=None, call=None, limit=COMPLETION_LIMIT):
+        """Completion items for prefix - members of owner, or top-level names plus call keywords"""
+        import bisect
+        symbols = self._load()
+        if not symbols:
+            return []
+        low = prefix.lower()
+        items = []
+        if owner:
+            for name, (kind, signature, doc) in self.members(owner).items():
+                if name.lower().startswith(low):
+                    items.append({'label': name, 'kind': kind, 'detail': signature, 'doc': doc.split('\n\n')[0]})
+            items.sort(key=lambda item: item['label'].lower())
+            return items[:limit]
+
+        if call and call in symbols:
+            for p in symbols[call][3]:
+                # Keyword-capable parameters (POSITIONAL_OR_KEYWORD=1, KEYWORD_ONLY=3)
+                if p[2] in (1, 3) and p[0].lower().startswith(low):
+                    detail = f'= {p[1]}' if p[1] is not None else ''
+                    if len(p) > 3:
+                        detail = f'{detail} (from {p[3]})'.strip()
+                    items.append({'label': p[0], 'kind': 'keyword', 'detail': detail, 'insertText': f'{p[0]}='})
+
+        start = bisect.bisect_left(self._sorted, (low,))
+        for key, name in self._sorted[start:]:
+            if not key.startswith(low) or len(items) >= limit:
+                break
+            kind, signature, doc = symbols[name][:3]
+            items.append({'label': name, 'kind': kind, 'detail': signature, 'doc': doc.split('\n\n')[0]})
+        return items
+
+    def hover(self, name, owner=None):
+        """Markdown for a symbol, or None"""
+        found = self.lookup(name, owner)
+        if not found:
+            return None
+        kind, signature, doc, params = found
+        if kind == 'constant':
+            head = f'{name} = {signature}' if signature else name
+        elif kind == 'module':
+            head = f'module {name}'
+        elif kind == 'property':
+            head = f'(property) {owner}.{name}'
+        else:
+            prefix = 'class ' if kind == 'class' else 'def '
+            head = f'{prefix}{owner + "." if owner else ""}{name}{signature}'
+        text = f'```python\n{head}\n```'
+        if doc:
+            text += f'\n\n{doc}'
+        inherited = [p[0] for p in params if len(p) > 3]
+        if inherited:
+            text += '\n\n**Inherited keywords:** ' + ', '.join(inherited)
+        return text
+
+    def signature_help(self, name, owner=None):
+        """{label, parameters, doc} for a callable, or None"""
+        found = self.lookup(name, owner)
+        if not found or found[0] not in ('class', 'function', 'method'):
+            return None
+        kind, signature, doc, params = found
+        parameters = split_signature(signature.split(' -> ')[0])
+        # Keywords inherited through **kwargs are listed just before it
+        inherited = [f'{p[0]}={p[1]}' if p[1] is not None else p[0] for p in params if len(p) > 3]
+        tail = [p for p in parameters if p.startswith('**')]
+        parameters = [p for p in parameters if not p.startswith('**')] + inherited + tail
+        return {'label': f'{name}({", ".join(parameters)})', 'parameters': parameters, 'doc': doc.split('\n\n')[0]}
+
+    def owner_class(self, owner, lines, line):
+        """Indexed class for the expression before a '.', using the document for self and variables"""
+        symbols = self._load()
+        if not symbols or not owner:
+            return None
+        if symbols.get(owner, [''])[0] == 'class':
+            return owner
+        line = min(max(int(line or 0), 1), len(lines)) if lines else 0
+        if owner == 'self':
+            # Enclosing class, following bases defined in the same file to an indexed one
+            indent = len(lines[line - 1]) - len(lines[line - 1].lstrip()) if line else 0
+            for text in reversed(lines[:line]):
+                m = re.match(r'(\s*)class\s+\w+\s*\(([^)]*)\)', text)
+                if m and len(m.group(1)) < indent:
+                    return self._first_indexed_base(m.group(2), lines)
+            return None
+        # Last `owner = Class(` assignment above the cursor
+        pattern = re.compile(rf'^\s*{re.escape(owner)}\s*=\s*(\w+)\s*\(')
+        for text in reversed(lines[:line]):
+            m = pattern.match(text)
+            if m:
+                return m.group(1) if symbols.get(m.group(1), [''])[0] == 'class' else None
+        return None
+
+    def _first_indexed_base(self, bases, lines, depth=0):
+        symbols = self._symbols or {}
+        for base in re.findall(r'\w+', bases):
+            if symbols.get(base, [''])[0] == 'class':
+                return base
+            if depth < 5:
+                for text in lines:
+                    m = re.match(rf'\s*class\s+{base}\s*\(([^)]*)\)', text)
+                    if m:
+                        found = self._first_indexed_base(m.group(1), lines, depth + 1)
+                        if found:
+                            return found
+        return None
+
+
+manim_symbols = ManimSymbolIndex(MANIM_INDEX_DIR)
+
+
+DIAGNOSTICS_DEBOUNCE = 0.25  # Quiet time after the last request before checking
+DIAGNOSTICS_CACHE_SIZE = 32
+LATEX_MOBJECTS = {'MathTex', 'SingleStringMathTex', 'Tex'}
+LATEX_MATH_MOBJECTS = {'MathTex', 'SingleStringMathTex'}
+# Escapes that turn "\frac", "\theta", "\nabla", "\vec", ... into control characters
+LATEX_ESCAPE_RE = re.compile(r'(?<!\\)(?:\\\\)*\\([abfnrtv][A-Za-z]*)')
+
+
+class DiagnosticsService:
+    """
+    Static checks for the editor, run in a background worker.
+
+    Requests are debounced - while the user keeps typing only the newest document
+    version is checked - and results are cached by content, so undo or re-checking an
+    unchanged document is instant. Finished results are pushed as 'diagnostics' events.
+    Beyond syntax errors it reports undefined names (with manim-aware suggestions),
+    files without a Scene subclass, and MathTex/Tex strings that LaTeX will reject.
+    """
+
+    def __init__(self):
+        from collections import OrderedDict
+        self._cond = threading.Condition()
+        self._cache = OrderedDict()  # sha1(text) -> diagnostics
+        self._pending = None  # (version, text) waiting to be checked
+        self._requested_at = 0
+        self._thread = None
+
+    @staticmethod
+    def _key(text):
+        return hashlib.sha1(text.encode('utf-8', errors='surrogatepass')).hexdigest()
+
+    def cached(self, text):
+        with self._cond:
+            key = self._key(text)
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        return None
+
+    def request(self, text, version):
+        """Cached diagnostics for text, or None after queueing a background check"""
+        result = self.cached(text)
+        if result is not None:
+            return result
+        with self._cond:
+            self._pending = (version, text)
+            self._requested_at = time.time()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True, name='diagnostics')
+                self._thread.start()
+            self._cond.notify()
+        return None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None:
+                    self._cond.wait()
+                # Debounce - a newer version arriving restarts the wait
+                while time.time() - self._requested_at < DIAGNOSTICS_DEBOUNCE:
+                    self._cond.wait(DIAGNOSTICS_DEBOUNCE - (time.time() - self._requested_at))
+                version, text = self._pending
+                self._pending = None
+            try:
+                started = time.time()
+                diagnostics = self.analyze(text)
+                with self._cond:
+                    self._cache[self._key(text)] = diagnostics
+                    while len(self._cache) > DIAGNOSTICS_CACHE_SIZE:
+                        self._cache.popitem(last=False)
+                ui_events.publish_latest('diagnostics', {'version': version, 'errors': diagnostics})
+                print(f"[DIAGNOSTICS] v{version}: {len(diagnostics)} issue(s) in {(time.time() - started) * 1000:.0f}ms")
+            except Exception as e:
+                print(f"[DIAGNOSTICS ERROR] {e}")
+
+    def analyze(self, text):
+        """All diagnostics for text, sorted by position"""
+        import ast
+        if not text.strip():
+            return []
+        try:
+            tree = ast.parse(text)
+        except SyntaxError as e:
+            return [{'type': 'error', 'source': 'syntax', 'line': e.lineno or 0, 'column': e.offset or 0,
+                     'message': str(e.msg), 'text': e.text.strip() if e.text else ''}]
+        except Exception as e:
+            return [{'type': 'error', 'source': 'syntax', 'line': 0, 'column': 0, 'message': str(e), 'text': ''}]
+
+        lines = text.splitlines()
+        diagnostics = []
+        self._check_names(tree, lines, diagnostics)
+        self._check_scene(tree, diagnostics)
+        self._check_latex(tree, text, lines, diagnostics)
+        diagnostics.sort(key=lambda d: (d['line'], d['column']))
+        return diagnostics
+
+    @staticmethod
+    def _diagnostic(kind, source, lines, node, message):
+        line = getattr(node, 'lineno', 0) or 0
+        source_line = lines[line - 1] if 0 < line <= len(lines) else ''
+        # ast columns are UTF-8 byte offsets, the editor wants characters
+        column = len(source_line.encode('utf-8')[:getattr(node, 'col_offset', 0)].decode('utf-8', errors='ignore')) + 1
+        return {'type': kind, 'source': source, 'line': line, 'column': column if line else 0,
+                'message': message, 'text': source_line.strip()}
+
+    def _check_names(self, tree, lines, diagnostics):
+        import ast
+        import builtins
+        import difflib
+
+        star_modules = {node.module for node in ast.walk(tree)
+                        if isinstance(node, ast.ImportFrom) and any(a.name == '*' for a in node.names)}
+        manim_names = manim_symbols.names() if any((m or '').split('.')[0] == 'manim' for m in star_modules) else set()
+        if manim_names is None or any((m or '').split('.')[0] != 'manim' for m in star_modules):
+            return  # A star import we can't see into - any name could be defined
+
+        bound = set(dir(builtins)) | {'__file__', '__class__'} | manim_names
+        loads = []
+        manim_aliases = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Name):
+                if isinstance(node.ctx, ast.Load):
+                    loads.append(node)
+                else:
+                    bound.add(node.id)
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                bound.add(node.name)
+            elif isinstance(node, ast.arg):
+                bound.add(node.arg)
+            elif isinstance(node, ast.alias):
+                bound.add((node.asname or node.name).split('.')[0])
+            elif isinstance(node, (ast.Global, ast.Nonlocal)):
+                bound.update(node.names)
+            elif isinstance(getattr(node, 'name', None), str):
+                bound.add(node.name)  # except ... as e, match captures, type parameters
+            if isinstance(getattr(node, 'rest', None), str):
+                bound.add(node.rest)
+            if isinstance(node, ast.Import):
+                manim_aliases.update(a.asname or a.name for a in node.names if a.name == 'manim')
+
+        reported = set()
+        for node in loads:
+            if node.id in bound or (node.lineno, node.id) in reported:
+                continue
+            reported.add((node.lineno, node.id))
+            match = difflib.get_close_matches(node.id, manim_names, n=1, cutoff=0.8) if manim_names else []
+            if match and node.id[:1].isupper():
+                message = f"'{node.id}' is not a manim symbol - did you mean '{match[0]}'?"
+            else:
+                match = difflib.get_close_matches(node.id, bound, n=1, cutoff=0.8)
+                message = f"Undefined name '{node.id}'" + (f" - did you mean '{match[0]}'?" if match else '')
+            diagnostics.append(self._diagnostic('error', 'names', lines, node, message))
+
+        # manim.Foo / mn.Foo with a plain `import manim`
+        if manim_aliases:
+            names = manim_symbols.names()
+            if names:
+                for node in ast.walk(tree):
+                    if (isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name)
+                            and node.value.id in manim_aliases and node.attr not in names):
+                        match = difflib.get_close_matches(node.attr, names, n=1, cutoff=0.8)
+                        message = f"manim has no attribute '{node.attr}'" + (f" - did you mean '{match[0]}'?" if match else '')
+                        diagnostics.append(self._diagnostic('error', 'names', lines, node, message))
+
+    def _check_scene(self, tree, diagnostics):
+        if not scene_classes(tree):
+            diagnostics.append({'type': 'warning', 'source': 'scene', 'line': 1, 'column': 0, 'text': '',
+                                'message': 'No Scene subclass found - rendering needs a class that inherits from Scene'})
+
+    def _check_latex(self, tree, text, lines, diagnostics):
+        import ast
+        for node in ast.walk(tree):
+            if not isinstance(node, ast.Call):
+                continue
+            func = node.func.id if isinstance(node.func, ast.Name) else getattr(node.func, 'attr', None)
+            if func not in LATEX_MOBJECTS:
+                continue
+            strings = [arg for arg in node.args if isinstance(arg, ast.Constant) and isinstance(arg.value, str)]
+            if not strings:
+                continue
+
+            for arg in strings:
+                segment = ast.get_source_segment(text, arg) or ''
+                if 'r' in re.match(r'[A-Za-z]*', segment).group().lower():
+                    continue
+                for m in LATEX_ESCAPE_RE.finditer(segment):
+                    diagnostics.append(self._diagnostic(
+                        'error', 'latex', lines, arg,
+                        f"'\\{m.group(1)}' in a normal string is an escape sequence - use a raw string r\"...\""))
+                    break
+
+            joined = ' '.join(arg.value for arg in strings)
+            unescaped = re.sub(r'\\.', '', joined)
+            depth = 0
+            for ch in unescaped:
+                depth += {'{': 1, '}': -1}.get(ch, 0)
+                if depth < 0:
+                    break
+            if depth:
+                diagnostics.append(self._diagnostic('error', 'latex', lines, node,
+                                                    f'{func}: unbalanced braces in LaTeX'))
+            lefts = len(re.findall(r'\\left(?![A-Za-z])', joined))
+            rights = len(re.findall(r'\\right(?![A-Za-z])', joined))
+            if lefts != rights:
+                diagnostics.append(self._diagnostic('error', 'latex', lines, node,
+                                                    f'{func}: {lefts} \\left but {rights} \\right'))
+            if func in LATEX_MATH_MOBJECTS:
+                if '$' in unescaped:
+                    diagnostics.append(self._diagnostic('warning', 'latex', lines, node,
+                                                        f'{func} is already in math mode - remove the $ delimiters'))
+                if not any(k.arg == 'tex_template' for k in node.keywords):
+                    other = next((ch for ch in joined if ord(ch) > 127), None)
+                    if other:
+                        diagnostics.append(self._diagnostic(
+                            'error', 'latex', lines, node,
+                            f"{func}: '{other}' is not supported by the default LaTeX template - use a command such as \\alpha"))
+
+
+diagnostics_service = DiagnosticsService()
+
+
+AUTOSAVE_JOURNAL_PATH = os.path.join(AUTOSAVE_DIR, 'journal.db')
+# (max age in seconds, keep one snapshot per this many seconds) - anything older than the
+# last tier is dropped. Recent work is kept at full resolution, older history gets sparser.
+AUTOSAVE_THINNING = [
+    (60 * 60, 0),
+    (24 * 60 * 60, 10 * 60),
+    (7 * 24 * 60 * 60, 60 * 60),
+    (30 * 24 * 60 * 60, 24 * 60 * 60),
+]
+AUTOSAVE_KEYFRAME_INTERVAL = 50  # Deltas against one full snapshot before a new one is stored
+AUTOSAVE_ID_PREFIX = 'autosave:'
+
+
+class AutosaveJournal:
+    """
+    Append-only autosave history in a single SQLite file.
+
+    A snapshot is only written when the code's hash differs from the latest one. Text is
+    stored zlib-compressed, either in full (a keyframe) or as a line delta against the most
+    recent keyframe, so restoring any snapshot touches at most two rows. Old snapshots are
+    thinned by age according to AUTOSAVE_THINNING.
+    """
+
+    def __init__(self, db_path, thinning=AUTOSAVE_THINNING):
+        self.db_path = db_path
+        self.thinning = thinning
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _db(self):
+        if self._conn is None:
+            import sqlite3
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.executescript('''
+                PRAGMA journal_mode = WAL;
+                CREATE TABLE IF NOT EXISTS blobs (
+                    hash TEXT PRIMARY KEY,
+                    base TEXT,            -- keyframe hash this delta applies to, NULL for a keyframe
+                    data BLOB NOT NULL    -- zlib(text) or zlib(JSON delta)
+                );
+                CREATE TABLE IF NOT EXISTS snapshots (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    created REAL NOT NULL,
+                    file_path TEXT NOT NULL DEFAULT '',
+                    hash TEXT NOT NULL,
+                    size INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS snapshots_created ON snapshots (created);
+                CREATE INDEX IF NOT EXISTS blobs_base ON blobs (base);
+            ''')
+            self._conn = conn
+            self._import_legacy()
+        return self._conn
+
+    @staticmethod
+    def _delta(base, text):
+        """Line delta: [start, end] copies base lines, a string is inserted as is"""
+        import difflib
+        a = base.splitlines(keepends=True)
+        b = text.splitlines(keepends=True)
+        ops = []
+        for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(None, a, b, autojunk=False).get_opcodes():
+            if tag == 'equal':
+                ops.append([i1, i2])
+            elif j2 > j1:
+                ops.append(''.join(b[j1:j2]))
+        return ops
+
+    @staticmethod
+    def _apply(base, ops):
+        a = base.splitlines(keepends=True)
+        return ''.join(op if isinstance(op, str) else ''.join(a[op[0]:op[1]]) for op in ops)
+
+    def _read(self, digest):
+        import zlib
+        base, data = self._db().execute('SELECT base, data FROM blobs WHERE hash = ?', (digest,)).fetchone()
+        if base is None:
+            return zlib.decompress(data).decode('utf-8')
+        return self._apply(self._read(base), json.loads(zlib.decompress(data)))
+
+    def _store(self, digest, code):
+        """Write the blob for code unless it already exists"""
+        import zlib
+        db = self._db()
+        if db.execute('SELECT 1 FROM blobs WHERE hash = ?', (digest,)).fetchone():
+            return
+        full = zlib.compress(code.encode('utf-8'), 6)
+        keyframe = db.execute('SELECT hash FROM blobs WHERE base IS NULL ORDER BY rowid DESC LIMIT 1').fetchone()
+        if keyframe:
+            deltas = db.execute('SELECT COUNT(*) FROM blobs WHERE base = ?', keyframe).fetchone()[0]
+            if deltas < AUTOSAVE_KEYFRAME_INTERVAL:
+                delta = zlib.compress(json.dumps(self._delta(self._read(keyframe[0]), code)).encode('utf-8'), 6)
+                # Once edits drift far from the keyframe a fresh full copy is cheaper
+                if len(delta) < len(full) // 2:
+                    db.execute('INSERT INTO blobs (hash, base, data) VALUES (?, ?, ?)', (digest, keyframe[0], delta))
+                    return
+        db.execute('INSERT INTO blobs (hash, base, data) VALUES (?, NULL, ?)', (digest, full))
+
+    def append(self, code, file_path='', created=None):
+        """Record a snapshot; returns (snapshot row, whether anything was written)"""
+        digest = hashlib.sha256(code.encode('utf-8')).hexdigest()
+        created = created or time.time()
+        with self._lock:
+            db = self._db()
+            latest = db.execute('SELECT id, created, file_path, hash, size FROM snapshots '
+                                'ORDER BY id DESC LIMIT 1').fetchone()
+            if latest and latest[3] == digest and latest[2] == (file_path or ''):
+                return latest, False
+            self._store(digest, code)
+            cur = db.execute('INSERT INTO snapshots (created, file_path, hash, size) VALUES (?, ?, ?, ?)',
+                             (created, file_path or '', digest, len(code)))
+            self._thin(created)
+            db.commit()
+            return (cur.lastrowid, created, file_path or '', digest, len(code)), True
+
+    def _thin(self, now):
+        """Drop snapshots that share an age bucket with a newer one, then unreferenced blobs"""
+        db = self._db()
+        oldest = now - self.thinning[-1][0]
+        db.execute('DELETE FROM snapshots WHERE created < ?', (oldest,))
+        newer_than = now - self.thinning[0][0]
+        for max_age, bucket in self.thinning:
+            if bucket:
+                # Keep the newest snapshot per bucket within this tier
+                db.execute('''
+                    DELETE FROM snapshots WHERE created >= ? AND created < ? AND id NOT IN (
+                        SELECT MAX(id) FROM snapshots WHERE created >= ? AND created < ?
+                        GROUP BY CAST(created / ? AS INTEGER))
+                ''', (now - max_age, newer_than, now - max_age, newer_than, bucket))
+            newer_than = now - max_age
+        self._collect()
+
+    def _collect(self):
+        db = self._db()
+        db.execute('DELETE FROM blobs WHERE base IS NOT NULL AND hash NOT IN (SELECT hash FROM snapshots)')
+        db.execute('DELETE FROM blobs WHERE base IS NULL AND hash NOT IN (SELECT hash FROM snapshots) '
+                   'AND hash NOT IN (SELECT base FROM blobs WHERE base IS NOT NULL)')
+
+    def list(self, limit=None, offset=0):
+        """Newest first - (id, created, file_path, hash, size) rows and the total count"""
+        with self._lock:
+            db = self._db()
+            rows = db.execute('SELECT id, created, file_path, hash, size FROM snapshots ORDER BY id DESC LIMIT ? OFFSET ?',
+                              (-1 if limit is None else int(limit), int(offset))).fetchall()
+            count = db.execute('SELECT COUNT(*) FROM snapshots').fetchone()[0]
+        return rows, count
+
+    def load(self, snapshot_id):
+        """Code for a snapshot, or None if it no longer exists"""
+        with self._lock:
+            row = self._db().execute('SELECT hash FROM snapshots WHERE id = ?', (snapshot_id,)).fetchone()
+            return self._read(row[0]) if row else None
+
+    def delete(self, snapshot_id):
+        with self._lock:
+            deleted = self._db().execute('DELETE FROM snapshots WHERE id = ?', (snapshot_id,)).rowcount
+            self._collect()
+            self._db().commit()
+        return deleted
+
+    def clear(self):
+        with self._lock:
+            db = self._db()
+            deleted = db.execute('DELETE FROM snapshots').rowcount
+            db.execute('DELETE FROM blobs')
+            db.commit()
+            db.execute('VACUUM')
+        return deleted
+
+    def _import_legacy(self):
+        """Move autosave_<timestamp>.py/.json pairs from older versions into the journal"""
+        from datetime import datetime
+        try:
+            names = sorted(n for n in os.listdir(AUTOSAVE_DIR) if n.startswith('autosave_') and n.endswith('.py'))
+        except OSError:
+            return
+        db = self._conn
+        for name in names:
+            path = os.path.join(AUTOSAVE_DIR, name)
+            meta_path = path[:-3] + '.json'
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    code = f.read()
+                file_path = ''
+                if os.path.exists(meta_path):
+                    with open(meta_path, 'r', encoding='utf-8') as f:
+                        file_path = json.load(f).get('file_path', '') or ''
+                try:
+                    created = datetime.strptime(name[len('autosave_'):-3], '%Y%m%d_%H%M%S').timestamp()
+                except ValueError:
+                    created = os.path.getmtime(path)
+                digest = hashlib.sha256(code.encode('utf-8')).hexdigest()
+                self._store(digest, code)
+                db.execute('INSERT INTO snapshots (created, file_path, hash, size) VALUES (?, ?, ?, ?)',
+                           (created, file_path, digest, len(code)))
+                db.commit()
+                os.remove(path)
+                if os.path.exists(meta_path):
+                    os.remove(meta_path)
+            except Exception as e:
+                print(f"[AUTOSAVE] Could not import {name}: {e}")
+        if names:
+            print(f"[AUTOSAVE] Imported {len(names)} legacy autosave(s) into the journal")
+
+    @staticmethod
+    def describe(row):
+        """API shape for a snapshot row (autosave_file is an opaque id for load/delete)"""
+        from datetime import datetime
+        snapshot_id, created, file_path, digest, size = row
+        return {
+            'id': snapshot_id,
+            'autosave_file': f'{AUTOSAVE_ID_PREFIX}{snapshot_id}',
+            'timestamp': datetime.fromtimestamp(created).strftime('%Y%m%d_%H%M%S'),
+            'created': created,
+            'file_path': file_path,
+            'hash': digest,
+            'size': size,
+        }
+
+    @staticmethod
+    def parse_id(autosave_file):
+        """Snapshot id from an autosave_file value, None if it isn't one"""
+        text = str(autosave_file or '')
+        if text.startswith(AUTOSAVE_ID_PREFIX) and text[len(AUTOSAVE_ID_PREFIX):].isdigit():
+            return int(text[len(AUTOSAVE_ID_PREFIX):])
+        return None
+
+
+autosave_journal = AutosaveJournal(AUTOSAVE_JOURNAL_PATH)
+
+
+PROJECTS_DIR = os.path.join(USER_DATA_DIR, 'projects')
+PROJECT_RENDER_WORKERS = 2  # Scenes rendered at once - manim is CPU and memory heavy
+PROJECT_RENDER_TIMEOUT = 3600
+PROJECT_ASSET_RE = re.compile(r'''["']([^"'\n]+\.[A-Za-z0-9]{2,5})["']''')
+
+
+def get_quality_flag(quality):
+    """Convert quality preset to manim flag or custom resolution"""
+    if quality in QUALITY_PRESETS:
+        return QUALITY_PRESETS[quality][0]  # Return the flag (e.g., '-ql', '-qm')
+    else:
+        # Validate custom resolution format: should be WIDTHxHEIGHT
+        if 'x' in str(quality).lower():
+            # Custom resolution like "1920x1080"
+            return f'-r{quality}'
+        else:
+            # Invalid quality - fallback to 720p
+            print(f"[WARNING] Invalid quality '{quality}', using 720p fallback")
+            return QUALITY_PRESETS["720p"][0]
+
+
+class ProjectTimeline:
+    """
+    Multi-scene projects: an ordered list of scenes assembled into one video.
+
+    A project is a JSON file under ~/.manim_studio/projects:
+        {"name": ..., "output": "film.mp4",
+         "scenes": [{"id", "title", "file" or "code", "scene", "quality", "fps"}]}
+
+    Every scene gets a hash of its code, scene class, quality, fps and the content of
+    the assets its code refers to. build() re-renders only the scenes whose hash has no
+    render yet - in parallel, each in its own media dir - and re-assembles the output
+    with smart_combine (stream copy where the renders match) only when the sequence
+    of scene hashes changed.
+    """
+
+    def __init__(self, projects_dir):
+        self.projects_dir = projects_dir
+        self._lock = threading.Lock()
+        self._building = set()
+
+    # ---- project files ----
+
+    @staticmethod
+    def slug(name):
+        slug = re.sub(r'[^\w\- ]+', '', str(name or '')).strip()
+        if not slug:
+            raise ValueError('Project name cannot be empty')
+        return slug
+
+    def _project_path(self, name):
+        return os.path.join(self.projects_dir, f'{self.slug(name)}.json')
+
+    def _work_dir(self, name):
+        return os.path.join(self.projects_dir, self.slug(name))
+
+    def list(self):
+        if not os.path.isdir(self.projects_dir):
+            return []
+        projects = []
+        for entry in sorted(os.listdir(self.projects_dir)):
+            if entry.endswith('.json'):
+                try:
+                    projects.append(self.load(entry[:-5]))
+                except (OSError, ValueError) as e:
+                    print(f"[PROJECT] Skipping {entry}: {e}")
+        return projects
+
+    def load(self, name):
+        with open(self._project_path(name), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def save(self, project):
+        """Validate and write a project; returns the stored project"""
+        import uuid
+        name = project.get('name')
+        scenes = []
+        for scene in project.get('scenes') or []:
+            if not scene.get('file') and not scene.get('code'):
+                raise ValueError(f"Scene '{scene.get('title') or scene.get('scene') or '?'}' has no file or code")
+            scenes.append(dict(scene, id=str(scene.get('id') or uuid.uuid4().hex[:8]),
+                               quality=scene.get('quality') or '1080p', fps=int(scene.get('fps') or 30)))
+        if len({s['id'] for s in scenes}) != len(scenes):
+            raise ValueError('Scene ids must be unique')
+        # The output is written into MEDIA_DIR - keep only a plain file name (no folders or ..)
+        base = re.split(r'[\\/]', str(project.get('output') or ''))[-1]
+        stem = re.sub(r'[^\w\- .]+', '', os.path.splitext(base)[0]).strip(' .')
+        stored = dict(project, name=name, scenes=scenes, output=f'{stem or self.slug(name)}.mp4')
+        os.makedirs(self.projects_dir, exist_ok=True)
+        path = self._project_path(name)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(stored, f, indent=2)
+        os.replace(path + '.tmp', path)
+        return stored
+
+    def delete(self, name):
+        import shutil
+        os.remove(self._project_path(name))
+        shutil.rmtree(self._work_dir(name), ignore_errors=True)
+
+    def _load_state(self, name):
+        try:
+            with open(os.path.join(self._work_dir(name), 'build.json'), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self, name, state):
+        path = os.path.join(self._work_dir(name), 'build.json')
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+        os.replace(path + '.tmp', path)
+
+    # ---- change tracking ----
+
+    @staticmethod
+    def scene_code(scene):
+        if scene.get('code'):
+            return scene['code']
+        with open(scene['file'], 'r', encoding='utf-8') as f:
+            return f.read()
+
+    @staticmethod
+    def scene_hash(scene, code):
+        """Everything a scene's render depends on, as one SHA-256"""
+        digest = hashlib.sha256()
+        for part in (code, scene.get('scene') or '', str(scene.get('quality')), str(scene.get('fps'))):
+            digest.update(part.encode('utf-8') + b'\0')
+        # Assets the code names (relative paths resolve against ASSETS_DIR, like the render cwd)
+        for ref in sorted(set(PROJECT_ASSET_RE.findall(code))):
+            path = ref if os.path.isabs(ref) else os.path.join(ASSETS_DIR, ref)
+            if os.path.isfile(path):
+                digest.update(ref.encode('utf-8') + b'\0')
+                digest.update((blob_store.content_hash(path) or file_sha256(path)).encode('ascii'))
+        return digest.hexdigest()
+
+    def _plan_scene(self, project, scene):
+        """(scene, code, hash, render_path) - the render is reused while the hash stays the same"""
+        code = self.scene_code(scene)
+        digest = self.scene_hash(scene, code)
+        render_path = os.path.join(self._work_dir(project['name']), 'renders', f"{scene['id']}_{digest[:16]}.mp4")
+        return scene, code, digest, render_path
+
+    @staticmethod
+    def _assembly_hash(project, plan):
+        digest = hashlib.sha256(project['output'].encode('utf-8'))
+        for _, _, scene_hash, _ in plan:
+            digest.update(scene_hash.encode('ascii'))
+        return digest.hexdigest()
+
+    def status(self, name):
+        """Which scenes (and whether the output) would be rebuilt by build()"""
+        project = self.load(name)
+        state = self._load_state(name)
+        scenes = []
+        plan = []
+        for scene in project['scenes']:
+            try:
+                item = self._plan_scene(project, scene)
+                plan.append(item)
+                scenes.append({'id': scene['id'], 'title': scene.get('title', ''), 'hash': item[2],
+                               'stale': not os.path.exists(item[3])})
+            except OSError as e:
+                scenes.append({'id': scene['id'], 'title': scene.get('title', ''), 'stale': True, 'error': str(e)})
+        output_path = os.path.join(MEDIA_DIR, project['output'])
+        output_stale = (len(plan) != len(project['scenes']) or not os.path.exists(output_path) or
+                        state.get('assemblyHash') != self._assembly_hash(project, plan))
+        return {'name': project['name'], 'scenes': scenes, 'outputStale': output_stale,
+                'outputPath': output_path, 'builtAt': state.get('builtAt')}
+
+    # ---- building ----
+
+    def build(self, name, force=False):
+        """Render stale scenes in parallel and re-assemble the output if anything changed"""
+        import shutil
+        from concurrent.futures import ThreadPoolExecutor
+        project = self.load(name)
+        if not project['scenes']:
+            raise ValueError('Project has no scenes')
+        slug = self.slug(name)
+        with self._lock:
+            if slug in self._building:
+                raise RuntimeError(f"Project '{project['name']}' is already building")
+            self._building.add(slug)
+        try:
+            renders_dir = os.path.join(self._work_dir(name), 'renders')
+            os.makedirs(renders_dir, exist_ok=True)
+            plan = [self._plan_scene(project, scene) for scene in project['scenes']]
+            stale = [item for item in plan if force or not os.path.exists(item[3])]
+            print(f"[PROJECT] {project['name']}: {len(stale)} of {len(plan)} scene(s) to render")
+
+            job = BackgroundJob.current()
+            errors = []
+            done = []
+
+            def render(item):
+                BackgroundJob.bind(job)
+                scene = item[0]
+                try:
+                    self._render_scene(project, *item)
+                except JobCancelled:
+                    raise
+                except Exception as e:
+                    print(f"[PROJECT] Scene {scene['id']} failed: {e}")
+                    errors.append({'id': scene['id'], 'title': scene.get('title', ''), 'error': str(e)})
+                done.append(scene['id'])
+                report_job_progress(len(done) / len(stale), f"Rendered {len(done)} of {len(stale)} scene(s)")
+
+            set_job_span(0.0, 0.85)
+            if stale:
+                with ThreadPoolExecutor(max_workers=PROJECT_RENDER_WORKERS, thread_name_prefix='scene') as pool:
+                    list(pool.map(render, stale))
+            if errors:
+                failed = {e['id'] for e in errors}
+                return {'status': 'error', 'message': f'{len(errors)} scene(s) failed to render',
+                        'errors': errors, 'rendered': [i for i in done if i not in failed]}
+
+            # Renders for old versions of the scenes are no longer needed
+            current = {os.path.basename(item[3]) for item in plan}
+            for entry in os.listdir(renders_dir):
+                if entry not in current:
+                    os.remove(os.path.join(renders_dir, entry))
+
+            set_job_span(0.85, 1.0)
+            state = self._load_state(name)
+            output_path = os.path.join(MEDIA_DIR, project['output'])
+            assembly_hash = self._assembly_hash(project, plan)
+            assembled = force or state.get('assemblyHash') != assembly_hash or not os.path.exists(output_path)
+            stats = {}
+            if assembled:
+                tmp_path = os.path.join(self._work_dir(name), 'assembly.mp4')
+                try:
+                    if len(plan) == 1:
+                        shutil.copyfile(plan[0][3], tmp_path)
+                    else:
+                        stats = smart_combine([item[3] for item in plan], tmp_path)
+                    os.makedirs(MEDIA_DIR, exist_ok=True)
+                    os.replace(tmp_path, output_path)
+                finally:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                asset_index.refresh_path(output_path)
+                proxy_service.request(output_path)
+                seek_preview_service.request(output_path)
+            self._save_state(name, {'assemblyHash': assembly_hash, 'builtAt': time.time(),
+                                    'scenes': {item[0]['id']: item[2] for item in plan}})
+
+            print(f"[PROJECT] {project['name']}: rendered {len(stale)}, reused {len(plan) - len(stale)}, "
+                  f"{'assembled ' + stats.get('mode', 'copy') if assembled else 'output up to date'}")
+            return {
+                'status': 'success',
+                'output_path': output_path,
+                'rendered': [item[0]['id'] for item in stale],
+                'reused': [item[0]['id'] for item in plan if item not in stale],
+                'assembled': assembled
+            }
+        finally:
+            with self._lock:
+                self._building.discard(slug)
+
+    def _render_scene(self, project, scene, code, digest, render_path):
+        """Render one scene headlessly into its own media dir, then move the video to render_path"""
+        import glob
+        global PYTHON_EXE
+        scene_dir = os.path.join(self._work_dir(project['name']), 'scenes', scene['id'])
+        media_dir = os.path.join(scene_dir, 'media')
+        os.makedirs(scene_dir, exist_ok=True)
+
+        prepared = code_preparer.prepare(code)
+        script = os.path.join(scene_dir, 'scene.py')
+        code_preparer.write(prepared, script)
+
+        scene_class = scene.get('scene') or prepared['scene']
+        if not scene_class:
+            raise RuntimeError('No scene class found')
+
+        manim_exe = os.path.join(VENV_DIR, 'Scripts', 'manim.exe') if os.name == 'nt' else \
+            os.path.join(VENV_DIR, 'bin', 'manim')
+        if os.path.exists(manim_exe):
+            cmd = [manim_exe]
+        else:
+            if PYTHON_EXE is None:
+                PYTHON_EXE = get_python_executable(app_state['window'])
+            if not PYTHON_EXE:
+                raise RuntimeError('Python environment not available')
+            cmd = [PYTHON_EXE, '-m', 'manim']
+        cmd += [script, scene_class, get_quality_flag(scene['quality']), '--media_dir', media_dir,
+                '--frame_rate', str(scene['fps']), '--progress_bar', 'none']
+
+        print(f"[PROJECT] Rendering scene {scene['id']} ({scene_class}, {scene['quality']})")
+        started = time.time()
+        result = run_cancellable(cmd, timeout=PROJECT_RENDER_TIMEOUT, cwd=ASSETS_DIR,
+                                 env=get_venv_environment())
+        if result.returncode != 0:
+            raise RuntimeError((result.stderr or result.stdout).strip()[-1000:] or
+                               f'manim exited with code {result.returncode}')
+
+        videos = glob.glob(os.path.join(media_dir, 'videos', '**', f'{scene_class}.mp4'), recursive=True)
+        if not videos:
+            raise RuntimeError(f'manim finished but produced no {scene_class}.mp4')
+        os.replace(max(videos, key=os.path.getmtime), render_path)
+        print(f"[PROJECT] Scene {scene['id']} rendered in {time.time() - started:.1f}s")
+
+
+project_timeline = ProjectTimeline(PROJECTS_DIR)
+
+
+class ManimAPI:
+    """
+    API class that exposes Python functions to JavaScript
+    All methods in this class can be called from JS using: pywebview.api.method_name()
+    """
+
+    def __init__(self):
         """Initialize the API"""
         # AI/LLM feature removed
 
@@ -1362,8 +6281,26 @@ class ManimAPI:
 
     def set_code(self, code):
         """Set current code"""
+        return self.open_document(code)
+
+    def open_document(self, code):
+        """Start syncing the editor document with its full text; returns the version to build on"""
+        version = editor_document.open(code)
         app_state['current_code'] = code
-        return {'status': 'success'}
+        return {'status': 'success', 'version': version}
+
+    def apply_document_changes(self, version, changes):
+        """Apply a batch of editor deltas made on top of version"""
+        try:
+            new_version = editor_document.apply(version, changes)
+            if new_version is None:
+                # Python and the editor disagree (e.g. a lost batch) - the UI reopens with the full text
+                return {'status': 'resync', 'version': editor_document.version}
+            app_state['current_code'] = editor_document.text
+            return {'status': 'success', 'version': new_version}
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"[DOCUMENT] Bad change batch: {e}")
+            return {'status': 'resync', 'version': editor_document.version}
 
     def new_file(self):
         """Create a new file"""
@@ -1403,6 +6340,10 @@ class MyScene(Scene):
 
     def save_file_dialog(self, code):
         """Save file dialog"""
+        try:
+            code, _ = editor_document.resolve(code)
+        except ValueError as e:
+            return {'status': 'error', 'message': str(e)}
         result = app_state['window'].create_file_dialog(
             dialog_type=webview.FileDialog.SAVE,
             save_filename='scene.py',
@@ -1432,6 +6373,7 @@ class MyScene(Scene):
             return self.save_file_dialog(code)
 
         try:
+            code, _ = editor_document.resolve(code)
             with open(file_path, 'w', encoding='utf-8') as f:
                 f.write(code)
 
@@ -1442,113 +6384,40 @@ class MyScene(Scene):
             return {'status': 'error', 'message': str(e)}
 
     def autosave_code(self, code):
-        """Auto-save code to temporary location"""
+        """Auto-save code to the autosave journal (skipped when nothing changed)"""
         try:
-            import json
-            from datetime import datetime
-
-            # Create autosave directory
-            os.makedirs(AUTOSAVE_DIR, exist_ok=True)
-
-            # Generate timestamp-based filename
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            autosave_file = os.path.join(AUTOSAVE_DIR, f'autosave_{timestamp}.py')
-
-            # Save code
-            with open(autosave_file, 'w', encoding='utf-8') as f:
-                f.write(code)
-
-            # Save metadata
-            metadata = {
-                'timestamp': timestamp,
-                'file_path': app_state.get('current_file_path', ''),
-                'autosave_file': autosave_file
-            }
-
-            metadata_file = os.path.join(AUTOSAVE_DIR, f'autosave_{timestamp}.json')
-            with open(metadata_file, 'w', encoding='utf-8') as f:
-                json.dump(metadata, f, indent=2)
-
-            # Keep only last 5 autosaves
-            self.cleanup_old_autosaves()
-
-            print(f"[AUTOSAVE] Saved to {autosave_file}")
-            return {'status': 'success', 'file': autosave_file, 'timestamp': timestamp}
+            code, _ = editor_document.resolve(code)
+            row, written = autosave_journal.append(code, app_state.get('current_file_path', ''))
+            entry = AutosaveJournal.describe(row)
+            if written:
+                print(f"[AUTOSAVE] Saved snapshot {entry['id']} ({entry['size']} chars)")
+            return {'status': 'success', 'file': entry['autosave_file'], 'timestamp': entry['timestamp'],
+                    'unchanged': not written}
 
         except Exception as e:
             print(f"[AUTOSAVE ERROR] {e}")
             return {'status': 'error', 'message': str(e)}
 
-    def cleanup_old_autosaves(self):
-        """Keep only the last 5 autosaves"""
-        try:
-            # Get all autosave files
-            autosave_files = []
-            for filename in os.listdir(AUTOSAVE_DIR):
-                if filename.startswith('autosave_') and filename.endswith('.py'):
-                    filepath = os.path.join(AUTOSAVE_DIR, filename)
-                    autosave_files.append((filepath, os.path.getmtime(filepath)))
-
-            # Sort by modification time (newest first)
-            autosave_files.sort(key=lambda x: x[1], reverse=True)
-
-            # Delete old autosaves (keep only 5 newest)
-            for filepath, _ in autosave_files[5:]:
-                try:
-                    os.remove(filepath)
-                    # Also remove corresponding metadata file
-                    metadata_file = filepath.replace('.py', '.json')
-                    if os.path.exists(metadata_file):
-                        os.remove(metadata_file)
-                    print(f"[AUTOSAVE] Deleted old autosave: {filepath}")
-                except Exception as e:
-                    print(f"[AUTOSAVE] Error deleting {filepath}: {e}")
-
-        except Exception as e:
-            print(f"[AUTOSAVE CLEANUP ERROR] {e}")
-
-    def get_autosave_files(self):
-        """Get list of available autosave files"""
+    def get_autosave_files(self, limit=None, offset=0):
+        """Get list of available autosaves, newest first (one page with limit/offset)"""
         try:
-            import json
-
-            if not os.path.exists(AUTOSAVE_DIR):
-                return {'status': 'success', 'files': []}
-
-            autosaves = []
-            for filename in os.listdir(AUTOSAVE_DIR):
-                if filename.startswith('autosave_') and filename.endswith('.json'):
-                    metadata_file = os.path.join(AUTOSAVE_DIR, filename)
-                    try:
-                        with open(metadata_file, 'r', encoding='utf-8') as f:
-                            metadata = json.load(f)
-
-                        # Check if corresponding .py file exists
-                        py_file = metadata.get('autosave_file', '')
-                        if os.path.exists(py_file):
-                            autosaves.append(metadata)
-                    except Exception as e:
-                        print(f"[AUTOSAVE] Error reading metadata {filename}: {e}")
-
-            # Sort by timestamp (newest first)
-            autosaves.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
-
-            return {'status': 'success', 'files': autosaves}
+            rows, count = autosave_journal.list(limit, offset)
+            return {'status': 'success', 'files': [AutosaveJournal.describe(row) for row in rows], 'count': count,
+                    'offset': offset}
 
         except Exception as e:
             print(f"[AUTOSAVE ERROR] {e}")
             return {'status': 'error', 'message': str(e)}
 
     def load_autosave(self, autosave_file):
-        """Load code from an autosave file"""
+        """Load code from an autosave"""
         try:
-            if not os.path.exists(autosave_file):
-                return {'status': 'error', 'message': 'Autosave file not found'}
+            snapshot_id = AutosaveJournal.parse_id(autosave_file)
+            code = autosave_journal.load(snapshot_id) if snapshot_id is not None else None
+            if code is None:
+                return {'status': 'error', 'message': 'Autosave not found'}
 
-            with open(autosave_file, 'r', encoding='utf-8') as f:
-                code = f.read()
-
-            print(f"[AUTOSAVE] Loaded from {autosave_file}")
+            print(f"[AUTOSAVE] Loaded snapshot {snapshot_id}")
             return {'status': 'success', 'code': code}
 
         except Exception as e:
@@ -1556,33 +6425,23 @@ class MyScene(Scene):
             return {'status': 'error', 'message': str(e)}
 
     def delete_autosave(self, autosave_file):
-        """Delete a specific autosave file"""
-        try:
-            if os.path.exists(autosave_file):
-                os.remove(autosave_file)
-                # Also remove metadata
-                metadata_file = autosave_file.replace('.py', '.json')
-                if os.path.exists(metadata_file):
-                    os.remove(metadata_file)
-                print(f"[AUTOSAVE] Deleted {autosave_file}")
+        """Delete a specific autosave"""
+        try:
+            snapshot_id = AutosaveJournal.parse_id(autosave_file)
+            if snapshot_id is not None and autosave_journal.delete(snapshot_id):
+                print(f"[AUTOSAVE] Deleted snapshot {snapshot_id}")
                 return {'status': 'success'}
             else:
-                return {'status': 'error', 'message': 'File not found'}
+                return {'status': 'error', 'message': 'Autosave not found'}
         except Exception as e:
             print(f"[AUTOSAVE ERROR] {e}")
             return {'status': 'error', 'message': str(e)}
 
     def delete_all_autosaves(self):
-        """Delete all autosave files"""
+        """Delete all autosaves"""
         try:
-            deleted_count = 0
-            if os.path.exists(AUTOSAVE_DIR):
-                for filename in os.listdir(AUTOSAVE_DIR):
-                    filepath = os.path.join(AUTOSAVE_DIR, filename)
-                    if os.path.isfile(filepath):
-                        os.remove(filepath)
-                        deleted_count += 1
-            print(f"[AUTOSAVE] Deleted {deleted_count} files")
+            deleted_count = autosave_journal.clear()
+            print(f"[AUTOSAVE] Deleted {deleted_count} snapshots")
             return {'status': 'success', 'deleted_count': deleted_count}
         except Exception as e:
             print(f"[AUTOSAVE ERROR] {e}")
@@ -1653,48 +6512,58 @@ class MyScene(Scene):
             return {'status': 'error', 'message': str(e)}
 
     def check_code_errors(self, code):
-        """Check Python code for syntax errors using AST"""
+        """Diagnostics for the editor - cached results straight away, otherwise checked in the background"""
         try:
-            import ast
-            import traceback
-
-            errors = []
+            code, version = editor_document.resolve(code)
+            errors = diagnostics_service.request(code, version)
+            if errors is None:
+                # Arrives as a 'diagnostics' event once the worker gets to it
+                return {'status': 'pending', 'version': version}
+            return {'status': 'success', 'errors': errors, 'version': version}
 
-            if not code.strip():
-                return {'status': 'success', 'errors': errors}
+        except Exception as e:
+            print(f"[CODE CHECK ERROR] {e}")
+            return {'status': 'error', 'message': str(e)}
 
-            try:
-                # Try to parse the code
-                ast.parse(code)
-                # No errors found
-                return {'status': 'success', 'errors': []}
-
-            except SyntaxError as e:
-                # Syntax error found
-                error_info = {
-                    'type': 'error',
-                    'line': e.lineno if e.lineno else 0,
-                    'column': e.offset if e.offset else 0,
-                    'message': str(e.msg),
-                    'text': e.text.strip() if e.text else ''
-                }
-                errors.append(error_info)
+    def _document_lines(self):
+        version, text = editor_document.version, editor_document.text
+        return editor_document.memo(version, 'lines', str.splitlines, text) if text is not None else []
 
-            except Exception as e:
-                # Other parsing errors
-                error_info = {
-                    'type': 'error',
-                    'line': 0,
-                    'column': 0,
-                    'message': str(e),
-                    'text': ''
-                }
-                errors.append(error_info)
+    def get_completions(self, prefix='', owner=None, call=None, line=None):
+        """Editor completions from the manim symbol index (owner: expression before a '.', call: enclosing call)"""
+        try:
+            if owner:
+                owner = manim_symbols.owner_class(owner, self._document_lines(), line)
+                if not owner:
+                    return {'status': 'success', 'items': [], 'ready': manim_symbols.names() is not None}
+            items = manim_symbols.complete(prefix or '', owner=owner, call=call)
+            return {'status': 'success', 'items': items, 'ready': manim_symbols.names() is not None}
+        except Exception as e:
+            print(f"[COMPLETIONS ERROR] {e}")
+            return {'status': 'error', 'message': str(e)}
 
-            return {'status': 'success', 'errors': errors}
+    def get_hover(self, name, owner=None, line=None):
+        """Markdown documentation for a manim symbol"""
+        try:
+            if owner:
+                owner = manim_symbols.owner_class(owner, self._document_lines(), line)
+                if not owner:
+                    return {'status': 'success', 'contents': None}
+            return {'status': 'success', 'contents': manim_symbols.hover(name, owner)}
+        except Exception as e:
+            print(f"[HOVER ERROR] {e}")
+            return {'status': 'error', 'message': str(e)}
 
+    def get_signature_help(self, name, owner=None, line=None):
+        """Signature and parameters of a manim callable"""
+        try:
+            if owner:
+                owner = manim_symbols.owner_class(owner, self._document_lines(), line)
+                if not owner:
+                    return {'status': 'success', 'signature': None}
+            return {'status': 'success', 'signature': manim_symbols.signature_help(name, owner)}
         except Exception as e:
-            print(f"[CODE CHECK ERROR] {e}")
+            print(f"[SIGNATURE ERROR] {e}")
             return {'status': 'error', 'message': str(e)}
 
     def render_animation(self, code, quality='720p', fps=30, gpu_accelerate=False, format='mp4', width=None, height=None):
@@ -1726,6 +6595,9 @@ class MyScene(Scene):
                         render_process_running = (app_state['render_process'].poll() is None)
                 except:
                     pass
+            render_session = app_state['terminal_sessions'].get('render')
+            if render_session is not None and render_session.is_alive():
+                render_process_running = True
 
             if not render_process_running:
                 # Process not running but state is stuck - reset it
@@ -1738,70 +6610,26 @@ class MyScene(Scene):
             return {'status': 'error', 'message': 'Cannot render while previewing. Please wait for preview to complete.'}
 
         try:
-            # Clear render folder before rendering
-            print("[RENDER] Clearing render folder...")
-            clear_render_folder()
-
-            # Create temporary file in render folder
-            os.makedirs(RENDER_DIR, exist_ok=True)
-            timestamp = int(time.time() * 1000)
-            temp_file = os.path.join(RENDER_DIR, f'temp_render_{timestamp}.py')
-
-            # Write file and ensure it's fully closed before proceeding
-            # First, dump raw code for debugging
-            print(f"[DEBUG] First 500 chars of code before sanitization:")
-            print(f"[DEBUG] {repr(code[:500])}")
-
-            # Sanitize code to remove invisible Unicode characters that corrupt LaTeX
-            code = sanitize_code_for_latex(code)
-
-            print(f"[DEBUG] First 500 chars of code AFTER sanitization:")
-            print(f"[DEBUG] {repr(code[:500])}")
-
-            # Add UTF-8 coding declaration if not present
-            # Check first two lines for coding declaration (PEP 263)
-            lines = code.split('\n', 2)
-            has_coding = False
-            for i in range(min(2, len(lines))):
-                if 'coding' in lines[i] or 'encoding' in lines[i]:
-                    has_coding = True
-                    break
-
-            if not has_coding:
-                # Add both shebang-compatible and standard coding declarations
-                code_with_encoding = '#!/usr/bin/env python\n# -*- coding: utf-8 -*-\n' + code
-            else:
-                code_with_encoding = code
-
-            # Write file
-            with open(temp_file, 'w', encoding='utf-8', newline='\n', errors='replace') as f:
-                f.write(code_with_encoding)
-
-            # Also save a debug copy with hex dump
-            debug_file = temp_file + '.debug.txt'
-            with open(debug_file, 'w', encoding='utf-8') as f:
-                f.write("=== ORIGINAL CODE (first 1000 chars) ===\n")
-                f.write(code[:1000])
-                f.write("\n\n=== HEX DUMP (first 500 bytes) ===\n")
-                for i, byte in enumerate(code[:500].encode('utf-8')):
-                    f.write(f"{byte:02X} ")
-                    if (i + 1) % 16 == 0:
-                        f.write("\n")
-            print(f"[DEBUG] Saved debug file to: {debug_file}")
+            code, doc_version = editor_document.resolve(code)
+        except ValueError as e:
+            return {'status': 'error', 'message': str(e)}
 
-            # Ensure file is flushed to disk and fully closed
-            time.sleep(0.2)  # Increased delay to ensure file is available
+        try:
+            # Clear render folder before rendering
+            print("[RENDER] Clearing render folder...")
+            clear_render_folder()
 
-            # Verify file was created
-            if not os.path.exists(temp_file):
-                return {'status': 'error', 'message': f'Failed to create temporary file: {temp_file}'}
+            # Create temporary file in render folder
+            os.makedirs(RENDER_DIR, exist_ok=True)
+            timestamp = int(time.time() * 1000)
+            temp_file = os.path.join(RENDER_DIR, f'temp_render_{timestamp}.py')
 
+            # Sanitise, add the coding header and find the scene - memoised by content hash
+            prepared = editor_document.memo(doc_version, 'prepared', code_preparer.prepare, code)
+            code_preparer.write(prepared, temp_file)
             print(f"[RENDER] Created temp file: {temp_file}")
 
-            # Create manim.cfg in the render directory
-            create_manim_config(RENDER_DIR)
-
-            scene_name = extract_scene_name(code)
+            scene_name = prepared['scene']
             if not scene_name:
                 return {'status': 'error', 'message': 'No scene class found'}
 
@@ -1868,38 +6696,20 @@ class MyScene(Scene):
 
             print(f"[RENDER] Full command: {' '.join(cmd)}")
 
-            # Send command to terminal PTY instead of running in subprocess
-            # Terminal is in ASSETS_DIR, but render temp file is in RENDER_DIR, so we need full paths
-            # Build command string with proper quoting
-            cmd_parts = []
-            for arg in cmd:
-                # Quote arguments that have spaces or are paths
-                if ' ' in arg or arg == temp_file or '\\' in arg:
-                    cmd_parts.append(f'"{arg}"')
-                else:
-                    cmd_parts.append(arg)
-
-            cmd_string = ' '.join(cmd_parts)
-            print(f"[RENDER] Sending to terminal: {cmd_string}")
+            # Run manim in its own terminal session (on a PTY, so progress bars render)
+            # The interactive shell stays usable and its output can't confuse error detection
+            # Working directory is ASSETS_DIR like the shell, so relative asset paths resolve
+            render_session = None
+            try:
+                render_session = app_state['terminal_sessions'].create('render')
+                render_session.spawn(cmd, cwd=ASSETS_DIR, env=get_venv_environment())
+                print(f"[RENDER] Started in terminal session 'render'")
+            except Exception as e:
+                print(f"[RENDER] Could not start render terminal session: {e}")
+                render_session = None
 
-            if app_state['terminal_process'] is not None:
+            if render_session is not None:
                 try:
-                    # Clear terminal before running new render to remove old errors
-                    if WINPTY_AVAILABLE and hasattr(app_state['terminal_process'], 'write'):
-                        app_state['terminal_process'].write('cls\r\n')
-                        time.sleep(0.2)
-
-                    # Clear error buffer for fresh error detection
-                    app_state['terminal_error_buffer'] = []
-                    print("[RENDER] Cleared error buffer for new render")
-
-                    # Send command to terminal
-                    if WINPTY_AVAILABLE and hasattr(app_state['terminal_process'], 'write'):
-                        app_state['terminal_process'].write(cmd_string + '\r\n')
-                    else:
-                        app_state['terminal_process'].stdin.write(cmd_string + '\n')
-                        app_state['terminal_process'].stdin.flush()
-
                     app_state['is_rendering'] = True
 
                     # Store temp file path for cleanup after render
@@ -1915,34 +6725,30 @@ class MyScene(Scene):
                         print(f"[RENDER WATCHER] Waiting for render to complete...")
                         print(f"[RENDER WATCHER] Temp file to clean up later: {render_temp_file}")
 
-                        # Wait a bit for command to start executing before checking for errors
-                        time.sleep(3)
-                        print(f"[RENDER WATCHER] Starting error detection...")
+                        error_watcher = render_session.error_watcher
+                        scans_after_exit = 0
 
                         # Wait for file to appear in render directory
-                        error_check_count = 0
                         while time.time() - start_time < max_wait:
-                            # Check terminal output for errors periodically (not every iteration)
-                            # Only check every 5 iterations (every 10 seconds) to reduce spam
-                            error_check_count += 1
-                            if error_check_count % 5 == 0:
-                                has_error, error_msg = check_terminal_output_for_errors()
+                            # Errors are detected incrementally by the watcher - checking is free
+                            has_error, error_msg = check_terminal_output_for_errors('render')
 
-                                # Check if user interrupted with Ctrl+C
-                                output = ''.join(app_state['terminal_error_buffer'])
-                                if 'KeyboardInterrupt' in output or '^C' in output or 'Interrupted' in output:
-                                    print(f"[RENDER WATCHER] Detected Ctrl+C interrupt - stopping render")
-                                    app_state['is_rendering'] = False
-                                    return
-                            else:
-                                has_error = False
-                                error_msg = None
+                            # Check if user interrupted with Ctrl+C
+                            if error_watcher.matcher.interrupted:
+                                print(f"[RENDER WATCHER] Detected Ctrl+C interrupt - stopping render")
+                                app_state['is_rendering'] = False
+                                return
 
                             # Additional check: if user manually changed the state (via stop button)
                             if not app_state['is_rendering']:
                                 print(f"[RENDER WATCHER] Render stopped externally - exiting watcher")
                                 return
 
+                            # manim failed without printing anything we recognize
+                            if not has_error and render_session.exited.is_set() and render_session.returncode not in (0, None):
+                                has_error = True
+                                error_msg = f"manim exited with code {render_session.returncode}"
+
                             if has_error:
                                 print(f"[RENDER WATCHER] Error detected in terminal output: {error_msg}")
                                 app_state['is_rendering'] = False
@@ -1956,15 +6762,7 @@ class MyScene(Scene):
                                     print(f"[RENDER WATCHER] Error cleaning temp file: {cleanup_err}")
 
                                 # Notify frontend of failure
-                                if app_state['window']:
-                                    try:
-                                        safe_error = error_msg.replace('\\', '\\\\').replace('"', '\\"').replace("'", "\\'")
-                                        safe_evaluate_js(
-                                            app_state['window'],
-                                            f'if(window.renderFailed){{window.renderFailed("{safe_error}")}}'
-                                        )
-                                    except Exception as js_err:
-                                        print(f"[RENDER WATCHER] Error notifying frontend: {js_err}")
+                                ui_events.call_js('renderFailed', error_msg)
 
                                 return
 
@@ -2022,19 +6820,11 @@ class MyScene(Scene):
                                                     print(f"[RENDER WATCHER] Render complete! File ready at: {final_render_path}")
 
                                                     # Show save dialog to user AFTER everything is done
-                                                    try:
-                                                        if app_state['window']:
-                                                            # Small delay to ensure everything is settled
-                                                            time.sleep(0.5)
-                                                            # Trigger save dialog in frontend with final path
-                                                            escaped_path = final_render_path.replace('\\', '\\\\').replace('"', '\\"')
-                                                            safe_evaluate_js(
-                                                                app_state['window'],
-                                                                f'if(window.showRenderSaveDialog){{window.showRenderSaveDialog("{escaped_path}")}}'
-                                                            )
-                                                            print(f"[RENDER WATCHER] Save dialog triggered")
-                                                    except Exception as dialog_err:
-                                                        print(f"[RENDER WATCHER] Error showing save dialog: {dialog_err}")
+                                                    # Small delay to ensure everything is settled
+                                                    time.sleep(0.5)
+                                                    # Trigger save dialog in frontend with final path
+                                                    ui_events.call_js('showRenderSaveDialog', final_render_path)
+                                                    print(f"[RENDER WATCHER] Save dialog triggered")
 
                                                     return
                                                 except Exception as move_err:
@@ -2043,8 +6833,17 @@ class MyScene(Scene):
                             except Exception as e:
                                 print(f"[RENDER WATCHER] Error checking files: {e}")
 
-                            # Sleep before next check
-                            time.sleep(2)
+                            # manim exited cleanly - give the filesystem a few more scans, then give up
+                            if render_session.exited.is_set():
+                                scans_after_exit += 1
+                                if scans_after_exit > 3:
+                                    print(f"[RENDER WATCHER] Render process finished but no video file was found")
+                                    app_state['is_rendering'] = False
+                                    ui_events.call_js('renderFailed', 'manim finished but no video file was produced')
+                                    return
+
+                            # Sleep before next check - wakes immediately if an error shows up
+                            error_watcher.wait(2)
 
                         print(f"[RENDER WATCHER] Timeout - render file not found after {max_wait}s")
                         app_state['is_rendering'] = False
@@ -2061,11 +6860,11 @@ class MyScene(Scene):
                     watcher_thread = threading.Thread(target=watch_render, daemon=True)
                     watcher_thread.start()
 
-                    return {'status': 'started', 'message': 'Render command sent to terminal'}
+                    return {'status': 'started', 'message': 'Render started in terminal session'}
                 except Exception as e:
-                    print(f"[RENDER ERROR] Failed to send to terminal: {e}")
+                    print(f"[RENDER ERROR] Failed to start render watcher: {e}")
                     app_state['is_rendering'] = False
-                    return {'status': 'error', 'message': f'Failed to send command to terminal: {e}'}
+                    return {'status': 'error', 'message': f'Failed to start watcher: {e}'}
 
             # Fallback to old subprocess method if terminal not available
             print("[RENDER] Terminal not available, using fallback subprocess method")
@@ -2099,17 +6898,8 @@ class MyScene(Scene):
                             output_lines.append(line)
                             print(f"[Render] {line}")
 
-                            # Send to UI using evaluate_js
-                            if app_state['window']:
-                                try:
-                                    safe_line = line.replace('\\', '\\\\').replace('"', '\\"').replace("'", "\\'").replace('\n', '\\n')
-                                    app_state['window'].evaluate_js(
-                                        f'if(window.updateRenderOutput){{window.updateRenderOutput("{safe_line}")}}'
-                                    )
-                                except Exception as e:
-                                    # Ignore errors when window is disposed/closed
-                                    if "disposed" not in str(e).lower():
-                                        print(f"[RENDER] Error updating output: {e}")
+                            # Batched per frame by the event bus instead of one evaluate_js per line
+                            ui_events.call_js('updateRenderOutput', line)
 
                     process.wait()
 
@@ -2160,6 +6950,9 @@ class MyScene(Scene):
                                 print(f"   To: {assets_path}")
 
                                 shutil.move(final_path, assets_path)
+                                asset_index.refresh_path(assets_path)
+                                proxy_service.request(assets_path)
+                                seek_preview_service.request(assets_path)
                                 print(f"[OK] File moved to assets!")
 
                                 # Clean up temp folders now that file is safe in assets
@@ -2195,28 +6988,16 @@ class MyScene(Scene):
                                 print(f"[OK] Cleaned up {folders_deleted} temp folder(s)")
 
                                 # Call renderCompleted with autoSave flag
-                                if app_state['window']:
-                                    safe_path = assets_path.replace('\\', '/').replace('"', '\\"')
-                                    # Format: scene name with timestamp as suggested filename
-                                    suggested_name = f"{scene_name}_{timestamp}.mp4"
-                                    safe_name = suggested_name.replace('"', '\\"')
-                                    app_state['window'].evaluate_js(
-                                        f'if(window.renderCompleted){{window.renderCompleted("{safe_path}", true, "{safe_name}")}}'
-                                    )
+                                # Format: scene name with timestamp as suggested filename
+                                suggested_name = f"{scene_name}_{timestamp}.mp4"
+                                ui_events.call_js('renderCompleted', assets_path.replace('\\', '/'), True, suggested_name)
                             except Exception as move_error:
                                 print(f"[ERROR] Failed to move file to assets: {move_error}")
                                 # Fall back to old behavior if move fails
-                                if app_state['window']:
-                                    safe_path = final_path.replace('\\', '/').replace('"', '\\"')
-                                    app_state['window'].evaluate_js(
-                                        f'if(window.renderCompleted){{window.renderCompleted("{safe_path}")}}'
-                                    )
+                                ui_events.call_js('renderCompleted', final_path.replace('\\', '/'))
                         else:
                             # No file found
-                            if app_state['window']:
-                                app_state['window'].evaluate_js(
-                                    'if(window.renderCompleted){window.renderCompleted()}'
-                                )
+                            ui_events.call_js('renderCompleted')
 
                         result = {
                             'status': 'success',
@@ -2224,11 +7005,7 @@ class MyScene(Scene):
                             'output': '\n'.join(output_lines)
                         }
                     else:
-                        if app_state['window']:
-                            error_msg = f"Render failed with code {process.returncode}".replace('"', '\\"')
-                            app_state['window'].evaluate_js(
-                                f'if(window.renderFailed){{window.renderFailed("{error_msg}")}}'
-                            )
+                        ui_events.call_js('renderFailed', f"Render failed with code {process.returncode}")
                         result = {
                             'status': 'error',
                             'message': f'Render failed with code {process.returncode}',
@@ -2237,11 +7014,7 @@ class MyScene(Scene):
 
                 except Exception as e:
                     print(f"Render error: {e}")
-                    if app_state['window']:
-                        safe_error = str(e).replace('\\', '\\\\').replace('"', '\\"').replace("'", "\\'")
-                        app_state['window'].evaluate_js(
-                            f'if(window.renderFailed){{window.renderFailed("{safe_error}")}}'
-                        )
+                    ui_events.call_js('renderFailed', str(e))
                     result = {
                         'status': 'error',
                         'message': str(e),
@@ -2267,17 +7040,7 @@ class MyScene(Scene):
 
     def _get_quality_flag(self, quality):
         """Convert quality preset to manim flag or custom resolution"""
-        if quality in QUALITY_PRESETS:
-            return QUALITY_PRESETS[quality][0]  # Return the flag (e.g., '-ql', '-qm')
-        else:
-            # Validate custom resolution format: should be WIDTHxHEIGHT
-            if 'x' in str(quality).lower():
-                # Custom resolution like "1920x1080"
-                return f'-r{quality}'
-            else:
-                # Invalid quality - fallback to 720p
-                print(f"[WARNING] Invalid quality '{quality}', using 720p fallback")
-                return QUALITY_PRESETS["720p"][0]
+        return get_quality_flag(quality)
 
     def quick_preview(self, code, quality='480p', fps=15, gpu_accelerate=False, format='mp4'):
         """Quick preview the animation with customizable quality settings"""
@@ -2308,6 +7071,9 @@ class MyScene(Scene):
                         preview_process_running = (app_state['preview_process'].poll() is None)
                 except:
                     pass
+            preview_session = app_state['terminal_sessions'].get('preview')
+            if preview_session is not None and preview_session.is_alive():
+                preview_process_running = True
 
             if not preview_process_running:
                 # Process not running but state is stuck - reset it
@@ -2319,6 +7085,11 @@ class MyScene(Scene):
         if app_state['is_rendering']:
             return {'status': 'error', 'message': 'Cannot preview while rendering. Please wait for render to complete.'}
 
+        try:
+            code, doc_version = editor_document.resolve(code)
+        except ValueError as e:
+            return {'status': 'error', 'message': str(e)}
+
         try:
             # Clear preview folder before rendering
             print("[PREVIEW] Clearing preview folder...")
@@ -2329,61 +7100,12 @@ class MyScene(Scene):
             timestamp = int(time.time() * 1000)
             temp_file = os.path.join(PREVIEW_DIR, f'temp_preview_{timestamp}.py')
 
-            # Write file and ensure it's fully closed before proceeding
-            # First, dump raw code for debugging
-            print(f"[DEBUG] First 500 chars of code before sanitization:")
-            print(f"[DEBUG] {repr(code[:500])}")
-
-            # Sanitize code to remove invisible Unicode characters that corrupt LaTeX
-            code = sanitize_code_for_latex(code)
-
-            print(f"[DEBUG] First 500 chars of code AFTER sanitization:")
-            print(f"[DEBUG] {repr(code[:500])}")
-
-            # Add UTF-8 coding declaration if not present
-            # Check first two lines for coding declaration (PEP 263)
-            lines = code.split('\n', 2)
-            has_coding = False
-            for i in range(min(2, len(lines))):
-                if 'coding' in lines[i] or 'encoding' in lines[i]:
-                    has_coding = True
-                    break
-
-            if not has_coding:
-                # Add both shebang-compatible and standard coding declarations
-                code_with_encoding = '#!/usr/bin/env python\n# -*- coding: utf-8 -*-\n' + code
-            else:
-                code_with_encoding = code
-
-            # Write file
-            with open(temp_file, 'w', encoding='utf-8', newline='\n', errors='replace') as f:
-                f.write(code_with_encoding)
-
-            # Also save a debug copy with hex dump
-            debug_file = temp_file + '.debug.txt'
-            with open(debug_file, 'w', encoding='utf-8') as f:
-                f.write("=== ORIGINAL CODE (first 1000 chars) ===\n")
-                f.write(code[:1000])
-                f.write("\n\n=== HEX DUMP (first 500 bytes) ===\n")
-                for i, byte in enumerate(code[:500].encode('utf-8')):
-                    f.write(f"{byte:02X} ")
-                    if (i + 1) % 16 == 0:
-                        f.write("\n")
-            print(f"[DEBUG] Saved debug file to: {debug_file}")
-
-            # Ensure file is flushed to disk and fully closed
-            time.sleep(0.2)  # Increased delay to ensure file is available
-
-            # Verify file was created
-            if not os.path.exists(temp_file):
-                return {'status': 'error', 'message': f'Failed to create temporary file: {temp_file}'}
-
+            # Sanitise, add the coding header and find the scene - memoised by content hash
+            prepared = editor_document.memo(doc_version, 'prepared', code_preparer.prepare, code)
+            code_preparer.write(prepared, temp_file)
             print(f"[PREVIEW] Created temp file: {temp_file}")
 
-            # Create manim.cfg in the preview directory
-            create_manim_config(PREVIEW_DIR)
-
-            scene_name = extract_scene_name(code)
+            scene_name = prepared['scene']
             if not scene_name:
                 return {'status': 'error', 'message': 'No scene class found'}
 
@@ -2450,38 +7172,20 @@ class MyScene(Scene):
 
             print(f"[PREVIEW] Full command: {' '.join(cmd)}")
 
-            # Send command to terminal PTY instead of running in subprocess
-            # Terminal is in ASSETS_DIR, but preview temp file is in PREVIEW_DIR, so we need full paths
-            # Build command string with proper quoting
-            cmd_parts = []
-            for arg in cmd:
-                # Quote arguments that have spaces or are paths
-                if ' ' in arg or arg == temp_file or '\\' in arg:
-                    cmd_parts.append(f'"{arg}"')
-                else:
-                    cmd_parts.append(arg)
-
-            cmd_string = ' '.join(cmd_parts)
-            print(f"[PREVIEW] Sending to terminal: {cmd_string}")
+            # Run manim in its own terminal session (on a PTY, so progress bars render)
+            # The interactive shell stays usable and its output can't confuse error detection
+            # Working directory is ASSETS_DIR like the shell, so relative asset paths resolve
+            preview_session = None
+            try:
+                preview_session = app_state['terminal_sessions'].create('preview')
+                preview_session.spawn(cmd, cwd=ASSETS_DIR, env=get_venv_environment())
+                print(f"[PREVIEW] Started in terminal session 'preview'")
+            except Exception as e:
+                print(f"[PREVIEW] Could not start preview terminal session: {e}")
+                preview_session = None
 
-            if app_state['terminal_process'] is not None:
+            if preview_session is not None:
                 try:
-                    # Clear terminal before running new preview to remove old errors
-                    if WINPTY_AVAILABLE and hasattr(app_state['terminal_process'], 'write'):
-                        app_state['terminal_process'].write('cls\r\n')
-                        time.sleep(0.2)
-
-                    # Clear error buffer for fresh error detection
-                    app_state['terminal_error_buffer'] = []
-                    print("[PREVIEW] Cleared error buffer for new preview")
-
-                    # Send command to terminal
-                    if WINPTY_AVAILABLE and hasattr(app_state['terminal_process'], 'write'):
-                        app_state['terminal_process'].write(cmd_string + '\r\n')
-                    else:
-                        app_state['terminal_process'].stdin.write(cmd_string + '\n')
-                        app_state['terminal_process'].stdin.flush()
-
                     app_state['is_previewing'] = True
 
                     # Store temp file path for cleanup after preview
@@ -2497,41 +7201,38 @@ class MyScene(Scene):
                         print(f"[PREVIEW WATCHER] Waiting for preview to complete...")
                         print(f"[PREVIEW WATCHER] Temp file to clean up later: {preview_temp_file}")
 
-                        # Wait a bit for command to start executing before checking for errors
-                        time.sleep(3)
-                        print(f"[PREVIEW WATCHER] Starting error detection...")
+                        error_watcher = preview_session.error_watcher
 
                         # Wait for file to appear in preview directory
                         error_check_count = 0
+                        scans_after_exit = 0
                         manim_reported_done = False
                         while time.time() - start_time < max_wait:
-                            # Check terminal output for errors periodically (not every iteration)
-                            # Only check every 5 iterations (every 10 seconds) to reduce spam
                             error_check_count += 1
-                            if error_check_count % 5 == 0:
-                                has_error, error_msg = check_terminal_output_for_errors()
-
-                                # Also check if manim reported successful completion
-                                output = ''.join(app_state['terminal_error_buffer'])
-                                if 'Rendered ' in output and 'File ready at' in output:
-                                    if not manim_reported_done:
-                                        print(f"[PREVIEW WATCHER] Manim reported completion in terminal output")
-                                        manim_reported_done = True
-
-                                # Check if user interrupted with Ctrl+C
-                                if 'KeyboardInterrupt' in output or '^C' in output or 'Interrupted' in output:
-                                    print(f"[PREVIEW WATCHER] Detected Ctrl+C interrupt - stopping preview")
-                                    app_state['is_previewing'] = False
-                                    return
-                            else:
-                                has_error = False
-                                error_msg = None
+                            # Errors are detected incrementally by the watcher - checking is free
+                            has_error, error_msg = check_terminal_output_for_errors('preview')
+
+                            # Also check if manim reported successful completion
+                            if error_watcher.matcher.completed and not manim_reported_done:
+                                print(f"[PREVIEW WATCHER] Manim reported completion in terminal output")
+                                manim_reported_done = True
+
+                            # Check if user interrupted with Ctrl+C
+                            if error_watcher.matcher.interrupted:
+                                print(f"[PREVIEW WATCHER] Detected Ctrl+C interrupt - stopping preview")
+                                app_state['is_previewing'] = False
+                                return
 
                             # Additional check: if user manually changed the state (via stop button)
                             if not app_state['is_previewing']:
                                 print(f"[PREVIEW WATCHER] Preview stopped externally - exiting watcher")
                                 return
 
+                            # manim failed without printing anything we recognize
+                            if not has_error and preview_session.exited.is_set() and preview_session.returncode not in (0, None):
+                                has_error = True
+                                error_msg = f"manim exited with code {preview_session.returncode}"
+
                             if has_error:
                                 print(f"[PREVIEW WATCHER] Error detected in terminal output: {error_msg}")
                                 app_state['is_previewing'] = False
@@ -2545,15 +7246,7 @@ class MyScene(Scene):
                                     print(f"[PREVIEW WATCHER] Error cleaning temp file: {cleanup_err}")
 
                                 # Notify frontend of failure
-                                if app_state['window']:
-                                    try:
-                                        safe_error = error_msg.replace('\\', '\\\\').replace('"', '\\"').replace("'", "\\'")
-                                        safe_evaluate_js(
-                                            app_state['window'],
-                                            f'if(window.previewFailed){{window.previewFailed("{safe_error}")}}'
-                                        )
-                                    except Exception as js_err:
-                                        print(f"[PREVIEW WATCHER] Error notifying frontend: {js_err}")
+                                ui_events.call_js('previewFailed', error_msg)
 
                                 return
 
@@ -2651,22 +7344,15 @@ class MyScene(Scene):
                                                         print(f"[PREVIEW WATCHER] Copying non-MP4 file to assets...")
                                                         shutil.copy2(preview_file, assets_path)
 
+                                                    asset_index.refresh_path(assets_path)
+
                                                     # Add to cleanup set - will be deleted when app closes
                                                     app_state['preview_files_to_cleanup'].add(assets_path)
                                                     print(f"[PREVIEW WATCHER] Added to cleanup set (total: {len(app_state['preview_files_to_cleanup'])} files)")
 
                                                     # Notify frontend to load preview in preview box
-                                                    if app_state['window']:
-                                                        try:
-                                                            # Escape the path for JavaScript
-                                                            escaped_path = assets_path.replace('\\', '\\\\').replace('"', '\\"')
-                                                            safe_evaluate_js(
-                                                                app_state['window'],
-                                                                f'if(window.previewCompleted){{window.previewCompleted("{escaped_path}")}}'
-                                                            )
-                                                            print(f"[PREVIEW WATCHER] Notified frontend to load preview")
-                                                        except Exception as js_err:
-                                                            print(f"[PREVIEW WATCHER] Error notifying frontend: {js_err}")
+                                                    ui_events.call_js('previewCompleted', assets_path)
+                                                    print(f"[PREVIEW WATCHER] Notified frontend to load preview")
 
                                                     app_state['is_previewing'] = False
 
@@ -2685,19 +7371,17 @@ class MyScene(Scene):
                             except Exception as e:
                                 print(f"[PREVIEW WATCHER] Error checking files: {e}")
 
-                            # Check if preview process has finished (if using subprocess mode)
-                            # In terminal mode, we rely on file detection instead
-                            if app_state.get('preview_process') and hasattr(app_state['preview_process'], 'poll'):
-                                if app_state['preview_process'].poll() is not None:
-                                    # Process finished
-                                    elapsed = time.time() - start_time
-                                    print(f"[PREVIEW WATCHER] Preview process finished after {int(elapsed)}s, checking for output one more time...")
-                                    # Give it one more chance to find files
-                                    time.sleep(2)
-                                    # Continue loop to check files one more time
+                            # manim exited cleanly - give the filesystem a few more scans, then give up
+                            if preview_session.exited.is_set():
+                                scans_after_exit += 1
+                                if scans_after_exit > 3:
+                                    print(f"[PREVIEW WATCHER] Preview process finished but no video file was found")
+                                    app_state['is_previewing'] = False
+                                    ui_events.call_js('previewFailed', 'manim finished but no video file was produced')
+                                    return
 
-                            # Sleep before next check
-                            time.sleep(2)
+                            # Sleep before next check - wakes immediately if an error shows up
+                            error_watcher.wait(2)
 
                             # Safety: if manim reported done but we still haven't found the file after 30 seconds
                             if manim_reported_done and (time.time() - start_time) > 30:
@@ -2731,11 +7415,11 @@ class MyScene(Scene):
                     watcher_thread = threading.Thread(target=watch_preview, daemon=True)
                     watcher_thread.start()
 
-                    return {'status': 'started', 'message': 'Preview command sent to terminal'}
+                    return {'status': 'started', 'message': 'Preview started in terminal session'}
                 except Exception as e:
-                    print(f"[PREVIEW ERROR] Failed to send to terminal: {e}")
+                    print(f"[PREVIEW ERROR] Failed to start preview watcher: {e}")
                     app_state['is_previewing'] = False
-                    return {'status': 'error', 'message': f'Failed to send command to terminal: {e}'}
+                    return {'status': 'error', 'message': f'Failed to start watcher: {e}'}
 
             # Fallback to old subprocess method if terminal not available
             print("[PREVIEW] Terminal not available, using fallback subprocess method")
@@ -2768,16 +7452,8 @@ class MyScene(Scene):
                             output_lines.append(line)
                             print(f"[Preview] {line}")
 
-                            if app_state['window']:
-                                try:
-                                    safe_line = line.replace('\\', '\\\\').replace('"', '\\"').replace("'", "\\'").replace('\n', '\\n')
-                                    app_state['window'].evaluate_js(
-                                        f'if(window.updateRenderOutput){{window.updateRenderOutput("{safe_line}")}}'
-                                    )
-                                except Exception as e:
-                                    # Ignore errors when window is disposed/closed
-                                    if "disposed" not in str(e).lower():
-                                        print(f"[PREVIEW] Error updating output: {e}")
+                            # Batched per frame by the event bus instead of one evaluate_js per line
+                            ui_events.call_js('updateRenderOutput', line)
 
                     process.wait()
 
@@ -2811,6 +7487,7 @@ class MyScene(Scene):
 
                                 print(f"[PREVIEW] Copying to assets: {assets_path}")
                                 shutil.copy2(final_path, assets_path)
+                                asset_index.refresh_path(assets_path)
                                 print(f"[PREVIEW] Preview file copied to assets!")
 
                                 # Add to cleanup set - will be deleted when app closes
@@ -2826,30 +7503,16 @@ class MyScene(Scene):
                         else:
                             print(f"[WARNING] No output file found after preview")
 
-                        if app_state['window']:
-                            if final_path:
-                                safe_path = final_path.replace('\\', '/').replace('"', '\\"')
-                                app_state['window'].evaluate_js(
-                                    f'if(window.previewCompleted){{window.previewCompleted("{safe_path}")}}'
-                                )
-                            else:
-                                app_state['window'].evaluate_js(
-                                    'if(window.previewCompleted){window.previewCompleted()}'
-                                )
+                        if final_path:
+                            ui_events.call_js('previewCompleted', final_path.replace('\\', '/'))
+                        else:
+                            ui_events.call_js('previewCompleted')
                     else:
-                        if app_state['window']:
-                            error_msg = f"Preview failed with code {process.returncode}".replace('"', '\\"')
-                            app_state['window'].evaluate_js(
-                                f'if(window.previewFailed){{window.previewFailed("{error_msg}")}}'
-                            )
+                        ui_events.call_js('previewFailed', f"Preview failed with code {process.returncode}")
 
                 except Exception as e:
                     print(f"Preview error: {e}")
-                    if app_state['window']:
-                        safe_error = str(e).replace('\\', '\\\\').replace('"', '\\"').replace("'", "\\'")
-                        app_state['window'].evaluate_js(
-                            f'if(window.previewFailed){{window.previewFailed("{safe_error}")}}'
-                        )
+                    ui_events.call_js('previewFailed', str(e))
                 finally:
                     app_state['is_previewing'] = False
                     try:
@@ -2888,21 +7551,16 @@ class MyScene(Scene):
                 except Exception as e:
                     print(f"[STOP] Error terminating preview: {e}")
 
-            # If using terminal mode, send Ctrl+C
-            if app_state['terminal_process']:
-                try:
-                    if WINPTY_AVAILABLE and hasattr(app_state['terminal_process'], 'write'):
-                        # Send Ctrl+C to terminal
-                        app_state['terminal_process'].write('\x03')
-                        print("[STOP] Sent Ctrl+C to terminal")
-                    else:
-                        # For subprocess mode, send Ctrl+C
-                        import signal
-                        if hasattr(app_state['terminal_process'], 'send_signal'):
-                            app_state['terminal_process'].send_signal(signal.SIGINT)
-                            print("[STOP] Sent SIGINT to terminal")
-                except Exception as e:
-                    print(f"[STOP] Error sending interrupt to terminal: {e}")
+            # Renders and previews run in their own terminal sessions - Ctrl+C those
+            # (the user's shell is left alone)
+            for name in ('render', 'preview'):
+                session = app_state['terminal_sessions'].get(name)
+                if session is not None and session.is_alive():
+                    try:
+                        session.interrupt()
+                        print(f"[STOP] Interrupted terminal session '{name}'")
+                    except Exception as e:
+                        print(f"[STOP] Error interrupting terminal session '{name}': {e}")
 
             # Always reset states
             app_state['is_rendering'] = False
@@ -3252,72 +7910,32 @@ class MyScene(Scene):
         return {'status': 'success', 'settings': app_state['settings']}
 
     def list_media_files(self):
-        """List media files from assets directory only"""
-        print("\n" + "="*60)
-        print("[ASSETS] list_media_files() called")
-        print("="*60)
-
-        # Show files from ASSETS_DIR (not nested MEDIA_DIR folders)
-        assets_dir = ASSETS_DIR
-        print(f"[ASSETS] Looking in directory: {assets_dir}")
-        print(f"[ASSETS] Directory exists: {os.path.exists(assets_dir)}")
-
-        if not os.path.exists(assets_dir):
-            print("[ASSETS] Creating assets directory...")
-            os.makedirs(assets_dir)
-            return {'files': []}
-
-        files = []
-        all_items = os.listdir(assets_dir)
-        print(f"[ASSETS] Found {len(all_items)} items in directory:")
-        for item in all_items:
-            print(f"  - {item}")
-
-        # Only list files directly in ASSETS_DIR (no subdirectories)
-        for filename in os.listdir(assets_dir):
-            file_path = os.path.join(assets_dir, filename)
-            print(f"[ASSETS] Checking: {filename}")
-            print(f"  - Is file: {os.path.isfile(file_path)}")
-
-            # Include all asset types: videos, images, fonts, audio, subtitles
-            # Skip temp .py files, .pyc, and hidden files
-            if os.path.isfile(file_path) and not filename.startswith('.') and not filename.endswith(('.py', '.pyc')):
-                # Supported extensions
-                video_exts = ('.mp4', '.mov', '.avi', '.webm', '.mkv', '.flv', '.m4v')
-                image_exts = ('.png', '.jpg', '.jpeg', '.gif', '.svg', '.bmp', '.webp', '.ico')
-                font_exts = ('.ttf', '.otf', '.woff', '.woff2', '.ttc', '.eot')
-                audio_exts = ('.mp3', '.wav', '.ogg', '.m4a', '.aac', '.flac', '.wma')
-                subtitle_exts = ('.srt', '.vtt', '.ass', '.ssa', '.sub')
-                text_exts = ('.txt', '.md', '.json', '.xml', '.csv')
-
-                if filename.lower().endswith(video_exts + image_exts + font_exts + audio_exts + subtitle_exts + text_exts):
-                    file_info = {
-                        'name': filename,
-                        'path': file_path,
-                        'size': os.path.getsize(file_path),
-                        'mtime': os.path.getmtime(file_path)
-                    }
-                    files.append(file_info)
-                    print(f"  [OK] Added to list: {filename} ({file_info['size']} bytes)")
-                else:
-                    print(f"  [SKIP] Unsupported file type: {filename}")
-            else:
-                if filename.startswith('.'):
-                    print(f"  [SKIP] Hidden file: {filename}")
-                elif filename.endswith(('.py', '.pyc')):
-                    print(f"  [SKIP] Python file: {filename}")
-                else:
-                    print(f"  [SKIP] Not a file: {filename}")
-
-        # Sort by modified time (newest first)
-        files.sort(key=lambda x: x['mtime'], reverse=True)
-
-        print(f"\n[ASSETS] Returning {len(files)} files")
-        for f in files:
-            print(f"  - {f['name']}")
-        print("="*60 + "\n")
+        """List media files from assets directory only (served from the asset index)"""
+        try:
+            files, _ = asset_index.query('assets', kinds=list(ASSET_KINDS))
+            return {'files': files}
+        except Exception as e:
+            print(f"[ASSETS] Failed to list assets: {e}")
+            return {'files': [], 'error': str(e)}
 
-        return {'files': files}
+    def query_assets(self, root='assets', kind=None, search=None, sort='mtime', descending=True, offset=0, limit=100):
+        """
+        One page of the asset index. kind is a kind name or list ('video', 'image', 'font',
+        'audio', 'subtitle', 'text', 'other'); search matches file names.
+        The UI re-queries when an 'assets' event reports a new version for the root.
+        """
+        try:
+            files, total = asset_index.query(root, kind, search, sort, descending, offset, limit)
+            return {
+                'status': 'success',
+                'files': files,
+                'total': total,
+                'offset': offset,
+                'version': asset_index.version(root)
+            }
+        except Exception as e:
+            print(f"[ASSETS] Query failed: {e}")
+            return {'status': 'error', 'message': str(e), 'files': [], 'total': 0}
 
     def open_media_folder(self):
         """Open the assets folder in file explorer"""
@@ -3422,160 +8040,110 @@ class MyScene(Scene):
             return {'status': 'error', 'message': str(e), 'stdout': '', 'stderr': '', 'returncode': 1}
 
     def start_persistent_terminal(self):
-        """Start a persistent cmd.exe session using PTY (pywinpty) when available"""
+        """Start the interactive shell in the 'main' terminal session - pywinpty on Windows, a native PTY on Linux/macOS"""
         try:
-            if app_state['terminal_process'] is not None:
+            terminal = app_state['terminal_sessions'].main
+            if terminal.is_alive():
                 return {'status': 'info', 'message': 'Terminal already running'}
 
-            print("[TERMINAL] Starting persistent cmd.exe session...")
+            print("[TERMINAL] Starting persistent shell session...")
+            os.makedirs(ASSETS_DIR, exist_ok=True)
+
+            if os.name == 'nt':
+                activate_script = os.path.join(VENV_DIR, 'Scripts', 'activate.bat')
+            else:
+                activate_script = os.path.join(VENV_DIR, 'bin', 'activate')
 
             if WINPTY_AVAILABLE:
                 print("[TERMINAL] Using pywinpty PTY for real terminal emulation")
 
                 # Spawn cmd.exe with PTY
-                # Use wider terminal to properly display progress bars
-                terminal_process = winpty.PTY(120, 30)  # 120 columns, 30 rows for better tqdm display
+                # Default size is 120x30 - wide enough for tqdm until xterm.js reports its real size
+                terminal_process = winpty.PTY(terminal.cols, terminal.rows)
                 terminal_process.spawn('cmd.exe')
-
-                app_state['terminal_process'] = terminal_process
-                app_state['terminal_output_buffer'] = []
-                app_state['terminal_error_buffer'] = []
-
-                # Start background thread to read terminal output
-                def read_terminal_output():
-                    print("[TERMINAL PTY] Background reader thread started")
-                    while True:
-                        try:
-                            # Read from PTY - this will block until data is available
-                            # pywinpty.PTY.read() reads all available data
-                            data = terminal_process.read()
-                            if data:
-                                app_state['terminal_output_buffer'].append(data)
-                                app_state['terminal_error_buffer'].append(data)
-
-                                # Keep error buffer to last 1000 items to prevent memory bloat
-                                if len(app_state['terminal_error_buffer']) > 1000:
-                                    app_state['terminal_error_buffer'] = app_state['terminal_error_buffer'][-1000:]
-
-                                # Debug: Print when we receive progress bar updates (contains \r or ANSI codes)
-                                if '\r' in data or '\x1b[' in data:
-                                    # This is likely a progress bar update
-                                    pass  # Silent - just capturing it
-                        except Exception as e:
-                            error_msg = str(e).lower()
-                            # Ignore common non-error conditions
-                            if "closed" not in error_msg and "timeout" not in error_msg and "no data" not in error_msg:
-                                print(f"[TERMINAL PTY ERROR] {e}")
-                            time.sleep(0.01)
-                    print("[TERMINAL PTY] Background reader thread stopped")
-
-                terminal_thread = threading.Thread(target=read_terminal_output, daemon=True)
-                terminal_thread.start()
-                app_state['terminal_thread'] = terminal_thread
+                terminal.attach(terminal_process, 'winpty')
 
                 print("[TERMINAL PTY] Terminal started successfully")
                 time.sleep(0.5)
 
                 # Initialize terminal: cd to ASSETS_DIR and activate venv
                 print(f"[TERMINAL PTY] Setting up initial environment...")
-
-                # Change to assets directory
-                terminal_process.write(f'cd /d "{ASSETS_DIR}"\r\n')
+                terminal.run_command(f'cd /d "{ASSETS_DIR}"')
                 time.sleep(0.3)
 
-                # Activate virtual environment
-                if os.name == 'nt':
-                    activate_script = os.path.join(VENV_DIR, 'Scripts', 'activate.bat')
-                else:
-                    activate_script = os.path.join(VENV_DIR, 'bin', 'activate')
-
                 if os.path.exists(activate_script):
-                    terminal_process.write(f'call "{activate_script}"\r\n')
+                    terminal.run_command(f'call "{activate_script}"')
                     time.sleep(0.5)
                     print(f"[TERMINAL PTY] Activated venv at: {VENV_DIR}")
                 else:
                     print(f"[TERMINAL PTY WARNING] Venv activate script not found: {activate_script}")
 
-                # Wait for prompt to appear and clear screen
+                # Wait for prompt to appear before clearing the screen
                 time.sleep(0.5)
+                message = 'PTY terminal started'
+
+            elif POSIX_PTY_AVAILABLE:
+                shell = os.environ.get('SHELL') or '/bin/bash'
+                if not os.path.exists(shell):
+                    shell = '/bin/sh'
+                print(f"[TERMINAL] Using native POSIX PTY with {shell}")
+
+                env = get_clean_environment()
+                env['TERM'] = 'xterm-256color'  # What xterm.js emulates
+                env['COLORTERM'] = 'truecolor'
 
-                # Clear the screen to hide initialization commands
-                terminal_process.write('cls\r\n')
-                time.sleep(0.2)
+                terminal_process = PosixPtyTerminal(terminal.cols, terminal.rows)
+                terminal_process.spawn([shell, '-i'], cwd=ASSETS_DIR, env=env)
+                terminal.attach(terminal_process, 'posix_pty')
 
-                # Clear the output buffer so initialization isn't shown to user
-                # Keep error buffer for now - it will be cleared when a render/preview starts
-                app_state['terminal_output_buffer'] = []
+                print(f"[TERMINAL PTY] Terminal started successfully (pid {terminal_process.pid})")
+                time.sleep(0.3)
 
-                print("[TERMINAL PTY] Environment setup complete")
-                return {'status': 'success', 'message': 'PTY terminal started'}
+                # Activate virtual environment through the shell's own activate script
+                if os.path.exists(activate_script):
+                    terminal.run_command(f'. "{activate_script}"')
+                    time.sleep(0.3)
+                    print(f"[TERMINAL PTY] Activated venv at: {VENV_DIR}")
+                else:
+                    print(f"[TERMINAL PTY WARNING] Venv activate script not found: {activate_script}")
+                message = 'PTY terminal started'
 
             else:
                 # Fallback to subprocess.Popen
                 print("[TERMINAL] Using fallback subprocess mode (no PTY)")
 
                 terminal_process = subprocess.Popen(
-                    ['cmd.exe'],
+                    ['cmd.exe'] if os.name == 'nt' else ['/bin/sh', '-i'],
                     stdin=subprocess.PIPE,
                     stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                    encoding='utf-8',
-                    errors='replace',
+                    stderr=subprocess.STDOUT,
                     bufsize=0,
+                    cwd=ASSETS_DIR,
                     env=get_clean_environment(),
                     creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
                 )
-
-                app_state['terminal_process'] = terminal_process
-                app_state['terminal_output_buffer'] = []
-                app_state['terminal_error_buffer'] = []
-
-                def read_terminal_output():
-                    while terminal_process.poll() is None:
-                        try:
-                            line = terminal_process.stdout.readline()
-                            if line:
-                                app_state['terminal_output_buffer'].append(line)
-                                app_state['terminal_error_buffer'].append(line)
-
-                                # Keep error buffer to last 1000 items to prevent memory bloat
-                                if len(app_state['terminal_error_buffer']) > 1000:
-                                    app_state['terminal_error_buffer'] = app_state['terminal_error_buffer'][-1000:]
-
-                                print(f"[TERMINAL] {line.rstrip()}")
-                        except Exception as e:
-                            print(f"[TERMINAL ERROR] {e}")
-                            break
-
-                terminal_thread = threading.Thread(target=read_terminal_output, daemon=True)
-                terminal_thread.start()
-                app_state['terminal_thread'] = terminal_thread
+                terminal.attach(terminal_process, 'pipe')
 
                 print("[TERMINAL] Terminal started successfully")
                 time.sleep(0.5)
 
-                # Initialize environment
-                # Keep error buffer for now - it will be cleared when a render/preview starts
-                app_state['terminal_output_buffer'] = []
-                terminal_process.stdin.write(f'cd /d "{ASSETS_DIR}"\n')
-                terminal_process.stdin.flush()
-                time.sleep(0.2)
-
-                if os.name == 'nt':
-                    activate_script = os.path.join(VENV_DIR, 'Scripts', 'activate.bat')
-                else:
-                    activate_script = os.path.join(VENV_DIR, 'bin', 'activate')
-
                 if os.path.exists(activate_script):
-                    terminal_process.stdin.write(f'call "{activate_script}"\n')
-                    terminal_process.stdin.flush()
+                    terminal.run_command(f'call "{activate_script}"' if os.name == 'nt' else f'. "{activate_script}"')
                     time.sleep(0.3)
 
                 time.sleep(0.5)
-                # Keep error buffer for now - it will be cleared when a render/preview starts
-                app_state['terminal_output_buffer'] = []
-                return {'status': 'success', 'message': 'Fallback terminal started'}
+                message = 'Fallback terminal started'
+
+            # Clear the screen to hide initialization commands
+            terminal.clear()
+            time.sleep(0.2)
+
+            # Skip the UI cursor past initialization so it isn't shown to user
+            terminal.ui_cursor.seek_end()
+            terminal.error_watcher.reset()
+
+            print("[TERMINAL] Environment setup complete")
+            return {'status': 'success', 'message': message}
 
         except Exception as e:
             print(f"[TERMINAL ERROR] Failed to start terminal: {e}")
@@ -3583,26 +8151,31 @@ class MyScene(Scene):
             traceback.print_exc()
             return {'status': 'error', 'message': str(e)}
 
-    def send_terminal_command(self, data):
-        """Send data (raw input) to persistent terminal PTY"""
+    def _get_terminal_session(self, session):
+        """Look up a terminal session, (re)starting the main shell if needed"""
+        terminal = app_state['terminal_sessions'].get(session or 'main')
+        if terminal is None:
+            raise ValueError(f"Unknown terminal session '{session}'")
+        if terminal.name == 'main' and not terminal.is_alive():
+            print("[TERMINAL] Process not running, auto-starting...")
+            result = self.start_persistent_terminal()
+            if result['status'] == 'error':
+                raise RuntimeError(result['message'])
+        return terminal
+
+    def send_terminal_command(self, data, session='main'):
+        """Send data (raw input) to a terminal session - the interactive shell by default"""
         try:
-            if app_state['terminal_process'] is None:
-                # Auto-start terminal if not running
-                result = self.start_persistent_terminal()
-                if result['status'] != 'success':
-                    return result
-                time.sleep(0.5)  # Wait for terminal to initialize
+            terminal = self._get_terminal_session(session)
+            if not terminal.is_alive():
+                return {'status': 'error', 'message': f"Terminal session '{terminal.name}' has exited"}
 
-            terminal_process = app_state['terminal_process']
+            # Enter starts a new command - watch its output for errors afresh
+            if terminal.command is None and ('\r' in data or '\n' in data):
+                terminal.error_watcher.rearm_matcher()
 
-            # Check if using PTY mode or fallback mode
-            if WINPTY_AVAILABLE and hasattr(terminal_process, 'write'):
-                # PTY mode - send raw data
-                terminal_process.write(data)
-            else:
-                # Fallback mode - use stdin
-                terminal_process.stdin.write(data)
-                terminal_process.stdin.flush()
+            # PTY backends get raw keystrokes, fallback mode writes to stdin
+            terminal.write(data)
 
             return {'status': 'success'}
 
@@ -3613,38 +8186,86 @@ class MyScene(Scene):
             return {'status': 'error', 'message': str(e)}
 
     def resize_terminal(self, cols, rows):
-        """Resize the PTY terminal"""
+        """Resize the PTY of every terminal session (they share one xterm.js view)"""
         try:
-            if app_state['terminal_process'] is None:
-                return {'status': 'error', 'message': 'Terminal not running'}
+            print(f"[TERMINAL] Resizing PTYs to {cols}x{rows}")
+            app_state['terminal_sessions'].resize_all(cols, rows)
+            return {'status': 'success'}
 
-            terminal_process = app_state['terminal_process']
+        except Exception as e:
+            print(f"[TERMINAL RESIZE ERROR] {e}")
+            return {'status': 'error', 'message': str(e)}
 
-            # Check if using PTY mode and has set_size method
-            if WINPTY_AVAILABLE and hasattr(terminal_process, 'set_size'):
-                print(f"[TERMINAL] Resizing PTY to {cols}x{rows}")
-                terminal_process.set_size(cols, rows)
-                return {'status': 'success'}
-            else:
-                # Fallback mode doesn't support resize
-                return {'status': 'success', 'message': 'Resize not supported in fallback mode'}
+    def clear_terminal(self, session='main'):
+        """Clear the screen of a terminal session (cls / clear depending on platform)"""
+        try:
+            terminal = self._get_terminal_session(session)
+            terminal.clear()
+            return {'status': 'success'}
+        except Exception as e:
+            print(f"[TERMINAL ERROR] {e}")
+            return {'status': 'error', 'message': str(e)}
+
+    def list_terminal_sessions(self):
+        """All terminal sessions: the shell plus the latest render/preview runs"""
+        return {'status': 'success', 'sessions': app_state['terminal_sessions'].describe()}
+
+    def get_terminal_snapshot(self, session='main'):
+        """Everything still buffered for a session - used to redraw xterm.js when switching sessions"""
+        try:
+            terminal = self._get_terminal_session(session)
+            return {
+                'status': 'success',
+                'output': terminal.ui_cursor.replay(),
+                'session': terminal.describe()
+            }
+        except Exception as e:
+            print(f"[TERMINAL ERROR] {e}")
+            return {'status': 'error', 'message': str(e), 'output': ''}
 
+    def close_terminal_session(self, session):
+        """Kill a render/preview session and forget its output"""
+        try:
+            if not app_state['terminal_sessions'].remove(session):
+                return {'status': 'error', 'message': f"Unknown terminal session '{session}'"}
+            return {'status': 'success'}
         except Exception as e:
-            print(f"[TERMINAL RESIZE ERROR] {e}")
             return {'status': 'error', 'message': str(e)}
 
-    def get_terminal_output(self):
-        """Get all terminal output (for continuous display)"""
+    def subscribe_terminal_events(self):
+        """
+        Switch terminal display from polling to push.
+        New output of every session is read from its UI cursor by the event bus and
+        delivered as 'terminal' (main shell) or 'terminal:<name>' events, rate limited
+        and batched per animation frame.
+        """
         try:
-            if app_state['terminal_process'] is None:
-                print("[TERMINAL] Process not running, auto-starting...")
-                # Auto-start terminal if not running
+            if not app_state['terminal_sessions'].main.is_alive():
                 self.start_persistent_terminal()
-                time.sleep(0.5)  # Wait for initialization
 
-            # Return all buffered output and clear buffer
-            output = ''.join(app_state['terminal_output_buffer'])
-            app_state['terminal_output_buffer'] = []
+            app_state['terminal_sessions'].subscribe()
+            print("[TERMINAL] Frontend subscribed to pushed terminal output")
+            return {'status': 'success', 'sessions': app_state['terminal_sessions'].describe()}
+        except Exception as e:
+            print(f"[TERMINAL ERROR] {e}")
+            return {'status': 'error', 'message': str(e)}
+
+    def get_terminal_stats(self, session='main'):
+        """Bytes received from the terminal vs. bytes kept after collapsing progress redraws"""
+        terminal = app_state['terminal_sessions'].get(session)
+        if terminal is None:
+            return {'status': 'error', 'message': f"Unknown terminal session '{session}'"}
+        stats = terminal.compactor.stats()
+        stats['status'] = 'success'
+        return stats
+
+    def get_terminal_output(self, session='main'):
+        """Get all terminal output (for continuous display)"""
+        try:
+            terminal = self._get_terminal_session(session)
+
+            # Return everything past the UI cursor (with a marker if the ring buffer wrapped)
+            output = terminal.ui_cursor.read()
 
             # Only log when there's actual output (reduce spam)
             # if output:
@@ -3653,7 +8274,7 @@ class MyScene(Scene):
             return {
                 'status': 'success',
                 'output': output,
-                'is_running': app_state['terminal_process'] is not None
+                'is_running': terminal.is_alive()
             }
 
         except Exception as e:
@@ -3781,72 +8402,34 @@ class MyScene(Scene):
     def list_assets(self):
         """List all assets in the assets directory"""
         try:
-            if not os.path.exists(ASSETS_DIR):
-                os.makedirs(ASSETS_DIR, exist_ok=True)
-                return {'directory': ASSETS_DIR, 'files': []}
-
-            files = []
             previewable_ext = {'.mp4', '.mov', '.gif', '.png', '.jpg', '.jpeg', '.webp', '.webm'}
-
-            for filename in os.listdir(ASSETS_DIR):
-                if filename.startswith('temp_scene_'):
-                    continue  # Skip temp files
-
-                full_path = os.path.join(ASSETS_DIR, filename)
-
-                if os.path.isfile(full_path):
-                    try:
-                        stat = os.stat(full_path)
-                        ext = os.path.splitext(filename)[1].lower()
-                        files.append({
-                            'name': filename,
-                            'path': full_path,
-                            'size': stat.st_size,
-                            'modified': stat.st_mtime,
-                            'previewable': ext in previewable_ext
-                        })
-                    except:
-                        continue
-
-            files.sort(key=lambda x: x['modified'], reverse=True)
-            return {'directory': ASSETS_DIR, 'files': files}
+            files, _ = asset_index.query('assets')
+            return {'directory': ASSETS_DIR, 'files': [{
+                'name': f['name'],
+                'path': f['path'],
+                'size': f['size'],
+                'modified': f['mtime'],
+                'previewable': os.path.splitext(f['name'])[1].lower() in previewable_ext
+            } for f in files]}
 
         except Exception as e:
             return {'directory': ASSETS_DIR, 'files': [], 'error': str(e)}
 
     def add_assets(self, file_paths):
-        """Add assets by copying files to assets directory"""
+        """Add assets by copying files to assets directory (waits for the import - see import_assets)"""
         try:
-            import shutil
-
             if not file_paths or not isinstance(file_paths, list):
                 return {'status': 'error', 'message': 'No file paths provided'}
 
-            os.makedirs(ASSETS_DIR, exist_ok=True)
-
-            added = 0
-            errors = []
-
-            for src_path in file_paths:
-                try:
-                    if not os.path.exists(src_path):
-                        errors.append(f'File not found: {src_path}')
-                        continue
-
-                    filename = os.path.basename(src_path)
-                    dest_path = os.path.join(ASSETS_DIR, filename)
-
-                    shutil.copy2(src_path, dest_path)
-                    added += 1
-                    print(f'[OK] Copied asset: {filename}')
-
-                except Exception as e:
-                    errors.append(f'Failed to copy {os.path.basename(src_path)}: {str(e)}')
+            job = asset_importer.start(file_paths)
+            job.finished.wait()
+            added = len(job.imported)
+            errors = [f"Failed to copy {error['file']}: {error['error']}" for error in job.errors]
 
             return {
                 'status': 'success' if added > 0 else 'error',
                 'added': added,
-                'total': len(file_paths),
+                'total': len(job.files),
                 'errors': errors if errors else None,
                 'message': f'Added {added} file(s)' if added > 0 else 'Failed to add files'
             }
@@ -3854,8 +8437,29 @@ class MyScene(Scene):
         except Exception as e:
             return {'status': 'error', 'message': str(e)}
 
+    def get_asset_url(self, file_path):
+        """
+        Return a URL on the local asset server for a file.
+        The file is streamed from disk with Range support - nothing crosses the bridge.
+        """
+        try:
+            if not os.path.isfile(file_path):
+                print(f"[ASSET ERROR] File not found: {file_path}")
+                return {'status': 'error', 'message': 'File not found', 'url': None}
+
+            return {
+                'status': 'success',
+                'url': asset_server.url_for(file_path),
+                'mimeType': guess_mime_type(file_path),
+                'size': os.path.getsize(file_path)
+            }
+
+        except Exception as e:
+            print(f"[ASSET ERROR] Failed to create asset URL: {e}")
+            return {'status': 'error', 'message': str(e), 'url': None}
+
     def get_asset_as_bytes(self, file_path):
-        """Return file as base64-encoded bytes for frontend to convert to Blob"""
+        """Return file as base64-encoded bytes for frontend to convert to Blob (prefer get_asset_url)"""
         try:
             import base64
             import mimetypes
@@ -3890,97 +8494,34 @@ class MyScene(Scene):
 
             print(f"[ASSET] File size: {len(file_data)} bytes")
             print(f"[ASSET] Base64 length: {len(base64_data)} chars")
-            print(f"[ASSET] MIME type: {mime_type}")
-
-            return {
-                'status': 'success',
-                'data': base64_data,  # Base64 encoded binary data
-                'mimeType': mime_type,
-                'size': len(file_data)
-            }
-
-        except Exception as e:
-            print(f"[ASSET ERROR] Failed to read file: {e}")
-            import traceback
-            traceback.print_exc()
-            return {'status': 'error', 'message': str(e), 'data': None}
-
-    def get_asset_as_data_url(self, file_path):
-        """DEPRECATED: Use get_asset_as_bytes instead. Keeping for backwards compatibility."""
-        try:
-            import shutil
-            import mimetypes
-            import urllib.parse
-
-            print(f"[ASSET] get_asset_as_data_url called with: {file_path}")
-
-            if not os.path.exists(file_path):
-                print(f"[ASSET ERROR] File not found: {file_path}")
-                return {'status': 'error', 'message': 'File not found', 'dataUrl': None}
-
-            # Create temp directory in web folder for HTTP serving
-            web_temp_dir = os.path.join(BASE_DIR, 'web', 'temp_assets')
-            os.makedirs(web_temp_dir, exist_ok=True)
-
-            # Get filename and create temp copy
-            filename = os.path.basename(file_path)
-            temp_file = os.path.join(web_temp_dir, filename)
-
-            print(f"[ASSET] Copying to: {temp_file}")
-
-            # Copy file to web/temp_assets (fast for local files)
-            # Always copy to ensure we have the latest version
-            try:
-                if os.path.exists(temp_file):
-                    os.remove(temp_file)
-                shutil.copy2(file_path, temp_file)
-                print(f"[ASSET] File copied successfully, size: {os.path.getsize(temp_file)} bytes")
-            except Exception as copy_err:
-                print(f"[ASSET ERROR] Failed to copy file: {copy_err}")
-                return {'status': 'error', 'message': f'Failed to copy file: {copy_err}', 'dataUrl': None}
-
-            # Verify the copied file exists and is readable
-            if not os.path.exists(temp_file):
-                print(f"[ASSET ERROR] Copy verification failed - file doesn't exist: {temp_file}")
-                return {'status': 'error', 'message': 'Copy verification failed', 'dataUrl': None}
-
-            # List all files in temp_assets directory for debugging
-            try:
-                temp_assets_files = os.listdir(web_temp_dir)
-                print(f"[ASSET] Files in temp_assets directory: {temp_assets_files}")
-            except Exception as list_err:
-                print(f"[ASSET] Could not list temp_assets directory: {list_err}")
-
-            # PyWebView can access files in the web directory via relative paths
-            # Return the relative path from the HTML file location
-            # HTML file is in: BASE_DIR/web/index.html
-            # Temp file is in: BASE_DIR/web/temp_assets/filename.mp4
-            # So relative path is: temp_assets/filename.mp4
-
-            relative_path = f'temp_assets/{filename}'
-            print(f"[ASSET] Returning relative path: {relative_path}")
-            print(f"[ASSET] File size: {os.path.getsize(temp_file)} bytes")
-
-            # Determine MIME type
-            mime_type, _ = mimetypes.guess_type(file_path)
-            if not mime_type:
-                ext = os.path.splitext(file_path)[1].lower()
-                mime_types_map = {
-                    '.mp4': 'video/mp4',
-                    '.mov': 'video/quicktime',
-                    '.webm': 'video/webm',
-                    '.png': 'image/png',
-                    '.jpg': 'image/jpeg',
-                    '.jpeg': 'image/jpeg',
-                    '.gif': 'image/gif'
-                }
-                mime_type = mime_types_map.get(ext, 'application/octet-stream')
+            print(f"[ASSET] MIME type: {mime_type}")
 
             return {
                 'status': 'success',
-                'dataUrl': relative_path,  # Relative path for PyWebView
+                'data': base64_data,  # Base64 encoded binary data
                 'mimeType': mime_type,
-                'size': os.path.getsize(file_path)
+                'size': len(file_data)
+            }
+
+        except Exception as e:
+            print(f"[ASSET ERROR] Failed to read file: {e}")
+            import traceback
+            traceback.print_exc()
+            return {'status': 'error', 'message': str(e), 'data': None}
+
+    def get_asset_as_data_url(self, file_path):
+        """HTTP URL for a stable snapshot of the file (served from the serving cache)"""
+        try:
+            if not os.path.isfile(file_path):
+                print(f"[ASSET ERROR] File not found: {file_path}")
+                return {'status': 'error', 'message': 'File not found', 'dataUrl': None}
+
+            cached_path = serving_cache.get(file_path)
+            return {
+                'status': 'success',
+                'dataUrl': asset_server.url_for(cached_path),
+                'mimeType': guess_mime_type(file_path),
+                'size': os.path.getsize(cached_path)
             }
 
         except Exception as e:
@@ -4014,6 +8555,8 @@ class MyScene(Scene):
                 return {'status': 'error', 'message': 'File not found'}
 
             os.remove(file_path)
+            asset_index.refresh_path(file_path)
+            blob_store.collect_garbage_async()
             print(f"[OK] Deleted asset: {file_path}")
             return {'status': 'success', 'message': 'File deleted'}
         except Exception as e:
@@ -4021,7 +8564,7 @@ class MyScene(Scene):
             return {'status': 'error', 'message': str(e)}
 
     def read_file_as_base64(self, file_path):
-        """Read a file and return as base64 string (for image preview)"""
+        """Read a file and return as base64 string (prefer get_asset_url for previews)"""
         try:
             import base64
             if not os.path.exists(file_path):
@@ -4113,9 +8656,24 @@ class MyScene(Scene):
             print(f"[INFO] ========== open_video_fullscreen CALLED ==========")
             print(f"[INFO] Video source: {video_src}")
 
+            if asset_server.owns_url(video_src):
+                from urllib.parse import quote
+                # The asset server also serves web/, so the player page can stream with Range requests
+                fullscreen_url = f"{asset_server.base_url}/web/video_fullscreen.html?src={quote(video_src, safe='')}"
+                # Big renders play from their low-res proxy so scrubbing stays smooth
+                video_path = asset_server.resolve(video_src)
+                proxy = proxy_service.proxy_url(video_path) if video_path else None
+                if proxy:
+                    fullscreen_url += f"&proxy={quote(proxy, safe='')}"
+                # Hover-scrub sprites; the page polls the manifest if it is still being generated
+                if video_path and os.path.isfile(video_path):
+                    manifest_path, _ = seek_preview_service.get(video_path)
+                    fullscreen_url += f"&seek={quote(asset_server.url_for(manifest_path), safe='')}"
+                print(f"[INFO] Fullscreen URL: {fullscreen_url}")
+
             # Extract the base URL from video source to get the HTTP server address
-            # Example: http://127.0.0.1:30614/temp_assets/MyScene.mp4 -> http://127.0.0.1:30614
-            if video_src.startswith('http://'):
+            # Example: http://127.0.0.1:30614/video.mp4 -> http://127.0.0.1:30614
+            elif video_src.startswith('http://'):
                 from urllib.parse import urlparse, quote
                 parsed = urlparse(video_src)
                 base_url = f"{parsed.scheme}://{parsed.netloc}"
@@ -4406,13 +8964,6 @@ class MyScene(Scene):
             print(f"[ERROR] Failed to check prerequisites: {e}")
             return {'status': 'error', 'message': str(e)}
 
-    def _escape_js_string(self, text):
-        """Escape string for safe use in JavaScript evaluate_js calls"""
-        if not text:
-            return ""
-        # Escape backslashes first, then quotes and newlines
-        return text.replace('\\', '\\\\').replace("'", "\\'").replace('"', '\\"').replace('\n', '\\n').replace('\r', '')
-
     def install_environment(self, options):
         """
         Install virtual environment with selected packages.
@@ -4425,7 +8976,7 @@ class MyScene(Scene):
         install_thread = threading.Thread(target=run_installation, daemon=True)
         install_thread.start()
 
-        # Return immediately - updates will be sent via evaluate_js
+        # Return immediately - updates will be pushed via the UI event bus
         return {
             'status': 'started',
             'message': 'Installation started in background'
@@ -4442,8 +8993,7 @@ class MyScene(Scene):
             print("[SETUP] Starting virtual environment installation...")
 
             # Update progress
-            if app_state['window']:
-                app_state['window'].evaluate_js('window.updateProgress(10, "[INFO] Initializing setup...")')
+            ui_events.call_js('updateProgress', 10, "[INFO] Initializing setup...")
 
             # Find system Python
             system_python = find_system_python()
@@ -4454,43 +9004,33 @@ class MyScene(Scene):
 
             # Create .manim_studio directory structure FIRST
             print("[SETUP] Creating .manim_studio directory structure...")
-            if app_state['window']:
-                app_state['window'].evaluate_js('window.updateProgress(15, "[INFO] Creating directory structure...")')
+            ui_events.call_js('updateProgress', 15, "[INFO] Creating directory structure...")
 
             # Create main .manim_studio directory
             os.makedirs(USER_DATA_DIR, exist_ok=True)
             print(f"[SETUP] Created: {USER_DATA_DIR}")
-            if app_state['window']:
-                escaped_path = self._escape_js_string(USER_DATA_DIR)
-                app_state['window'].evaluate_js(f'window.updateProgress(16, "[SUCCESS] Created: {escaped_path}")')
+            ui_events.call_js('updateProgress', 16, f"[SUCCESS] Created: {USER_DATA_DIR}")
 
             # Create media subdirectory
             os.makedirs(MEDIA_DIR, exist_ok=True)
             print(f"[SETUP] Created: {MEDIA_DIR}")
-            if app_state['window']:
-                escaped_path = self._escape_js_string(MEDIA_DIR)
-                app_state['window'].evaluate_js(f'window.updateProgress(17, "[SUCCESS] Created: {escaped_path}")')
+            ui_events.call_js('updateProgress', 17, f"[SUCCESS] Created: {MEDIA_DIR}")
 
             # Create assets subdirectory
             os.makedirs(ASSETS_DIR, exist_ok=True)
             print(f"[SETUP] Created: {ASSETS_DIR}")
-            if app_state['window']:
-                escaped_path = self._escape_js_string(ASSETS_DIR)
-                app_state['window'].evaluate_js(f'window.updateProgress(18, "[SUCCESS] Created: {escaped_path}")')
+            ui_events.call_js('updateProgress', 18, f"[SUCCESS] Created: {ASSETS_DIR}")
 
             # Create venvs directory
             venvs_dir = os.path.dirname(VENV_DIR)
             os.makedirs(venvs_dir, exist_ok=True)
             print(f"[SETUP] Created: {venvs_dir}")
-            if app_state['window']:
-                escaped_path = self._escape_js_string(venvs_dir)
-                app_state['window'].evaluate_js(f'window.updateProgress(19, "[SUCCESS] Created: {escaped_path}")')
+            ui_events.call_js('updateProgress', 19, f"[SUCCESS] Created: {venvs_dir}")
 
             print("[SETUP] Directory structure created successfully!")
 
             # Create virtual environment
-            if app_state['window']:
-                app_state['window'].evaluate_js('window.updateProgress(20, "[INFO] Creating virtual environment...")')
+            ui_events.call_js('updateProgress', 20, "[INFO] Creating virtual environment...")
 
             env = get_clean_environment()
             result = subprocess.run(
@@ -4518,8 +9058,7 @@ class MyScene(Scene):
             PYTHON_EXE = venv_python
 
             # Upgrade pip
-            if app_state['window']:
-                app_state['window'].evaluate_js('window.updateProgress(30, "[INFO] Upgrading pip...")')
+            ui_events.call_js('updateProgress', 30, "[INFO] Upgrading pip...")
 
             subprocess.run(
                 [venv_python, '-m', 'pip', 'install', '--upgrade', 'pip'],
@@ -4532,8 +9071,7 @@ class MyScene(Scene):
             # Helper function to run pip with real-time output
             def run_pip_install(package, progress_value):
                 """Run pip install with real-time output streaming"""
-                if app_state['window']:
-                    app_state['window'].evaluate_js(f'window.updateProgress({progress_value}, "[INFO] Installing {package}...")')
+                ui_events.call_js('updateProgress', progress_value, f"[INFO] Installing {package}...")
 
                 print(f"[SETUP] Installing {package}...")
 
@@ -4556,23 +9094,19 @@ class MyScene(Scene):
                 for line in process.stdout:
                     line = line.strip()
                     if line:
-                        # Send each line to UI console
-                        escaped_line = self._escape_js_string(line)
-                        if app_state['window']:
-                            app_state['window'].evaluate_js(f'window.updateProgress({progress_value}, "{escaped_line}")')
+                        # Send each line to UI console (batched per frame by the event bus)
+                        ui_events.call_js('updateProgress', progress_value, line)
                         print(f"  {line}")
 
                 process.wait()
 
                 if process.returncode != 0:
                     print(f"[WARNING] Failed to install {package}")
-                    if app_state['window']:
-                        app_state['window'].evaluate_js(f'window.updateProgress({progress_value}, "[WARNING] {package} installation had issues")')
+                    ui_events.call_js('updateProgress', progress_value, f"[WARNING] {package} installation had issues")
                     return False
                 else:
                     print(f"[SETUP] {package} installed successfully")
-                    if app_state['window']:
-                        app_state['window'].evaluate_js(f'window.updateProgress({progress_value}, "[SUCCESS] {package} installed successfully")')
+                    ui_events.call_js('updateProgress', progress_value, f"[SUCCESS] {package} installed successfully")
                     return True
 
             # Install required packages
@@ -4596,23 +9130,19 @@ class MyScene(Scene):
                     progress = min(progress + 5, 90)
 
             # Final progress
-            if app_state['window']:
-                app_state['window'].evaluate_js('window.updateProgress(100, "[SUCCESS] Installation complete!")')
+            ui_events.call_js('updateProgress', 100, "[SUCCESS] Installation complete!")
 
             print("[SETUP] Installation complete!")
 
             # Notify UI that installation is complete
-            if app_state['window']:
-                app_state['window'].evaluate_js('window.onInstallationComplete(true, "Installation successful")')
+            ui_events.call_js('onInstallationComplete', True, "Installation successful")
 
         except Exception as e:
             error_msg = str(e)
             print(f"[ERROR] Installation failed: {error_msg}")
-            if app_state['window']:
-                escaped_error = self._escape_js_string(f"[ERROR] Installation failed: {error_msg}")
-                app_state['window'].evaluate_js(f'window.updateProgress(0, "{escaped_error}")')
-                # Notify UI that installation failed
-                app_state['window'].evaluate_js(f'window.onInstallationComplete(false, "{escaped_error}")')
+            ui_events.call_js('updateProgress', 0, f"[ERROR] Installation failed: {error_msg}")
+            # Notify UI that installation failed
+            ui_events.call_js('onInstallationComplete', False, f"[ERROR] Installation failed: {error_msg}")
 
     def open_folder(self, folder_path):
         """Open folder in file explorer"""
@@ -4687,52 +9217,14 @@ class MyScene(Scene):
             return {'status': 'error', 'message': str(e)}
 
     def upload_assets(self, file_paths):
-        """Copy selected files to the assets directory"""
+        """Copy selected files to the assets directory (waits for the import - see import_assets)"""
         try:
-            import shutil
-
             if not file_paths:
                 return {'status': 'error', 'message': 'No files provided'}
 
-            # Ensure assets directory exists
-            os.makedirs(ASSETS_DIR, exist_ok=True)
-
-            uploaded_files = []
-            failed_files = []
-
-            for file_path in file_paths:
-                try:
-                    if not os.path.exists(file_path):
-                        failed_files.append({'file': os.path.basename(file_path), 'error': 'File not found'})
-                        continue
-
-                    # Get filename and destination
-                    filename = os.path.basename(file_path)
-                    dest_path = os.path.join(ASSETS_DIR, filename)
-
-                    # Check if file already exists
-                    if os.path.exists(dest_path):
-                        # Add timestamp to filename to avoid overwrite
-                        name, ext = os.path.splitext(filename)
-                        filename = f"{name}_{int(time.time())}{ext}"
-                        dest_path = os.path.join(ASSETS_DIR, filename)
-
-                    # Copy file to assets
-                    shutil.copy2(file_path, dest_path)
-
-                    # Force filesystem sync to ensure file is written
-                    try:
-                        with open(dest_path, 'rb') as f:
-                            os.fsync(f.fileno())
-                    except:
-                        pass  # If fsync fails, continue anyway
-
-                    uploaded_files.append(filename)
-                    print(f'[UPLOAD] Copied {filename} to assets')
-
-                except Exception as e:
-                    failed_files.append({'file': os.path.basename(file_path), 'error': str(e)})
-                    print(f'[UPLOAD ERROR] Failed to copy {file_path}: {e}')
+            job = asset_importer.start(file_paths)
+            job.finished.wait()
+            uploaded_files, failed_files = job.imported, job.errors
 
             # Return result
             if uploaded_files and not failed_files:
@@ -4760,8 +9252,68 @@ class MyScene(Scene):
             traceback.print_exc()
             return {'status': 'error', 'message': str(e)}
 
+    def import_assets(self, paths):
+        """
+        Import files and folders into the assets library in the background.
+        Returns a job id right away; progress arrives as 'import' / 'import_file' events.
+        """
+        try:
+            if not paths:
+                return {'status': 'error', 'message': 'No files provided'}
+            job = asset_importer.start(paths)
+            return dict(job.describe(), status='success')
+        except Exception as e:
+            print(f"[IMPORT ERROR] {e}")
+            return {'status': 'error', 'message': str(e)}
+
+    def get_import_status(self, job_id):
+        """Progress of an import started with import_assets"""
+        try:
+            job = asset_importer.get(job_id)
+            return dict(job.describe(), imported=list(job.imported), status='success')
+        except KeyError as e:
+            return {'status': 'error', 'message': str(e)}
+
+    def cancel_import(self, job_id):
+        """Stop an import - files already imported are kept"""
+        try:
+            asset_importer.cancel(job_id)
+            return {'status': 'success'}
+        except KeyError as e:
+            return {'status': 'error', 'message': str(e)}
+
+    def start_job(self, method, args=None):
+        """
+        Run a long ManimAPI call (see JOB_METHODS) in the background.
+        Returns a job id right away; progress and the call's result arrive as 'job' events.
+        """
+        if method not in JOB_METHODS:
+            return {'status': 'error', 'message': f'{method} cannot run as a background job'}
+        job = job_manager.submit(method, getattr(self, method), *(args or []))
+        print(f"[JOB] Started {method} as {job.job_id}")
+        return dict(job.describe(), status='success')
+
+    def get_job(self, job_id):
+        """State, progress and (once finished) result of a background job"""
+        try:
+            return dict(job_manager.get(job_id).describe(), status='success')
+        except KeyError as e:
+            return {'status': 'error', 'message': str(e)}
+
+    def list_jobs(self):
+        """All running and recently finished background jobs"""
+        return {'status': 'success', 'jobs': job_manager.list()}
+
+    def cancel_job(self, job_id):
+        """Cancel a background job - its running pip/ffmpeg process is terminated"""
+        try:
+            job_manager.cancel(job_id)
+            return {'status': 'success'}
+        except KeyError as e:
+            return {'status': 'error', 'message': str(e)}
+
     def upload_file_content(self, filename, base64_content):
-        """Upload a file from base64 content (for drag and drop)"""
+        """Upload a whole file from base64 content (small files - large ones use begin_upload)"""
         try:
             import base64
 
@@ -4777,25 +9329,11 @@ class MyScene(Scene):
             except Exception as e:
                 return {'status': 'error', 'message': f'Failed to decode file: {e}'}
 
-            # Generate destination path
-            dest_path = os.path.join(ASSETS_DIR, filename)
-
-            # Check if file already exists
-            if os.path.exists(dest_path):
-                # Add timestamp to filename to avoid overwrite
-                name, ext = os.path.splitext(filename)
-                filename = f"{name}_{int(time.time())}{ext}"
-                dest_path = os.path.join(ASSETS_DIR, filename)
-
-            # Write file
-            with open(dest_path, 'wb') as f:
-                f.write(file_data)
-                # Force filesystem sync to ensure file is written
-                try:
-                    os.fsync(f.fileno())
-                except:
-                    pass
+            # Store through the blob store (timestamped name if a different file has it)
+            dest_path, _, _ = blob_store.ingest_bytes(file_data, os.path.basename(filename))
+            filename = os.path.basename(dest_path)
 
+            asset_index.refresh_path(dest_path)
             print(f'[UPLOAD] Saved {filename} to assets ({len(file_data)} bytes)')
 
             return {
@@ -4809,6 +9347,55 @@ class MyScene(Scene):
             traceback.print_exc()
             return {'status': 'error', 'message': str(e)}
 
+    def begin_upload(self, filename, size, last_modified=None):
+        """Start (or resume) a chunked upload to the assets folder - returns the offset to continue from"""
+        try:
+            return dict(upload_manager.begin(filename, size, last_modified), status='success')
+        except Exception as e:
+            print(f"[UPLOAD ERROR] {e}")
+            return {'status': 'error', 'message': str(e)}
+
+    def append_upload_chunk(self, upload_id, offset, base64_chunk, checksum=None):
+        """Write one base64 chunk at offset; checksum is the chunk's SHA-256 hex digest (optional)"""
+        try:
+            import base64
+            try:
+                data = base64.b64decode(base64_chunk, validate=True)
+            except Exception as e:
+                return {'status': 'error', 'code': 'bad_chunk', 'message': f'Failed to decode chunk: {e}'}
+            return upload_manager.append(upload_id, offset, data, checksum)
+        except KeyError as e:
+            return {'status': 'error', 'code': 'unknown_upload', 'message': str(e)}
+        except Exception as e:
+            print(f"[UPLOAD ERROR] {e}")
+            return {'status': 'error', 'message': str(e)}
+
+    def commit_upload(self, upload_id, sha256=None):
+        """Finish a chunked upload and move the file into the assets folder"""
+        try:
+            return upload_manager.commit(upload_id, sha256)
+        except KeyError as e:
+            return {'status': 'error', 'code': 'unknown_upload', 'message': str(e)}
+        except Exception as e:
+            print(f"[UPLOAD ERROR] {e}")
+            traceback.print_exc()
+            return {'status': 'error', 'message': str(e)}
+
+    def abort_upload(self, upload_id):
+        """Cancel a chunked upload and delete what was received"""
+        try:
+            upload_manager.abort(upload_id)
+            return {'status': 'success'}
+        except Exception as e:
+            return {'status': 'error', 'message': str(e)}
+
+    def get_upload_status(self, upload_id):
+        """Bytes received so far for a chunked upload"""
+        try:
+            return dict(upload_manager.status(upload_id), status='success')
+        except KeyError as e:
+            return {'status': 'error', 'code': 'unknown_upload', 'message': str(e)}
+
     def save_app_settings(self, settings):
         """Save app settings to .manim_studio/settings.json"""
         try:
@@ -5025,36 +9612,24 @@ class MyScene(Scene):
     def get_video_files(self):
         """Get list of all video files from media directory"""
         try:
+            files, _ = asset_index.query('media', kinds='video')
+            metadata = media_metadata.get_many([f['path'] for f in files])
             video_files = []
-            media_path = MEDIA_DIR
-
-            if not os.path.exists(media_path):
-                return {'status': 'success', 'videos': []}
-
-            # Supported video extensions
-            video_extensions = ('.mp4', '.mov', '.avi', '.webm', '.mkv', '.flv', '.m4v')
-
-            for root, dirs, files in os.walk(media_path):
-                for file in files:
-                    if file.lower().endswith(video_extensions):
-                        full_path = os.path.join(root, file)
-                        rel_path = os.path.relpath(full_path, media_path)
-
-                        # Get video duration using ffprobe if available
-                        try:
-                            duration = self._get_video_duration(full_path)
-                        except:
-                            duration = 0
-
-                        video_files.append({
-                            'name': file,
-                            'path': full_path,
-                            'relative_path': rel_path,
-                            'duration': duration
-                        })
-
-            # Sort by modification time (newest first)
-            video_files.sort(key=lambda x: os.path.getmtime(x['path']), reverse=True)
+            for f in files:
+                info = metadata.get(f['path']) or {}
+                video_files.append({
+                    'name': f['name'],
+                    'path': f['path'],
+                    'relative_path': f['relative_path'].replace('/', os.sep),
+                    'duration': info.get('duration', 0),
+                    'width': info.get('width', 0),
+                    'height': info.get('height', 0),
+                    'fps': info.get('fps', 0),
+                    'codec': info.get('videoCodec', ''),
+                    'bitrate': info.get('bitrate', 0),
+                    'hasAudio': info.get('hasAudio', False),
+                    'proxy': f['proxy']
+                })
 
             return {'status': 'success', 'videos': video_files}
 
@@ -5063,26 +9638,48 @@ class MyScene(Scene):
             traceback.print_exc()
             return {'status': 'error', 'message': str(e)}
 
-    def _get_video_duration(self, video_path):
-        """Get video duration in seconds using ffprobe"""
+    def get_playback_url(self, file_path):
+        """
+        URL to play a video in the UI: its low-res proxy when one is ready (a missing one
+        is queued), otherwise the original. Exports always use the original file.
+        """
         try:
-            cmd = [
-                'ffprobe',
-                '-v', 'error',
-                '-show_entries', 'format=duration',
-                '-of', 'default=noprint_wrappers=1:nokey=1',
-                video_path
-            ]
+            original = asset_server.url_for(file_path)
+            proxy = proxy_service.proxy_url(file_path)
+            return {'status': 'success', 'url': proxy or original, 'original': original, 'isProxy': bool(proxy)}
+        except Exception as e:
+            return {'status': 'error', 'message': str(e)}
 
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=5)
-            if result.returncode == 0 and result.stdout.strip():
-                return float(result.stdout.strip())
-            return 0
-        except:
-            return 0
+    def get_seek_preview(self, file_path):
+        """
+        Sprite sheets and keyframe index for hover-scrubbing a video. If they aren't
+        generated yet this queues them and returns ready=False; a 'seek_preview' event
+        follows when they are.
+        """
+        try:
+            manifest_path, manifest = seek_preview_service.get(file_path)
+            result = {'status': 'success', 'ready': manifest is not None,
+                      'manifest': asset_server.url_for(manifest_path)}
+            if manifest:
+                base = os.path.dirname(manifest_path)
+                result.update(manifest, sheets=[asset_server.url_for(os.path.join(base, name))
+                                                for name in manifest['sheets']])
+            return result
+        except Exception as e:
+            return {'status': 'error', 'message': str(e)}
+
+    def get_media_info(self, file_path):
+        """Cached ffprobe metadata for a media file (duration, resolution, fps, codecs, audio)"""
+        try:
+            info = media_metadata.get(file_path)
+            if info is None:
+                return {'status': 'error', 'message': 'Could not read media information'}
+            return dict(info, status='success')
+        except Exception as e:
+            return {'status': 'error', 'message': str(e)}
 
     def trim_video(self, video_path, start_time, end_time, output_name):
-        """Trim video using FFmpeg"""
+        """Trim video frame-accurately, re-encoding only the GOPs at the cut points"""
         try:
             # Validate inputs
             if not os.path.exists(video_path):
@@ -5096,47 +9693,33 @@ class MyScene(Scene):
                 output_name += '.mp4'
 
             output_path = os.path.join(MEDIA_DIR, output_name)
+            if os.path.abspath(output_path) == os.path.abspath(video_path):
+                return {'status': 'error', 'message': 'Output name must differ from the source video'}
 
-            # Build FFmpeg command
-            cmd = ['ffmpeg', '-i', video_path, '-y']  # -y to overwrite
-
-            # Add start time if specified
-            if start_time > 0:
-                cmd.extend(['-ss', str(start_time)])
-
-            # Add duration/end time if specified
-            if end_time > 0:
-                if start_time > 0:
-                    duration = end_time - start_time
-                    cmd.extend(['-t', str(duration)])
-                else:
-                    cmd.extend(['-to', str(end_time)])
-
-            # Copy codec for fast processing (no re-encoding)
-            cmd.extend(['-c', 'copy', output_path])
-
-            print(f"[TRIM VIDEO] Running command: {' '.join(cmd)}")
-
-            # Run FFmpeg
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=300  # 5 minute timeout
-            )
-
-            if result.returncode == 0:
-                return {
-                    'status': 'success',
-                    'message': f'Video trimmed successfully: {output_name}',
-                    'output_path': output_path
-                }
-            else:
-                return {
-                    'status': 'error',
-                    'message': f'FFmpeg error: {result.stderr}'
-                }
+            started = time.time()
+            os.makedirs(VIDEO_WORK_DIR, exist_ok=True)
+            tmp_path = os.path.join(VIDEO_WORK_DIR, f'{threading.get_ident()}_{output_name}')
+            try:
+                stats = smart_trim(video_path, start_time, end_time, tmp_path)
+                os.replace(tmp_path, output_path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            asset_index.refresh_path(output_path)
+
+            print(f"[TRIM VIDEO] {output_name}: {stats['mode']}, copied {stats['copied']:.2f}s, "
+                  f"re-encoded {stats['reencoded']:.2f}s in {time.time() - started:.2f}s")
+            return {
+                'status': 'success',
+                'message': f'Video trimmed successfully: {output_name}',
+                'output_path': output_path,
+                'mode': stats['mode'],
+                'copied': stats['copied'],
+                'reencoded': stats['reencoded']
+            }
 
+        except ValueError as e:
+            return {'status': 'error', 'message': str(e)}
         except subprocess.TimeoutExpired:
             return {'status': 'error', 'message': 'Video trimming timed out'}
         except FileNotFoundError:
@@ -5147,7 +9730,7 @@ class MyScene(Scene):
             return {'status': 'error', 'message': str(e)}
 
     def combine_videos(self, video_paths, output_name):
-        """Combine multiple videos using FFmpeg"""
+        """Combine multiple videos, re-encoding only clips whose parameters don't match"""
         try:
             # Validate inputs
             if not video_paths or len(video_paths) < 2:
@@ -5166,54 +9749,30 @@ class MyScene(Scene):
                 output_name += '.mp4'
 
             output_path = os.path.join(MEDIA_DIR, output_name)
+            if any(os.path.abspath(p) == os.path.abspath(output_path) for p in video_paths):
+                return {'status': 'error', 'message': 'Output name must differ from the input videos'}
 
-            # Create concat file list
-            concat_file = os.path.join(MEDIA_DIR, f'concat_list_{int(time.time())}.txt')
-
-            with open(concat_file, 'w', encoding='utf-8') as f:
-                for video_path in video_paths:
-                    # FFmpeg concat requires absolute paths with forward slashes
-                    abs_path = os.path.abspath(video_path).replace('\\', '/')
-                    f.write(f"file '{abs_path}'\n")
-
-            # Build FFmpeg command for concatenation
-            cmd = [
-                'ffmpeg',
-                '-f', 'concat',
-                '-safe', '0',
-                '-i', concat_file,
-                '-c', 'copy',  # Copy codec for fast processing
-                '-y',  # Overwrite output file
-                output_path
-            ]
-
-            print(f"[COMBINE VIDEOS] Running command: {' '.join(cmd)}")
-
-            # Run FFmpeg
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=600  # 10 minute timeout
-            )
-
-            # Clean up concat file
+            started = time.time()
+            os.makedirs(VIDEO_WORK_DIR, exist_ok=True)
+            tmp_path = os.path.join(VIDEO_WORK_DIR, f'{threading.get_ident()}_{output_name}')
             try:
-                os.remove(concat_file)
-            except:
-                pass
-
-            if result.returncode == 0:
-                return {
-                    'status': 'success',
-                    'message': f'Videos combined successfully: {output_name}',
-                    'output_path': output_path
-                }
-            else:
-                return {
-                    'status': 'error',
-                    'message': f'FFmpeg error: {result.stderr}'
-                }
+                stats = smart_combine(video_paths, tmp_path)
+                os.replace(tmp_path, output_path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            asset_index.refresh_path(output_path)
+
+            print(f"[COMBINE VIDEOS] {output_name}: {stats['mode']}, {stats['copied']} copied, "
+                  f"{stats['reencoded']} re-encoded in {time.time() - started:.2f}s")
+            return {
+                'status': 'success',
+                'message': f'Videos combined successfully: {output_name}',
+                'output_path': output_path,
+                'mode': stats['mode'],
+                'copied': stats['copied'],
+                'reencoded': stats['reencoded']
+            }
 
         except subprocess.TimeoutExpired:
             return {'status': 'error', 'message': 'Video combining timed out'}
@@ -5224,6 +9783,66 @@ class MyScene(Scene):
             traceback.print_exc()
             return {'status': 'error', 'message': str(e)}
 
+    def list_projects(self):
+        """All multi-scene projects"""
+        try:
+            return {'status': 'success', 'projects': project_timeline.list()}
+        except Exception as e:
+            print(f"[PROJECT ERROR] {e}")
+            return {'status': 'error', 'message': str(e)}
+
+    def load_project(self, name):
+        """A project's scenes and settings"""
+        try:
+            return {'status': 'success', 'project': project_timeline.load(name)}
+        except FileNotFoundError:
+            return {'status': 'error', 'message': f'Project not found: {name}'}
+        except Exception as e:
+            return {'status': 'error', 'message': str(e)}
+
+    def save_project(self, project):
+        """Create or update a project (ordered scenes with per-scene quality/fps)"""
+        try:
+            return {'status': 'success', 'project': project_timeline.save(project)}
+        except ValueError as e:
+            return {'status': 'error', 'message': str(e)}
+        except Exception as e:
+            print(f"[PROJECT ERROR] {e}")
+            traceback.print_exc()
+            return {'status': 'error', 'message': str(e)}
+
+    def delete_project(self, name):
+        """Delete a project and its cached scene renders (the assembled video is kept)"""
+        try:
+            project_timeline.delete(name)
+            return {'status': 'success'}
+        except FileNotFoundError:
+            return {'status': 'error', 'message': f'Project not found: {name}'}
+        except Exception as e:
+            return {'status': 'error', 'message': str(e)}
+
+    def get_project_status(self, name):
+        """Which scenes changed since the last build and whether the output is out of date"""
+        try:
+            return dict(project_timeline.status(name), status='success')
+        except FileNotFoundError:
+            return {'status': 'error', 'message': f'Project not found: {name}'}
+        except Exception as e:
+            return {'status': 'error', 'message': str(e)}
+
+    def build_project(self, name, force=False):
+        """Render changed scenes (in parallel) and re-assemble the project video"""
+        try:
+            return project_timeline.build(name, force=force)
+        except FileNotFoundError as e:
+            return {'status': 'error', 'message': f'Project file not found: {e.filename}'}
+        except ValueError as e:
+            return {'status': 'error', 'message': str(e)}
+        except Exception as e:
+            print(f"[PROJECT ERROR] {e}")
+            traceback.print_exc()
+            return {'status': 'error', 'message': str(e)}
+
     def get_installed_packages(self):
         """Get list of installed packages in the virtual environment"""
         try:
@@ -5301,10 +9920,8 @@ class MyScene(Scene):
 
             print(f"[VENV] Running dependency check: {' '.join(cmd)}")
 
-            result = subprocess.run(
+            result = run_cancellable(
                 cmd,
-                capture_output=True,
-                text=True,
                 env=env,
                 timeout=60
             )
@@ -5353,10 +9970,8 @@ class MyScene(Scene):
 
             # Also check with pip check for conflicts
             check_cmd = [venv_python, '-m', 'pip', 'check']
-            check_result = subprocess.run(
+            check_result = run_cancellable(
                 check_cmd,
-                capture_output=True,
-                text=True,
                 env=env,
                 timeout=30
             )
@@ -5403,10 +10018,8 @@ class MyScene(Scene):
 
             print(f"[VENV] Running: {' '.join(cmd)}")
 
-            result = subprocess.run(
+            result = run_cancellable(
                 cmd,
-                capture_output=True,
-                text=True,
                 env=env,
                 timeout=300  # 5 minute timeout
             )
@@ -5464,10 +10077,8 @@ class MyScene(Scene):
 
             print(f"[VENV] Running: {' '.join(cmd)}")
 
-            result = subprocess.run(
+            result = run_cancellable(
                 cmd,
-                capture_output=True,
-                text=True,
                 env=env,
                 timeout=60
             )
@@ -5516,10 +10127,8 @@ class MyScene(Scene):
             cmd = [venv_python, '-m', 'pip', 'list', '--outdated', '--format=json']
             env = get_clean_environment()
 
-            result = subprocess.run(
+            result = run_cancellable(
                 cmd,
-                capture_output=True,
-                text=True,
                 env=env,
                 timeout=60
             )
@@ -5535,8 +10144,9 @@ class MyScene(Scene):
                                    'moderngl', 'pygments']
 
                 # Check each update for Manim compatibility
-                for update in updates:
+                for index, update in enumerate(updates):
                     package_name = update.get('name', '').lower()
+                    report_job_progress(index / len(updates), f'Checking {package_name}')
                     current_version = update.get('version', '')
                     latest_version = update.get('latest_version', '')
 
@@ -5557,10 +10167,8 @@ class MyScene(Scene):
                         try:
                             # Quick check using pip install --dry-run
                             check_cmd = [venv_python, '-m', 'pip', 'install', '--dry-run', '--upgrade', package_name]
-                            check_result = subprocess.run(
+                            check_result = run_cancellable(
                                 check_cmd,
-                                capture_output=True,
-                                text=True,
                                 env=env,
                                 timeout=30
                             )
@@ -5622,10 +10230,8 @@ class MyScene(Scene):
 
             print(f"[VENV] Running: {' '.join(cmd)}")
 
-            result = subprocess.run(
+            result = run_cancellable(
                 cmd,
-                capture_output=True,
-                text=True,
                 env=env,
                 timeout=300  # 5 minute timeout
             )
@@ -5683,6 +10289,9 @@ def start_app():
     os.makedirs(ASSETS_DIR, exist_ok=True)
     os.makedirs(PREVIEW_DIR, exist_ok=True)
 
+    # Assets deleted outside the app leave blobs behind
+    blob_store.collect_garbage_async()
+
     # Check if virtual environment exists
     venv_exists = check_venv_exists()
 
@@ -5695,54 +10304,8 @@ def start_app():
         print("[INFO] Will launch setup wizard")
     print("=" * 60)
 
-    # Start Pyright LSP bridge for VSCode-quality IntelliSense
-    def start_lsp_bridge():
-        """Start the LSP bridge in background"""
-        import threading
-        import time
-
-        def run_lsp():
-            try:
-                # Check if lsp_venv exists
-                lsp_venv_path = os.path.join(BASE_DIR, 'lsp_venv')
-                if os.name == 'nt':
-                    python_path = os.path.join(lsp_venv_path, 'Scripts', 'python.exe')
-                else:
-                    python_path = os.path.join(lsp_venv_path, 'bin', 'python')
-
-                lsp_bridge_path = os.path.join(BASE_DIR, 'lsp_bridge.py')
-
-                if not os.path.exists(python_path) or not os.path.exists(lsp_bridge_path):
-                    print('[LSP] LSP environment or bridge not found, skipping IntelliSense startup')
-                    return
-
-                print('[LSP] Starting Pyright Language Server on port 8765...')
-
-                # Start LSP bridge process
-                env = get_clean_environment()
-                process = subprocess.Popen(
-                    [python_path, lsp_bridge_path, '8765', lsp_venv_path],
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    encoding='utf-8',  # Force UTF-8 encoding
-                    errors='replace',  # Replace invalid characters instead of crashing
-                    env=env,
-                    creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
-                )
-
-                # Store process for cleanup
-                app_state['lsp_process'] = process
-
-                print('[LSP] [OK] Pyright Language Server started')
-
-            except Exception as e:
-                print(f'[LSP] Failed to start LSP bridge: {e}')
-
-        # Start in background thread
-        threading.Thread(target=run_lsp, daemon=True).start()
-
-    # LSP bridge disabled - using basic Monaco editor without LSP
-    # start_lsp_bridge()
+    # Editor completions come from the manim symbol index - load or build it now
+    manim_symbols.warm()
 
     # Create API instance
     api = ManimAPI()
@@ -297,52 +297,75 @@ async function applySettings() {
 // AUTOSAVE BACKUP MANAGEMENT
 // ============================================================================
 
-async function loadAutosaveBackups() {
-    console.log('[BACKUPS] Loading autosave backups...');
+// The journal can hold hundreds of snapshots - the panel loads them a page at a time
+const BACKUPS_PAGE_SIZE = 50;
+
+function renderBackupItem(file, index) {
+    const timestamp = file.timestamp || 'Unknown';
+    const date = new Date(timestamp.replace(/_/g, (m, i) => i < 10 ? '-' : (i === 13 || i === 16 ? ':' : m)));
+    const dateStr = isNaN(date.getTime()) ? timestamp : date.toLocaleString();
+
+    return `
+        <div class="backup-item" style="display: flex; align-items: center; justify-content: space-between; padding: 10px 12px; background: var(--bg-secondary); border-radius: 6px; margin-bottom: 6px; border: 1px solid var(--border-color);">
+            <div style="flex: 1;">
+                <div style="font-size: 13px; color: var(--text-primary); font-weight: 500;">
+                    <i class="fas fa-file-code" style="color: #3b82f6; margin-right: 6px;"></i>
+                    Backup ${index + 1}
+                </div>
+                <div style="font-size: 11px; color: var(--text-secondary); margin-top: 2px;">
+                    ${dateStr}
+                </div>
+            </div>
+            <div style="display: flex; gap: 6px;">
+                <button onclick="restoreBackup('${file.autosave_file.replace(/\\/g, '\\\\')}')"
+                        style="background: rgba(16, 185, 129, 0.15); border: 1px solid rgba(16, 185, 129, 0.3); color: #10b981; padding: 5px 10px; border-radius: 4px; cursor: pointer; font-size: 11px; font-weight: 600;">
+                    <i class="fas fa-undo"></i> Restore
+                </button>
+                <button onclick="deleteBackup('${file.autosave_file.replace(/\\/g, '\\\\')}')"
+                        style="background: rgba(239, 68, 68, 0.15); border: 1px solid rgba(239, 68, 68, 0.3); color: #ef4444; padding: 5px 10px; border-radius: 4px; cursor: pointer; font-size: 11px; font-weight: 600;">
+                    <i class="fas fa-trash"></i>
+                </button>
+            </div>
+        </div>
+    `;
+}
+
+async function loadAutosaveBackups(offset = 0) {
+    console.log(`[BACKUPS] Loading autosave backups from ${offset}...`);
     const container = document.getElementById('autosaveBackupsList');
     if (!container) return;
 
-    container.innerHTML = `
-        <div style="text-align: center; color: var(--text-secondary); padding: 20px;">
-            <i class="fas fa-spinner fa-spin"></i> Loading backups...
-        </div>
-    `;
+    if (offset === 0) {
+        container.innerHTML = `
+            <div style="text-align: center; color: var(--text-secondary); padding: 20px;">
+                <i class="fas fa-spinner fa-spin"></i> Loading backups...
+            </div>
+        `;
+    }
 
     try {
-        const result = await window.pywebview.api.get_autosave_files();
-        console.log('[BACKUPS] Result:', result);
+        const result = await window.pywebview.api.get_autosave_files(BACKUPS_PAGE_SIZE, offset);
 
         if (result.status === 'success' && result.files && result.files.length > 0) {
-            container.innerHTML = result.files.map((file, index) => {
-                const timestamp = file.timestamp || 'Unknown';
-                const date = new Date(timestamp.replace(/_/g, (m, i) => i < 10 ? '-' : (i === 13 || i === 16 ? ':' : m)));
-                const dateStr = isNaN(date.getTime()) ? timestamp : date.toLocaleString();
-
-                return `
-                    <div class="backup-item" style="display: flex; align-items: center; justify-content: space-between; padding: 10px 12px; background: var(--bg-secondary); border-radius: 6px; margin-bottom: 6px; border: 1px solid var(--border-color);">
-                        <div style="flex: 1;">
-                            <div style="font-size: 13px; color: var(--text-primary); font-weight: 500;">
-                                <i class="fas fa-file-code" style="color: #3b82f6; margin-right: 6px;"></i>
-                                Backup ${index + 1}
-                            </div>
-                            <div style="font-size: 11px; color: var(--text-secondary); margin-top: 2px;">
-                                ${dateStr}
-                            </div>
-                        </div>
-                        <div style="display: flex; gap: 6px;">
-                            <button onclick="restoreBackup('${file.autosave_file.replace(/\\/g, '\\\\')}')"
-                                    style="background: rgba(16, 185, 129, 0.15); border: 1px solid rgba(16, 185, 129, 0.3); color: #10b981; padding: 5px 10px; border-radius: 4px; cursor: pointer; font-size: 11px; font-weight: 600;">
-                                <i class="fas fa-undo"></i> Restore
-                            </button>
-                            <button onclick="deleteBackup('${file.autosave_file.replace(/\\/g, '\\\\')}')"
-                                    style="background: rgba(239, 68, 68, 0.15); border: 1px solid rgba(239, 68, 68, 0.3); color: #ef4444; padding: 5px 10px; border-radius: 4px; cursor: pointer; font-size: 11px; font-weight: 600;">
-                                <i class="fas fa-trash"></i>
-                            </button>
-                        </div>
-                    </div>
-                `;
-            }).join('');
-        } else {
+            const items = result.files.map((file, index) => renderBackupItem(file, offset + index)).join('');
+            const moreButton = container.querySelector('.backups-load-more');
+            if (offset === 0) {
+                container.innerHTML = items;
+            } else {
+                if (moreButton) moreButton.remove();
+                container.insertAdjacentHTML('beforeend', items);
+            }
+
+            const loaded = offset + result.files.length;
+            if (result.count > loaded) {
+                container.insertAdjacentHTML('beforeend', `
+                    <button class="backups-load-more" onclick="loadAutosaveBackups(${loaded})"
+                            style="width: 100%; background: rgba(59, 130, 246, 0.15); border: 1px solid rgba(59, 130, 246, 0.3); color: #3b82f6; padding: 6px 10px; border-radius: 4px; cursor: pointer; font-size: 11px; font-weight: 600;">
+                        <i class="fas fa-chevron-down"></i> Show more (${result.count - loaded} older)
+                    </button>
+                `);
+            }
+        } else if (offset === 0) {
             container.innerHTML = `
                 <div style="text-align: center; color: var(--text-secondary); padding: 30px;">
                     <i class="fas fa-inbox" style="font-size: 32px; margin-bottom: 10px; opacity: 0.3;"></i>
@@ -59,27 +59,9 @@ async function openFileDialogAndUpload() {
 }
 
 async function uploadFiles(filePaths) {
-    try {
-        console.log('[UPLOAD] Uploading', filePaths.length, 'files...');
-        const result = await pywebview.api.add_assets(filePaths);
-
-        console.log('[UPLOAD] Upload result:', result);
-
-        if (result.status === 'success') {
-            toast(`Added ${result.added} file(s) to assets`, 'success');
-            if (typeof refreshAssets === 'function') {
-                refreshAssets();
-            }
-        } else {
-            toast(result.message || 'Failed to add files', 'error');
-            if (result.errors && result.errors.length > 0) {
-                console.error('[UPLOAD] Errors:', result.errors);
-            }
-        }
-    } catch (error) {
-        console.error('[UPLOAD] Error uploading files:', error);
-        toast('Error uploading files', 'error');
-    }
+    console.log('[UPLOAD] Importing', filePaths.length, 'files...');
+    // Background import - progress and the result are reported through 'import' events
+    await window.importAssetPaths(filePaths);
 }
 
 // ======================
@@ -249,10 +231,11 @@ function showPreviewPyWebView(filepath, filename) {
         // Show image
         previewVideo.style.display = 'none';
         previewImage.style.display = 'block';
-        // For images, read as base64 via Python API
+        // For images, get a URL on the local asset server via Python API
         if (window.pywebview) {
-            window.pywebview.api.read_file_as_base64(filepath).then(function(base64Data) {
-                previewImage.src = 'data:image/' + ext + ';base64,' + base64Data;
+            window.pywebview.api.get_asset_url(filepath).then(function(result) {
+                if (result.status !== 'success') throw new Error(result.message);
+                previewImage.src = result.url;
             }).catch(function(err) {
                 console.error('[PREVIEW] Failed to load image:', err);
                 alert('Failed to load image preview');
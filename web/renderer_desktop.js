@@ -26,6 +26,14 @@ let lastSavedCode = '';
 let hasUnsavedChanges = false;
 const AUTOSAVE_INTERVAL = 30000; // 30 seconds
 
+// Document sync - Python keeps the authoritative editor text, we send edit deltas
+const docSync = {
+    version: 0,
+    opened: false,
+    pending: [],
+    queue: Promise.resolve()
+};
+
 
 // Initialize Monaco Editor using AMD require
 function initializeEditor() {
@@ -135,9 +143,14 @@ class MyScene(Scene):
             }
         });
 
+        registerManimLanguageFeatures();
+
         // Event listeners
         let errorCheckTimeout = null;
-        editor.onDidChangeModelContent(() => {
+        editor.onDidChangeModelContent((e) => {
+            for (const change of e.changes) {
+                docSync.pending.push({ offset: change.rangeOffset, length: change.rangeLength, text: change.text });
+            }
             updateLineCount();
             // Mark as having unsaved changes
             const currentCode = getEditorValue();
@@ -189,6 +202,136 @@ class MyScene(Scene):
     });
 }
 
+// manim IntelliSense - completions, hovers and signatures from the symbol index in app.py
+const COMPLETION_KINDS = {
+    class: 'Class',
+    function: 'Function',
+    method: 'Method',
+    property: 'Property',
+    constant: 'Constant',
+    module: 'Module',
+    keyword: 'Field'
+};
+
+// Name before a trailing '.', e.g. 'self' for "self." - null if there is no dot
+function dottedOwner(textBefore) {
+    const match = /([A-Za-z_]\w*)\s*\.\s*$/.exec(textBefore);
+    return match ? match[1] : (/\.\s*$/.test(textBefore) ? undefined : null);
+}
+
+// Call enclosing the cursor: {name, owner, argument, keyword}, looking back a few lines
+function enclosingCall(model, position) {
+    const text = model.getValueInRange({
+        startLineNumber: Math.max(1, position.lineNumber - 20),
+        startColumn: 1,
+        endLineNumber: position.lineNumber,
+        endColumn: position.column
+    });
+    let depth = 0;
+    let argument = 0;
+    let argStart = -1; // Start of the argument under the cursor
+    for (let i = text.length - 1; i >= 0; i--) {
+        const ch = text[i];
+        if (ch === ')' || ch === ']' || ch === '}') {
+            depth++;
+        } else if (ch === '(' || ch === '[' || ch === '{') {
+            if (depth > 0) {
+                depth--;
+                continue;
+            }
+            if (ch !== '(') return null;
+            const callee = /(?:([A-Za-z_]\w*)\s*\.\s*)?([A-Za-z_]\w*)\s*$/.exec(text.slice(0, i));
+            if (!callee) return null;
+            const keyword = /^\s*([A-Za-z_]\w*)\s*=(?!=)/.exec(text.slice(argStart < 0 ? i + 1 : argStart));
+            return { name: callee[2], owner: callee[1] || null, argument, keyword: keyword ? keyword[1] : null };
+        } else if (ch === ',' && depth === 0) {
+            if (argStart < 0) argStart = i + 1;
+            argument++;
+        }
+    }
+    return null;
+}
+
+function registerManimLanguageFeatures() {
+    const api = () => window.pywebview && window.pywebview.api;
+
+    monaco.languages.registerCompletionItemProvider('python', {
+        triggerCharacters: ['.'],
+        provideCompletionItems: async (model, position) => {
+            if (!api() || !api().get_completions) return { suggestions: [] };
+            const word = model.getWordUntilPosition(position);
+            const owner = dottedOwner(model.getLineContent(position.lineNumber).slice(0, word.startColumn - 1));
+            if (owner === undefined) return { suggestions: [] }; // e.g. "foo()." - nothing to resolve
+            const call = owner ? null : enclosingCall(model, position);
+            if (owner) await syncDocument(); // self / variable owners are resolved against the document
+
+            const res = await api().get_completions(word.word, owner, call && !call.owner ? call.name : null,
+                                                    position.lineNumber);
+            if (res.status !== 'success') return { suggestions: [] };
+            const range = new monaco.Range(position.lineNumber, word.startColumn, position.lineNumber, word.endColumn);
+            return {
+                suggestions: res.items.map(item => ({
+                    label: item.label,
+                    kind: monaco.languages.CompletionItemKind[COMPLETION_KINDS[item.kind] || 'Text'],
+                    detail: item.detail,
+                    documentation: item.doc,
+                    insertText: item.insertText || item.label,
+                    sortText: (item.kind === 'keyword' ? '0' : '1') + item.label,
+                    range
+                }))
+            };
+        }
+    });
+
+    monaco.languages.registerHoverProvider('python', {
+        provideHover: async (model, position) => {
+            const word = model.getWordAtPosition(position);
+            if (!word || !api() || !api().get_hover) return null;
+            const owner = dottedOwner(model.getLineContent(position.lineNumber).slice(0, word.startColumn - 1));
+            if (owner === undefined) return null;
+            if (owner) await syncDocument();
+
+            const res = await api().get_hover(word.word, owner, position.lineNumber);
+            if (res.status !== 'success' || !res.contents) return null;
+            return {
+                range: new monaco.Range(position.lineNumber, word.startColumn, position.lineNumber, word.endColumn),
+                contents: [{ value: res.contents }]
+            };
+        }
+    });
+
+    monaco.languages.registerSignatureHelpProvider('python', {
+        signatureHelpTriggerCharacters: ['(', ','],
+        signatureHelpRetriggerCharacters: [')'],
+        provideSignatureHelp: async (model, position) => {
+            const call = enclosingCall(model, position);
+            if (!call || !api() || !api().get_signature_help) return null;
+            if (call.owner) await syncDocument();
+
+            const res = await api().get_signature_help(call.name, call.owner, position.lineNumber);
+            if (res.status !== 'success' || !res.signature) return null;
+            const signature = res.signature;
+            let active = Math.min(call.argument, signature.parameters.length - 1);
+            if (call.keyword) {
+                const index = signature.parameters.findIndex(p => p.split('=')[0].trim() === call.keyword);
+                if (index >= 0) active = index;
+            }
+            return {
+                value: {
+                    signatures: [{
+                        label: signature.label,
+                        documentation: signature.doc,
+                        parameters: signature.parameters.map(label => ({ label }))
+                    }],
+                    activeSignature: 0,
+                    activeParameter: active
+                },
+                dispose() {}
+            };
+        }
+    });
+}
+
 // Helper functions
 function delay(ms) {
     return new Promise(resolve => setTimeout(resolve, ms));
@@ -254,6 +397,49 @@ function getEditorValue() {
     return editor ? editor.getValue() : '';
 }
 
+// Send pending edits to Python; resolves to the document ref APIs take instead of the full text
+// Falls back to the plain editor text where document sync isn't available (Flask adapter)
+function syncDocument() {
+    if (!pywebview.api.open_document) {
+        return Promise.resolve(getEditorValue());
+    }
+    docSync.queue = docSync.queue.then(flushDocument, flushDocument);
+    return docSync.queue.then(version => ({ version }));
+}
+
+async function flushDocument() {
+    if (!docSync.opened) {
+        const text = getEditorValue();
+        docSync.pending = [];
+        const res = await pywebview.api.open_document(text);
+        docSync.version = res.version;
+        docSync.opened = true;
+        return docSync.version;
+    }
+    if (docSync.pending.length === 0) {
+        return docSync.version;
+    }
+
+    const changes = docSync.pending;
+    docSync.pending = [];
+    let res;
+    try {
+        res = await pywebview.api.apply_document_changes(docSync.version, changes);
+    } catch (err) {
+        docSync.opened = false; // Unknown whether the batch landed - reopen on the next sync
+        throw err;
+    }
+    if (res.status === 'success') {
+        docSync.version = res.version;
+        return docSync.version;
+    }
+
+    // Out of step (e.g. a batch was lost) - start over with the full text
+    console.warn('[DOC SYNC] Resyncing editor document');
+    docSync.opened = false;
+    return flushDocument();
+}
+
 function setEditorValue(value) {
     if (editor) {
         editor.setValue(value);
@@ -469,7 +655,7 @@ async function openFile() {
 async function saveFile() {
     try {
         const code = getEditorValue();
-        const res = await pywebview.api.save_file(code, currentFile);
+        const res = await pywebview.api.save_file(await syncDocument(), currentFile);
 
         if (res.status === 'success') {
             currentFile = res.path;
@@ -487,7 +673,7 @@ async function saveFile() {
 async function saveFileAs() {
     try {
         const code = getEditorValue();
-        const res = await pywebview.api.save_file_dialog(code);
+        const res = await pywebview.api.save_file_dialog(await syncDocument());
 
         if (res.status === 'success') {
             currentFile = res.path;
@@ -545,7 +731,7 @@ async function performAutosave() {
 
     try {
         updateSaveStatus('saving');
-        const result = await pywebview.api.autosave_code(code);
+        const result = await pywebview.api.autosave_code(await syncDocument());
 
         if (result.status === 'success') {
             console.log('[AUTOSAVE] Auto-saved successfully:', result.timestamp);
@@ -583,19 +769,31 @@ function stopAutosave() {
     }
 }
 
+// Newest snapshot the user chose not to recover, so the prompt doesn't come back for it
+const AUTOSAVE_DISMISSED_KEY = 'manim-autosave-dismissed';
+
+function autosaveKey(autosave) {
+    return `${autosave.autosave_file}@${autosave.timestamp}`;
+}
+
 async function checkForAutosaves() {
     try {
-        const result = await pywebview.api.get_autosave_files();
+        // Only the newest snapshot is shown - the full history is in Settings > Autosave Backups
+        const result = await pywebview.api.get_autosave_files(1);
 
         if (result.status === 'success' && result.files.length > 0) {
-            showAutosaveRecoveryDialog(result.files);
+            const latest = result.files[0];
+            if (localStorage.getItem(AUTOSAVE_DISMISSED_KEY) === autosaveKey(latest)) {
+                return; // Discarded before - it stays in Settings > Autosave Backups
+            }
+            showAutosaveRecoveryDialog(result.files, result.count);
         }
     } catch (err) {
         console.error('[AUTOSAVE] Error checking for autosaves:', err);
     }
 }
 
-function showAutosaveRecoveryDialog(autosaves) {
+function showAutosaveRecoveryDialog(autosaves, count = autosaves.length) {
     // Get the most recent autosave
     const latest = autosaves[0];
 
@@ -623,7 +821,7 @@ function showAutosaveRecoveryDialog(autosaves) {
                     <span style="color: var(--text-secondary); margin-left: 8px;">${latest.file_path || 'Untitled'}</span>
                 </div>
                 <p style="margin: 0; font-size: 13px; color: var(--text-secondary);">
-                    <i class="fas fa-info-circle"></i> Found ${autosaves.length} auto-save(s)
+                    <i class="fas fa-info-circle"></i> Found ${count} auto-save(s)
                 </p>
             </div>
             <div class="modal-footer">
@@ -654,19 +852,11 @@ function showAutosaveRecoveryDialog(autosaves) {
         }
     });
 
-    // Handle discard button
-    document.getElementById('discardAutosaveBtn').addEventListener('click', async () => {
-        try {
-            // Delete all autosaves
-            for (const autosave of autosaves) {
-                await pywebview.api.delete_autosave(autosave.autosave_file);
-            }
-            toast('Auto-saves discarded', 'info');
-            modal.remove();
-        } catch (err) {
-            console.error('[AUTOSAVE] Error discarding:', err);
-            modal.remove();
-        }
+    // Handle discard button - only dismisses the prompt, the history stays in Settings > Autosave Backups
+    document.getElementById('discardAutosaveBtn').addEventListener('click', () => {
+        localStorage.setItem(AUTOSAVE_DISMISSED_KEY, autosaveKey(latest));
+        toast('Auto-save dismissed - it is still available in Settings > Autosave Backups', 'info');
+        modal.remove();
     });
 }
 
@@ -691,21 +881,30 @@ async function checkCodeErrors() {
         return;
     }
 
-    const code = getEditorValue();
-    console.log('[ERROR CHECK] Checking code, length:', code.length);
-
     try {
-        const result = await pywebview.api.check_code_errors(code);
-        console.log('[ERROR CHECK] Result:', result);
+        const result = await pywebview.api.check_code_errors(await syncDocument());
 
+        // 'pending' results arrive later as a 'diagnostics' event
         if (result.status === 'success') {
-            displayErrors(result.errors);
+            showDiagnostics(result.version, result.errors);
         }
     } catch (err) {
         console.error('[ERROR CHECK] Failed:', err);
     }
 }
 
+// Newest checked version wins - results for older versions arriving late are dropped
+let diagnosticsVersion = -1;
+
+function showDiagnostics(version, errors) {
+    if (version !== null && version !== undefined) {
+        if (version < diagnosticsVersion) return;
+        diagnosticsVersion = version;
+    }
+    displayErrors(errors);
+}
+
+
 function displayErrors(errors) {
     const errorsList = document.getElementById('errorsList');
     const errorCount = document.getElementById('errorCount');
@@ -848,7 +1047,7 @@ async function renderAnimation() {
 
     // Just run the command in terminal - no UI messages
     try {
-        const res = await pywebview.api.render_animation(code, quality, fps, false);
+        const res = await pywebview.api.render_animation(await syncDocument(), quality, fps, false);
 
         if (res.status === 'error') {
             toast(`Render failed: ${res.message}`, 'error');
@@ -888,11 +1087,11 @@ async function quickPreview() {
         return;
     }
 
-    console.log('[PREVIEW] Calling quick_preview with params:', { code: code.substring(0, 50) + '...', quality, fps });
+    console.log('[PREVIEW] Calling quick_preview with params:', { quality, fps });
 
     // Just run the command in terminal - no UI messages
     try {
-        const res = await pywebview.api.quick_preview(code, quality, fps, false);
+        const res = await pywebview.api.quick_preview(await syncDocument(), quality, fps, false);
 
         if (res.status === 'error') {
             toast(`Preview failed: ${res.message}`, 'error');
@@ -927,6 +1126,52 @@ async function stopActiveRender() {
     }
 }
 
+// Event bus pushed from Python (UIEventBus in app.py)
+// Python batches events per animation frame and calls this with an array of {topic, payload}
+const manimEventHandlers = {};
+
+window.onManimEvent = function(topic, handler) {
+    (manimEventHandlers[topic] = manimEventHandlers[topic] || []).push(handler);
+};
+
+window.__manimStudioEvents = function(events) {
+    for (const event of events) {
+        if (event.topic === 'call') {
+            // Direct call into a window callback (renderFailed, previewCompleted, ...)
+            const fn = window[event.payload.fn];
+            if (typeof fn === 'function') {
+                try {
+                    fn.apply(window, event.payload.args);
+                } catch (err) {
+                    console.error(`[EVENTS] ${event.payload.fn} failed:`, err);
+                }
+            }
+            continue;
+        }
+
+        // Tagged topics ('terminal:render') go to the base topic's handlers with the tag
+        const [baseTopic, tag] = event.topic.split(':');
+        const handlers = manimEventHandlers[baseTopic];
+        if (!handlers) continue;
+        for (const handler of handlers) {
+            try {
+                handler(event.payload, tag);
+            } catch (err) {
+                console.error(`[EVENTS] Handler for '${event.topic}' failed:`, err);
+            }
+        }
+    }
+};
+
+window.onManimEvent('diagnostics', (result) => showDiagnostics(result.version, result.errors));
+
+// Errors spotted in terminal output - renders report through renderFailed/previewFailed,
+// so only surface errors from commands the user typed themselves
+window.onManimEvent('terminal_error', (error) => {
+    if (job.running) return;
+    toast(`Terminal: ${error.message}`, 'error');
+});
+
 // Callbacks for render updates (called by Python)
 window.updateRenderOutput = function(line) {
     appendConsole(line);
@@ -982,42 +1227,21 @@ async function showPreview(filePath) {
     console.log('[PREVIEW] File type:', ext);
 
     try {
-        // Get file as bytes from backend and convert to Blob
-        console.log('[PREVIEW] Requesting file bytes from backend...');
-        const result = await pywebview.api.get_asset_as_bytes(filePath);
+        // Get a URL on the local asset server - the file is streamed with Range requests
+        console.log('[PREVIEW] Requesting asset URL from backend...');
+        const result = await pywebview.api.get_asset_url(filePath);
 
         console.log('[PREVIEW] Backend response:', result.status);
 
-        if (result.status !== 'success' || !result.data) {
+        if (result.status !== 'success' || !result.url) {
             filenameSpan.textContent = `Error: ${result.message || 'Failed to load'}`;
             if (placeholder) placeholder.style.display = 'flex';
             return;
         }
 
-        // Convert base64 to Blob
-        console.log('[PREVIEW] Converting base64 to Blob...');
-        console.log('[PREVIEW] Base64 data length:', result.data.length, 'chars');
-        console.log('[PREVIEW] Expected file size:', result.size, 'bytes');
-
-        const binaryString = atob(result.data);
-        console.log('[PREVIEW] Decoded binary string length:', binaryString.length, 'bytes');
-
-        const bytes = new Uint8Array(binaryString.length);
-        for (let i = 0; i < binaryString.length; i++) {
-            bytes[i] = binaryString.charCodeAt(i);
-        }
-        console.log('[PREVIEW] Created byte array length:', bytes.length);
-
-        const blob = new Blob([bytes], { type: result.mimeType });
-        const blobUrl = URL.createObjectURL(blob);
-
-        console.log('[PREVIEW] Created Blob, size:', blob.size, 'bytes');
-        console.log('[PREVIEW] Created Blob URL:', blobUrl);
-        console.log('[PREVIEW] Blob type:', blob.type);
-
         // Video formats
         if (ext === 'mp4' || ext === 'mov' || ext === 'webm' || ext === 'avi') {
-            console.log('[PREVIEW] Displaying NEW video with Blob URL:', blobUrl);
+            console.log('[PREVIEW] Displaying NEW video from:', result.url);
 
             // Set up event handlers before setting src
             previewVideo.onerror = (e) => {
@@ -1066,15 +1290,14 @@ async function showPreview(filePath) {
                 console.log('[PREVIEW] ▶️ Video can play:', filename);
             };
 
-            // Use Blob URL from converted bytes
+            // Streamed from the asset server - seeking only fetches the needed byte ranges
             console.log('[PREVIEW] ========== SETTING VIDEO SOURCE ==========');
-            console.log('[PREVIEW] Source type: Blob URL');
-            console.log('[PREVIEW] Blob URL:', blobUrl);
+            console.log('[PREVIEW] Asset URL:', result.url);
             console.log('[PREVIEW] File size:', result.size, 'bytes');
             console.log('[PREVIEW] MIME type:', result.mimeType);
             console.log('[PREVIEW] =======================================');
 
-            previewVideo.src = blobUrl;
+            previewVideo.src = result.url;
 
             // Show video element
             previewVideo.style.display = 'block';
@@ -1091,7 +1314,7 @@ async function showPreview(filePath) {
         }
         // Image formats
         else if (ext === 'png' || ext === 'jpg' || ext === 'jpeg' || ext === 'gif' || ext === 'webp') {
-            console.log('[PREVIEW] Displaying NEW image with HTTP URL:', result.dataUrl.substring(0, 50) + '...');
+            console.log('[PREVIEW] Displaying NEW image from:', result.url);
 
             // Set up event handlers before setting src
             previewImage.onload = () => {
@@ -1104,17 +1327,8 @@ async function showPreview(filePath) {
                 filenameSpan.textContent = `Error loading ${filename}`;
             };
 
-            // Use relative path directly (PyWebView can access web directory files)
-            console.log('[PREVIEW] Setting image source:', result.dataUrl);
-
-            // Add cache-busting parameter
-            const cacheBuster = Date.now();
-            const imageUrl = result.dataUrl.includes('?')
-                ? `${result.dataUrl}&_=${cacheBuster}`
-                : `${result.dataUrl}?_=${cacheBuster}`;
-
-            console.log('[PREVIEW] Final image URL:', imageUrl);
-            previewImage.src = imageUrl;
+            // URL carries the file's mtime, so a changed image is never served from cache
+            previewImage.src = result.url;
 
             // Show image element
             previewImage.style.display = 'block';
@@ -1720,11 +1934,59 @@ function formatBytes(bytes) {
 // Terminal output polling for persistent cmd.exe session with xterm.js
 let terminalPollInterval = null;
 let term = null; // xterm.js Terminal instance
+let activeTerminalSession = 'main'; // Session shown in xterm.js ('main' shell, 'render', 'preview')
 
-async function startTerminalPolling() {
-    if (terminalPollInterval) return; // Already polling
+// Show another terminal session in xterm.js - its buffered output is replayed from Python
+async function switchTerminalSession(name) {
+    activeTerminalSession = name;
+    const select = document.getElementById('terminalSessionSelect');
+    if (select) select.value = name;
+    if (!term) return;
 
-    console.log('[TERMINAL] Starting PTY output polling for xterm.js...');
+    try {
+        const res = await pywebview.api.get_terminal_snapshot(name);
+        term.reset();
+        if (res.status === 'success' && res.output) {
+            term.write(res.output);
+        }
+        term.scrollToBottom();
+    } catch (err) {
+        console.error('[TERMINAL] Failed to switch session:', err);
+    }
+}
+
+// Keep the session picker in sync with the sessions Python reports
+function updateTerminalSessions(info) {
+    const select = document.getElementById('terminalSessionSelect');
+    if (!select || !info || !info.sessions) return;
+
+    const labels = { main: 'Shell', render: 'Render', preview: 'Preview' };
+    select.innerHTML = '';
+    for (const session of info.sessions) {
+        const option = document.createElement('option');
+        option.value = session.name;
+        let label = labels[session.name] || session.name;
+        if (session.name !== 'main') {
+            label += session.alive ? ' (running)' : ` (exit ${session.returncode ?? '?'})`;
+        }
+        option.textContent = label;
+        select.appendChild(option);
+    }
+
+    const names = info.sessions.map(session => session.name);
+    if (info.focus && names.includes(info.focus)) {
+        // A render/preview just started - follow its output
+        switchTerminalSession(info.focus);
+    } else if (!names.includes(activeTerminalSession)) {
+        switchTerminalSession('main');
+    } else {
+        select.value = activeTerminalSession;
+    }
+}
+
+async function startTerminalPolling() {
+    if (terminalPollInterval) return; // Already polling or subscribed
+    terminalPollInterval = 'starting';
 
     // Adaptive polling: faster when active, slower when idle
     let consecutiveEmptyPolls = 0;
@@ -1752,6 +2014,29 @@ async function startTerminalPolling() {
         }
     };
 
+    // Prefer output pushed by the Python event bus - no polling round trips at all
+    try {
+        const sub = await pywebview.api.subscribe_terminal_events();
+        if (sub && sub.status === 'success') {
+            window.onManimEvent('terminal', (output, session = 'main') => {
+                // Output of sessions that aren't shown is replayed when switching to them
+                if (term && output && session === activeTerminalSession) {
+                    term.write(output);
+                    scheduleScroll();
+                }
+            });
+            window.onManimEvent('terminal_sessions', updateTerminalSessions);
+            updateTerminalSessions({ sessions: sub.sessions });
+            terminalPollInterval = 'push';
+            console.log('[TERMINAL] Receiving pushed PTY output for xterm.js');
+            return;
+        }
+    } catch (err) {
+        console.warn('[TERMINAL] Push subscription unavailable, falling back to polling:', err);
+    }
+
+    console.log('[TERMINAL] Starting PTY output polling for xterm.js...');
+
     const poll = async () => {
         try {
             const res = await pywebview.api.get_terminal_output();
@@ -1855,7 +2140,7 @@ async function loadSystemInfo() {
     console.log('📊 loadSystemInfo() called');
     try {
         console.log('Calling pywebview.api.get_system_info()...');
-        const info = await pywebview.api.get_system_info();
+        const info = await runBackgroundJob('get_system_info');
         console.log('System info received:', info);
 
         // Set all system info fields
@@ -2172,15 +2457,20 @@ window.addEventListener('pywebviewready', () => {
         }
     });
 
+    // Terminal session picker - shell, render and preview each have their own output
+    document.getElementById('terminalSessionSelect')?.addEventListener('change', (e) => {
+        switchTerminalSession(e.target.value);
+    });
+
     // Clear console button - reset terminal to original state
     document.getElementById('clearOutputBtn')?.addEventListener('click', async () => {
         if (term) {
             // Clear the terminal screen
             term.clear();
 
-            // Send cls command to PTY to reset cmd.exe
+            // Clear the shown session's screen (cls / clear depending on platform)
             try {
-                await pywebview.api.send_terminal_command('cls\r\n');
+                await pywebview.api.clear_terminal(activeTerminalSession);
                 toast('Cleared', 'success');
             } catch (err) {
                 console.error('[TERMINAL] Error clearing:', err);
@@ -2334,7 +2624,7 @@ window.addEventListener('pywebviewready', () => {
             // Send user input to PTY backend
             term.onData(async (data) => {
                 try {
-                    await pywebview.api.send_terminal_command(data);
+                    await pywebview.api.send_terminal_command(data, activeTerminalSession);
                 } catch (err) {
                     console.error('[TERMINAL] Error sending data:', err);
                 }
@@ -2355,7 +2645,7 @@ window.addEventListener('pywebviewready', () => {
                 if (event.ctrlKey && event.shiftKey && event.key === 'V' && event.type === 'keydown') {
                     navigator.clipboard.readText().then(text => {
                         if (text) {
-                            pywebview.api.send_terminal_command(text);
+                            pywebview.api.send_terminal_command(text, activeTerminalSession);
                         }
                     }).catch(err => {
                         console.error('[TERMINAL] Paste failed:', err);
@@ -2383,7 +2673,7 @@ window.addEventListener('pywebviewready', () => {
                 e.preventDefault();
                 navigator.clipboard.readText().then(text => {
                     if (text) {
-                        pywebview.api.send_terminal_command(text);
+                        pywebview.api.send_terminal_command(text, activeTerminalSession);
                     }
                 }).catch(err => {
                     console.error('[TERMINAL] Paste failed:', err);
@@ -2632,17 +2922,7 @@ window.uploadAssets = async function() {
         const result = await pywebview.api.select_files_to_upload();
 
         if (result.status === 'success' && result.file_paths.length > 0) {
-            const uploadResult = await pywebview.api.upload_assets(result.file_paths);
-
-            if (uploadResult.status === 'success') {
-                showNotification('Upload Complete', uploadResult.message, 'success');
-                refreshAssets();
-            } else if (uploadResult.status === 'partial') {
-                showNotification('Upload Partial', uploadResult.message, 'info');
-                refreshAssets();
-            } else {
-                showNotification('Upload Failed', uploadResult.message, 'error');
-            }
+            await importAssetPaths(result.file_paths);
         }
     } catch (error) {
         console.error('[UPLOAD ERROR]', error);
@@ -2724,43 +3004,15 @@ async function handleDrop(e) {
         if (hasFilePaths && filePaths.length > 0) {
             // We have file paths - use the backend upload method
             console.log('[DRAG-DROP] Using file paths:', filePaths);
-            try {
-                const uploadResult = await pywebview.api.upload_assets(filePaths);
-
-                if (uploadResult.status === 'success') {
-                    showNotification('Upload Complete', uploadResult.message, 'success');
-                    console.log('[DRAG-DROP] Upload successful, calling loadAssets()...');
-                    // Call the same function as the refresh button
-                    if (window.loadAssets) {
-                        await window.loadAssets();
-                    }
-                } else if (uploadResult.status === 'partial') {
-                    showNotification('Upload Partial', uploadResult.message, 'info');
-                    console.log('[DRAG-DROP] Upload partial, calling loadAssets()...');
-                    // Call the same function as the refresh button
-                    if (window.loadAssets) {
-                        await window.loadAssets();
-                    }
-                } else {
-                    showNotification('Upload Failed', uploadResult.message, 'error');
-                }
-            } catch (error) {
-                console.error('[DRAG-DROP ERROR]', error);
-                showNotification('Upload Error', error.message, 'error');
-            }
+            // Imported in the background - progress and the result arrive as 'import' events,
+            // and the asset list refreshes itself from the index
+            await importAssetPaths(filePaths);
         } else {
             // No file paths available - need to read file contents and upload
-            console.log('[DRAG-DROP] No file paths - reading file contents');
+            console.log('[DRAG-DROP] No file paths - uploading file contents in chunks');
 
             try {
-                const uploadPromises = [];
-
-                for (let i = 0; i < files.length; i++) {
-                    const file = files[i];
-                    uploadPromises.push(uploadFileContent(file));
-                }
-
-                const results = await Promise.all(uploadPromises);
+                const results = await uploadFilesChunked(Array.from(files));
                 const successCount = results.filter(r => r === true).length;
                 const failCount = results.length - successCount;
 
@@ -2789,36 +3041,255 @@ async function handleDrop(e) {
     }
 }
 
-async function uploadFileContent(file) {
-    return new Promise((resolve) => {
+// Chunked uploads (UploadManager in app.py): files are sliced and sent a chunk at a time,
+// so large videos never sit in memory as one base64 string. Dropping the same file again
+// after an interruption resumes where the backend left off.
+const UPLOAD_CHUNK_SIZE = 2 * 1024 * 1024;
+const UPLOAD_CONCURRENCY = 3;
+const UPLOAD_MAX_RETRIES = 3;
+
+function readBlobAsBase64(blob) {
+    return new Promise((resolve, reject) => {
         const reader = new FileReader();
+        reader.onload = () => resolve(reader.result.split(',')[1] || ''); // Remove data URL prefix
+        reader.onerror = () => reject(reader.error);
+        reader.readAsDataURL(blob);
+    });
+}
+
+async function sha256Hex(blob) {
+    // crypto.subtle only exists in secure contexts - the backend treats the checksum as optional
+    if (!window.crypto || !window.crypto.subtle) return null;
+    const digest = await window.crypto.subtle.digest('SHA-256', await blob.arrayBuffer());
+    return Array.from(new Uint8Array(digest), b => b.toString(16).padStart(2, '0')).join('');
+}
 
-        reader.onload = async function(e) {
+async function uploadFileContent(file) {
+    try {
+        let upload = await pywebview.api.begin_upload(file.name, file.size, file.lastModified);
+        if (upload.status !== 'success') {
+            console.error(`[UPLOAD] Failed to start ${file.name}:`, upload.message);
+            return false;
+        }
+        if (upload.resumed) {
+            console.log(`[UPLOAD] Resuming ${file.name} at ${upload.received}/${file.size} bytes`);
+        }
+
+        let offset = upload.received;
+        let retries = 0;
+        while (offset < file.size) {
+            const chunk = file.slice(offset, offset + UPLOAD_CHUNK_SIZE);
+            let result;
             try {
-                const base64Content = e.target.result.split(',')[1]; // Remove data URL prefix
-                const result = await pywebview.api.upload_file_content(file.name, base64Content);
+                const [data, checksum] = await Promise.all([readBlobAsBase64(chunk), sha256Hex(chunk)]);
+                result = await pywebview.api.append_upload_chunk(upload.uploadId, offset, data, checksum);
+            } catch (error) {
+                result = { status: 'error', message: error.message };
+            }
 
-                if (result.status === 'success') {
-                    console.log(`[UPLOAD] Successfully uploaded ${file.name}`);
-                    resolve(true);
-                } else {
-                    console.error(`[UPLOAD] Failed to upload ${file.name}:`, result.message);
-                    resolve(false);
+            if (result.status === 'success' || result.code === 'offset_mismatch') {
+                // On a mismatch the backend tells us where it really is
+                offset = result.received;
+                retries = 0;
+                continue;
+            }
+            if (result.code === 'unknown_upload') {
+                // Backend restarted - begin again, it picks up the staged bytes
+                upload = await pywebview.api.begin_upload(file.name, file.size, file.lastModified);
+                if (upload.status === 'success') {
+                    offset = upload.received;
+                    continue;
                 }
-            } catch (error) {
-                console.error(`[UPLOAD ERROR] ${file.name}:`, error);
-                resolve(false);
             }
-        };
+            if (++retries > UPLOAD_MAX_RETRIES) {
+                console.error(`[UPLOAD] Giving up on ${file.name} at ${offset} bytes:`, result.message);
+                // Drop the staged bytes and the progress entry, otherwise the dropzone stays "uploading"
+                try {
+                    await pywebview.api.abort_upload(upload.uploadId);
+                } catch (error) {
+                    console.warn(`[UPLOAD] Could not abort ${file.name}:`, error);
+                }
+                activeUploads.delete(upload.uploadId);
+                renderTransferProgress();
+                return false;
+            }
+            console.warn(`[UPLOAD] Retrying ${file.name} at ${offset} bytes:`, result.message);
+        }
 
-        reader.onerror = function() {
-            console.error(`[UPLOAD ERROR] Failed to read ${file.name}`);
-            resolve(false);
-        };
+        const result = await pywebview.api.commit_upload(upload.uploadId);
+        if (result.status === 'success') {
+            console.log(`[UPLOAD] Successfully uploaded ${file.name} as ${result.filename}`);
+            return true;
+        }
+        console.error(`[UPLOAD] Failed to upload ${file.name}:`, result.message);
+        return false;
+    } catch (error) {
+        console.error(`[UPLOAD ERROR] ${file.name}:`, error);
+        return false;
+    }
+}
+
+// Upload several files at once, a few in parallel
+async function uploadFilesChunked(files) {
+    const results = new Array(files.length);
+    let next = 0;
+    const worker = async () => {
+        while (next < files.length) {
+            const index = next++;
+            results[index] = await uploadFileContent(files[index]);
+        }
+    };
+    const workers = [];
+    for (let i = 0; i < Math.min(UPLOAD_CONCURRENCY, files.length); i++) {
+        workers.push(worker());
+    }
+    await Promise.all(workers);
+    return results;
+}
+
+// Progress pushed by the backend for every upload and import in flight
+const activeUploads = new Map();
+
+function renderTransferProgress() {
+    const dropzone = document.getElementById('assetsDropzone');
+    const hint = dropzone && dropzone.querySelector('.dropzone-hint');
+    if (!hint) return;
+    if (hint.dataset.idleText === undefined) hint.dataset.idleText = hint.textContent;
+
+    if (activeUploads.size === 0) {
+        dropzone.classList.remove('uploading');
+        hint.textContent = hint.dataset.idleText;
+        return;
+    }
+
+    let size = 0;
+    let received = 0;
+    let files = 0;
+    for (const upload of activeUploads.values()) {
+        size += upload.size;
+        received += upload.received;
+        files += upload.files || 1;
+    }
+    const percent = size ? Math.floor(received / size * 100) : 100;
+    dropzone.classList.add('uploading');
+    dropzone.style.setProperty('--upload-progress', `${percent}%`);
+    hint.textContent = `Uploading ${files} file(s)... ${percent}%`;
+}
+
+window.onManimEvent('upload', (info) => {
+    if (info.state === 'uploading') {
+        activeUploads.set(info.uploadId, info);
+    } else {
+        activeUploads.delete(info.uploadId);
+    }
+    renderTransferProgress();
+});
+
+// Bulk imports (import_assets) run in the background and report here
+window.onManimEvent('import', (info) => {
+    const key = `import:${info.jobId}`;
+    if (info.state === 'running') {
+        activeUploads.set(key, { size: info.bytesTotal, received: info.bytesDone, files: info.total - info.done });
+        renderTransferProgress();
+        return;
+    }
+
+    activeUploads.delete(key);
+    renderTransferProgress();
+    const failed = info.errors.length;
+    if (info.state === 'cancelled') {
+        showNotification('Import Cancelled', `Imported ${info.importedCount} of ${info.total} file(s)`, 'info');
+    } else if (failed === 0) {
+        showNotification('Upload Complete', `Successfully uploaded ${info.importedCount} file(s)`, 'success');
+    } else if (info.importedCount > 0) {
+        showNotification('Upload Partial', `Uploaded ${info.importedCount} file(s), ${failed} failed`, 'info');
+    } else {
+        showNotification('Upload Failed', 'All uploads failed', 'error');
+    }
+});
 
-        reader.readAsDataURL(file);
+window.onManimEvent('import_file', (result) => {
+    if (result.status === 'error') {
+        console.error(`[IMPORT] ${result.file}: ${result.error}`);
+    }
+});
+
+// Start a background import of files/folders by path
+async function importAssetPaths(paths) {
+    try {
+        const result = await pywebview.api.import_assets(paths);
+        if (result.status !== 'success') {
+            showNotification('Upload Failed', result.message, 'error');
+        }
+        return result;
+    } catch (error) {
+        console.error('[IMPORT ERROR]', error);
+        showNotification('Upload Error', error.message, 'error');
+        return { status: 'error', message: error.message };
+    }
+}
+window.importAssetPaths = importAssetPaths;
+
+// Background jobs (JobManager in app.py): long calls return a job id right away and
+// report progress/results as 'job' events, so the bridge never blocks on pip or ffmpeg
+const pendingJobs = new Map();    // jobId -> {resolve, onProgress}
+const finishedJobs = new Map();   // Results that arrived before start_job() returned
+const JOB_POLL_INTERVAL = 5000;   // Fallback check for jobs whose final event never arrived
+
+window.onManimEvent('job', (info) => {
+    const pending = pendingJobs.get(info.jobId);
+    const finished = !['queued', 'running'].includes(info.state);
+    if (!finished) {
+        if (pending && pending.onProgress) pending.onProgress(info);
+        return;
+    }
+    const result = info.result || { status: 'error', message: `Job ${info.state}` };
+    if (pending) {
+        pendingJobs.delete(info.jobId);
+        pending.resolve(result);
+    } else {
+        finishedJobs.set(info.jobId, result);
+    }
+});
+
+// Run a ManimAPI method as a background job; resolves with the method's normal result.
+// Falls back to a direct call where start_job isn't available (Flask adapter).
+async function runBackgroundJob(method, args = [], onProgress = null) {
+    if (!pywebview.api.start_job) {
+        return await pywebview.api[method](...args);
+    }
+    const job = await pywebview.api.start_job(method, args);
+    if (job.status !== 'success') return job;
+    if (finishedJobs.has(job.jobId)) {
+        const result = finishedJobs.get(job.jobId);
+        finishedJobs.delete(job.jobId);
+        return result;
+    }
+    return new Promise((resolve) => {
+        // Events can be dropped (page reload, bridge hiccup) - poll get_job as a fallback
+        const poll = setInterval(async () => {
+            if (!pendingJobs.has(job.jobId)) return;
+            let info;
+            try {
+                info = await pywebview.api.get_job(job.jobId);
+            } catch (error) {
+                return; // Try again on the next tick
+            }
+            if (info.status !== 'success') {
+                settle({ status: 'error', message: info.message || 'Job lost' });
+            } else if (!['queued', 'running'].includes(info.state)) {
+                settle(info.result || { status: 'error', message: `Job ${info.state}` });
+            }
+        }, JOB_POLL_INTERVAL);
+        const settle = (result) => {
+            clearInterval(poll);
+            pendingJobs.delete(job.jobId);
+            resolve(result);
+        };
+        pendingJobs.set(job.jobId, { resolve: settle, onProgress });
     });
 }
+window.runBackgroundJob = runBackgroundJob;
 
 // ============================================================================
 // PACKAGE MANAGEMENT FUNCTIONS
@@ -2844,7 +3315,12 @@ async function refreshPackages(checkUpdates = false) {
         // Only check for updates if explicitly requested
         let updatesResult = { status: 'success', updates: cachedUpdates || [] };
         if (checkUpdates) {
-            updatesResult = await pywebview.api.check_package_updates();
+            updatesResult = await runBackgroundJob('check_package_updates', [], (info) => {
+                const loading = packagesList.querySelector('.venv-loading');
+                if (loading && info.message) {
+                    loading.innerHTML = `<i class="fas fa-spinner fa-spin"></i> ${info.message} (${Math.round(info.progress * 100)}%)`;
+                }
+            });
             cachedUpdates = updatesResult.updates || [];
         }
 
@@ -2957,7 +3433,7 @@ async function installPackage() {
 
     try {
         // First, check for dependencies and conflicts
-        const checkResult = await pywebview.api.check_package_dependencies(packageName);
+        const checkResult = await runBackgroundJob('check_package_dependencies', [packageName]);
         console.log('[VENV] Dependency check result:', checkResult);
 
         if (checkResult.status === 'error') {
@@ -3001,7 +3477,7 @@ async function installPackage() {
         installBtn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Installing...';
         console.log(`[VENV] Installing package: ${packageName}`);
 
-        const result = await pywebview.api.install_package(packageName);
+        const result = await runBackgroundJob('install_package', [packageName]);
         console.log('[VENV] Install result:', result);
 
         if (result.status === 'success') {
@@ -3047,7 +3523,7 @@ async function updatePackage(packageName, hasWarning = false) {
     });
 
     try {
-        const result = await pywebview.api.update_package(packageName);
+        const result = await runBackgroundJob('update_package', [packageName]);
         console.log('[VENV] Update result:', result);
 
         if (result.status === 'success') {
@@ -3091,7 +3567,7 @@ async function uninstallPackage(packageName) {
     });
 
     try {
-        const result = await pywebview.api.uninstall_package(packageName);
+        const result = await runBackgroundJob('uninstall_package', [packageName]);
         console.log('[VENV] Uninstall result:', result);
 
         if (result.status === 'success') {
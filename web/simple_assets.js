@@ -9,11 +9,8 @@ window.uploadAssets = async function() {
     try {
         const result = await pywebview.api.select_files_to_upload();
         if (result && result.status === 'success' && result.file_paths) {
-            const addResult = await pywebview.api.add_assets(result.file_paths);
-            if (addResult.status === 'success') {
-                showCustomAlert(`Successfully added ${addResult.added} file${addResult.added !== 1 ? 's' : ''}!`, 'success');
-                window.loadAssets();
-            }
+            // Runs in the background; the list refreshes itself when files land
+            await window.importAssetPaths(result.file_paths);
         }
     } catch (error) {
         console.error('[SIMPLE] Upload error:', error);
@@ -21,8 +18,13 @@ window.uploadAssets = async function() {
     }
 };
 
+// Assets come from the backend's asset index a page at a time
+const ASSETS_PAGE_SIZE = 200;
+const ASSETS_LIST_KINDS = ['video', 'image', 'font', 'audio', 'subtitle', 'text'];
+let assetsLoaded = 0;
+
 // Load and display assets in Modern Card Grid view
-window.loadAssets = async function() {
+window.loadAssets = async function(append = false) {
     console.log('[SIMPLE] Loading assets...');
     const container = document.getElementById('simpleAssetsContainer');
 
@@ -32,10 +34,14 @@ window.loadAssets = async function() {
     }
 
     try {
-        const result = await pywebview.api.list_media_files();
-        console.log('[SIMPLE] Got files:', result);
-
-        if (!result.files || result.files.length === 0) {
+        // A refresh reloads everything that was on screen, so the list doesn't jump back to page one
+        const offset = append ? assetsLoaded : 0;
+        const limit = append ? ASSETS_PAGE_SIZE : Math.max(assetsLoaded, ASSETS_PAGE_SIZE);
+        const result = await pywebview.api.query_assets('assets', ASSETS_LIST_KINDS, null, 'mtime', true, offset, limit);
+        console.log('[SIMPLE] Got files:', result.files.length, 'of', result.total);
+
+        if (!append && (!result.files || result.files.length === 0)) {
+            assetsLoaded = 0;
             container.innerHTML = `
                 <div class="assets-empty">
                     <i class="fas fa-folder-open"></i>
@@ -45,78 +51,31 @@ window.loadAssets = async function() {
             return;
         }
 
-        // Clear container
-        container.innerHTML = '';
+        if (append) {
+            const more = container.querySelector('.assets-load-more');
+            if (more) more.remove();
+        } else {
+            // Clear container
+            container.innerHTML = '';
+        }
 
         // Create rows for each file
-        result.files.forEach(function(file, index) {
-            const ext = file.name.split('.').pop().toLowerCase();
-            const fileType = getFileType(ext);
-            const rowType = getCardType(ext);
-
-            const row = document.createElement('div');
-            row.className = `asset-row ${rowType}`;
-            row.dataset.filepath = file.path;
-            row.dataset.filename = file.name;
-            row.dataset.index = index;
-
-            // Check if it's an image to show thumbnail
-            const imageExts = ['png', 'jpg', 'jpeg', 'gif', 'webp', 'bmp', 'svg'];
-            const isImage = imageExts.includes(ext);
-
-            row.innerHTML = `
-                <div class="asset-col-preview">
-                    ${isImage ?
-                        `<img class="asset-thumbnail" src="#" data-filepath="${escapeHtml(file.path)}" alt="${escapeHtml(file.name)}">` :
-                        `<div class="asset-preview">${getAssetIcon(file.name)}</div>`
-                    }
-                </div>
-                <div class="asset-col-name">
-                    <div class="asset-name" title="${escapeHtml(file.name)}">${escapeHtml(file.name)}</div>
-                </div>
-                <div class="asset-col-type">
-                    <div class="asset-type">${fileType}</div>
-                </div>
-                <div class="asset-col-size">
-                    <div class="asset-size">${formatBytes(file.size)}</div>
-                </div>
-                <div class="asset-col-actions">
-                    <div class="asset-actions">
-                        <button class="asset-action-btn" onclick="event.stopPropagation(); showPreviewInAssetsTab('${escapeForJs(file.path)}', '${escapeForJs(file.name)}');">
-                            <i class="fas fa-eye"></i> View
-                        </button>
-                        <button class="asset-action-btn delete" onclick="event.stopPropagation(); window.deleteAssetById('${escapeForJs(file.path)}', '${escapeForJs(file.name)}');">
-                            <i class="fas fa-trash"></i>
-                        </button>
-                    </div>
-                </div>
-            `;
-
-            // Click row to preview
-            row.addEventListener('click', function() {
-                showPreviewInAssetsTab(file.path, file.name);
-            });
-
-            // Load thumbnail for images
-            if (isImage) {
-                const img = row.querySelector('.asset-thumbnail');
-                if (img && window.pywebview && window.pywebview.api) {
-                    window.pywebview.api.read_file_as_base64(file.path)
-                        .then(function(base64Data) {
-                            img.src = `data:image/${ext};base64,${base64Data}`;
-                        })
-                        .catch(function(err) {
-                            console.error('[THUMBNAIL] Failed to load:', err);
-                            // Fallback to icon
-                            img.outerHTML = `<div class="asset-preview">${getAssetIcon(file.name)}</div>`;
-                        });
-                }
-            }
-
-            container.appendChild(row);
+        result.files.forEach(function(file, i) {
+            container.appendChild(createAssetRow(file, offset + i));
         });
+        assetsLoaded = offset + result.files.length;
+
+        if (assetsLoaded < result.total) {
+            const more = document.createElement('button');
+            more.className = 'assets-btn assets-load-more';
+            more.innerHTML = `<i class="fas fa-chevron-down"></i> Show more (${result.total - assetsLoaded} remaining)`;
+            more.addEventListener('click', function() {
+                window.loadAssets(true);
+            });
+            container.appendChild(more);
+        }
 
-        console.log('[SIMPLE] [OK] Displayed', result.files.length, 'assets in Column Table view');
+        console.log('[SIMPLE] [OK] Displayed', assetsLoaded, 'of', result.total, 'assets in Column Table view');
 
     } catch (error) {
         console.error('[SIMPLE] Load error:', error);
@@ -125,6 +84,137 @@ window.loadAssets = async function() {
     }
 };
 
+// The asset index pushes an event whenever the assets folder changes - no need to poll
+if (window.onManimEvent) {
+    let reloadTimer = null;
+    window.onManimEvent('assets', function(change) {
+        if (change.root !== 'assets') return;
+        clearTimeout(reloadTimer);
+        reloadTimer = setTimeout(function() {
+            window.loadAssets();
+        }, 100);
+    });
+}
+
+// Build one row of the assets table
+function createAssetRow(file, index) {
+    const ext = file.name.split('.').pop().toLowerCase();
+    const fileType = getFileType(ext);
+    const rowType = getCardType(ext);
+
+    const row = document.createElement('div');
+    row.className = `asset-row ${rowType}`;
+    row.dataset.filepath = file.path;
+    row.dataset.filename = file.name;
+    row.dataset.index = index;
+
+    // Check if it's an image to show thumbnail
+    const imageExts = ['png', 'jpg', 'jpeg', 'gif', 'webp', 'bmp', 'svg'];
+    const isImage = imageExts.includes(ext);
+
+    row.innerHTML = `
+        <div class="asset-col-preview">
+            ${file.thumbnail ?
+                `<img class="asset-thumbnail" src="${escapeHtml(file.thumbnail)}" alt="${escapeHtml(file.name)}">` :
+                isImage ?
+                `<img class="asset-thumbnail" src="#" data-filepath="${escapeHtml(file.path)}" alt="${escapeHtml(file.name)}">` :
+                `<div class="asset-preview">${getAssetIcon(file.name)}</div>`
+            }
+        </div>
+        <div class="asset-col-name">
+            <div class="asset-name" title="${escapeHtml(file.name)}">${escapeHtml(file.name)}</div>
+        </div>
+        <div class="asset-col-type">
+            <div class="asset-type">${fileType}</div>
+        </div>
+        <div class="asset-col-size">
+            <div class="asset-size">${formatBytes(file.size)}</div>
+        </div>
+        <div class="asset-col-actions">
+            <div class="asset-actions">
+                <button class="asset-action-btn" onclick="event.stopPropagation(); showPreviewInAssetsTab('${escapeForJs(file.path)}', '${escapeForJs(file.name)}');">
+                    <i class="fas fa-eye"></i> View
+                </button>
+                <button class="asset-action-btn delete" onclick="event.stopPropagation(); window.deleteAssetById('${escapeForJs(file.path)}', '${escapeForJs(file.name)}');">
+                    <i class="fas fa-trash"></i>
+                </button>
+            </div>
+        </div>
+    `;
+
+    // Click row to preview
+    row.addEventListener('click', function() {
+        showPreviewInAssetsTab(file.path, file.name);
+    });
+
+    if (file.hoverStrip) {
+        attachHoverStrip(row.querySelector('.asset-col-preview'), file.hoverStrip);
+    }
+
+    // Images without a generated thumbnail yet show the original
+    if (isImage && !file.thumbnail) {
+        const img = row.querySelector('.asset-thumbnail');
+        if (img && window.pywebview && window.pywebview.api) {
+            window.pywebview.api.get_asset_url(file.path)
+                .then(function(result) {
+                    if (result.status !== 'success') throw new Error(result.message);
+                    img.src = result.url;
+                })
+                .catch(function(err) {
+                    console.error('[THUMBNAIL] Failed to load:', err);
+                    // Fallback to icon
+                    img.outerHTML = `<div class="asset-preview">${getAssetIcon(file.name)}</div>`;
+                });
+        }
+    }
+
+    return row;
+}
+
+// Thumbnails are generated in the background - swap them in as they arrive
+if (window.onManimEvent) {
+    window.onManimEvent('thumbnail', function(info) {
+        if (!info.thumbnail) return;
+        document.querySelectorAll('#simpleAssetsContainer .asset-row').forEach(function(row) {
+            if (row.dataset.filepath !== info.path) return;
+            const cell = row.querySelector('.asset-col-preview');
+            cell.innerHTML = `<img class="asset-thumbnail" src="${escapeHtml(info.thumbnail)}" alt="${escapeHtml(row.dataset.filename)}">`;
+            if (info.hoverStrip) attachHoverStrip(cell, info.hoverStrip);
+        });
+    });
+}
+
+// Scrub through a video's hover strip (one image of evenly spaced frames side by side)
+const HOVER_STRIP_FRAMES = 8;
+
+function attachHoverStrip(cell, stripUrl) {
+    const thumbnail = cell.querySelector('.asset-thumbnail');
+    if (!thumbnail) return;
+    let strip = null;
+
+    cell.addEventListener('mousemove', function(e) {
+        if (!strip) {
+            strip = new Image();
+            strip.src = stripUrl;
+        }
+        if (!strip.complete || !strip.naturalWidth) return;
+
+        const box = thumbnail.getBoundingClientRect();
+        const frameWidth = box.height * (strip.naturalWidth / HOVER_STRIP_FRAMES) / strip.naturalHeight;
+        const frame = Math.min(HOVER_STRIP_FRAMES - 1,
+            Math.max(0, Math.floor((e.clientX - box.left) / box.width * HOVER_STRIP_FRAMES)));
+        thumbnail.style.objectPosition = '-9999px 0';  // Hide the poster, keep the element's box
+        thumbnail.style.backgroundImage = `url("${stripUrl}")`;
+        thumbnail.style.backgroundSize = `${frameWidth * HOVER_STRIP_FRAMES}px ${box.height}px`;
+        thumbnail.style.backgroundPosition = `${(box.width - frameWidth) / 2 - frame * frameWidth}px 0`;
+    });
+
+    cell.addEventListener('mouseleave', function() {
+        thumbnail.style.objectPosition = '';
+        thumbnail.style.backgroundImage = '';
+    });
+}
+
 // Get card type for styling
 function getCardType(ext) {
     const videoExts = ['mp4', 'mov', 'avi', 'webm', 'mkv', 'flv', 'm4v'];
@@ -216,13 +306,14 @@ function showPreviewInAssetsTab(filepath, filename) {
                 });
         }
     } else if (imageExts.includes(ext)) {
-        // Show image using base64
+        // Show image streamed from the local asset server
         if (window.pywebview && window.pywebview.api) {
             previewContainer.innerHTML = '<div style="color:#aaa;">Loading image...</div>';
-            window.pywebview.api.read_file_as_base64(filepath)
-                .then(function(base64Data) {
+            window.pywebview.api.get_asset_url(filepath)
+                .then(function(result) {
+                    if (result.status !== 'success') throw new Error(result.message);
                     previewContainer.innerHTML = `
-                        <img src="data:image/${ext};base64,${base64Data}"
+                        <img src="${result.url}"
                              style="max-width:100%; max-height:100%; object-fit:contain;"
                              alt="${filename}">
                     `;